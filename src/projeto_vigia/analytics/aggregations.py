@@ -1,28 +1,34 @@
 from __future__ import annotations
 import pandas as pd
+from projeto_vigia.instrumentation import timed
+from .scoring import DEFAULT_SCORING, ScoringConfig, decay_weights, grid_metrics, rank_regions
 
+@timed("analytics.by_day")
 def by_day(df: pd.DataFrame) -> pd.DataFrame:
     dff = df.copy()
     dff["data"] = dff["data_hora"].dt.date
     return dff.groupby("data").size().reset_index(name="contagem")
 
+@timed("analytics.by_biome")
 def by_biome(df: pd.DataFrame) -> pd.DataFrame:
+    counts = df["Bioma"].value_counts()
     return (
-        df["Bioma"]
-        .value_counts()
+        counts[counts > 0]
         .rename_axis("Bioma")
         .reset_index(name="Número de Focos")
     )
 
+@timed("analytics.top_municipios")
 def top_municipios(df: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    counts = df["municipio_nome"].value_counts()
     return (
-        df["municipio_nome"]
-        .value_counts()
+        counts[counts > 0]
         .nlargest(n)
         .rename_axis("Município")
         .reset_index(name="Número de Focos")
     )
 
+@timed("analytics.series_by_dimension")
 def series_by_dimension(df: pd.DataFrame, dimension: str) -> pd.DataFrame:
     """
     dimension ∈ {"estado_nome","Bioma"}
@@ -30,15 +36,21 @@ def series_by_dimension(df: pd.DataFrame, dimension: str) -> pd.DataFrame:
     """
     dff = df.copy()
     dff["data"] = dff["data_hora"].dt.date
-    out = dff.groupby(["data", dimension]).size().reset_index(name="contagem")
+    out = dff.groupby(["data", dimension], observed=True).size().reset_index(name="contagem")
     return out
 
-def compute_critical_regions(df: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
+@timed("analytics.compute_critical_regions")
+def compute_critical_regions(df: pd.DataFrame, top_n: int = 5,
+                             scoring: ScoringConfig = DEFAULT_SCORING) -> pd.DataFrame:
     """
-    Define 'regiões críticas' por agregação em Município + Estado + Bioma
-    com métricas: focos, risco médio, FRP médio/máx, precipitação média, dias sem chuva médios.
+    Define 'regiões críticas' por agregação em Município + Estado + Bioma (ou na
+    granularidade de scoring) com métricas: focos, risco médio, FRP médio/máx,
+    precipitação média, dias sem chuva médios; ordenadas pelo score de scoring.
     """
-    grp = (df.groupby(["estado_nome", "municipio_nome", "Bioma"])
+    if scoring.granularity == "grade":
+        return rank_regions(grid_metrics(df, scoring.cell_deg, scoring.half_life_days), scoring, top_n)
+    grouped = df.groupby(scoring.dims, observed=True, sort=False)
+    grp = (grouped
              .agg(
                  focos=("RiscoFogo","size"),
                  risco_medio=("RiscoFogo","mean"),
@@ -50,6 +62,127 @@ def compute_critical_regions(df: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
                  lon=("lon","mean"),
              )
              .reset_index())
-    # Score simples: combina quantidade de focos + risco médio + FRP médio
-    grp["score"] = grp["focos"]*0.6 + grp["risco_medio"]*100*0.25 + grp["frp_medio"]*0.15
-    return grp.sort_values(["score","focos","frp_medio"], ascending=False).head(top_n)
+    if scoring.half_life_days:
+        w = pd.Series(decay_weights(df["data_hora"].dt.normalize(), scoring.half_life_days), index=df.index)
+        grp["focos_recentes"] = w.groupby([df[c] for c in scoring.dims], observed=True, sort=False).sum().to_numpy()
+    return rank_regions(grp, scoring, top_n)
+
+# ---------------------------
+# Cubo de agregação (uma passada)
+# ---------------------------
+CUBE_DIMS = ["data", "estado_nome", "municipio_nome", "Bioma"]
+CUBE_METRICS = ["RiscoFogo", "FRP", "Precipitacao", "DiaSemChuva"]
+_STATS = {"n": "sum", "sum": "sum", "min": "min", "max": "max"}
+
+@timed("analytics.aggregate_stats")
+def aggregate_stats(df: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """Um groupby sobre linhas brutas produzindo as estatísticas suficientes do cubo."""
+    spec = {"focos": ("lat", "size"), "lat_sum": ("lat", "sum"), "lon_sum": ("lon", "sum")}
+    for m in CUBE_METRICS:
+        spec[f"{m}_n"] = (m, "count")
+        spec[f"{m}_sum"] = (m, "sum")
+        spec[f"{m}_min"] = (m, "min")
+        spec[f"{m}_max"] = (m, "max")
+    return df.groupby(keys, observed=True, sort=False).agg(**spec).reset_index()
+
+@timed("analytics.rollup_stats")
+def rollup_stats(table: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
+    """Reagrega uma tabela de estatísticas suficientes para menos dimensões."""
+    agg = {"focos": "sum", "lat_sum": "sum", "lon_sum": "sum"}
+    for m in CUBE_METRICS:
+        for stat, how in _STATS.items():
+            agg[f"{m}_{stat}"] = how
+    return table.groupby(dims, observed=True, sort=False).agg(agg).reset_index()
+
+def _mean(rolled: pd.DataFrame, metric: str) -> pd.Series:
+    n = rolled[f"{metric}_n"]
+    return (rolled[f"{metric}_sum"] / n).where(n > 0)
+
+class FocosCube:
+    """
+    Agregado (dia × estado × município × Bioma) com estatísticas suficientes
+    por métrica: {m}_n (não nulos), {m}_sum, {m}_min, {m}_max, além de focos
+    e somas de lat/lon. Todas as tabelas das abas saem daqui por roll-up,
+    então o custo passa a depender do número de grupos, não de focos.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table
+
+    @classmethod
+    @timed("analytics.cube_from_frame")
+    def from_frame(cls, df: pd.DataFrame) -> "FocosCube":
+        keys = [df["data_hora"].dt.normalize().rename("data")] + [df[c] for c in CUBE_DIMS[1:]]
+        return cls(aggregate_stats(df, keys))
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @property
+    def total(self) -> int:
+        return int(self.table["focos"].sum())
+
+    def rollup(self, dims: list[str]) -> pd.DataFrame:
+        """Soma/mín/máx das estatísticas sobre as dimensões que ficam de fora."""
+        return rollup_stats(self.table, dims)
+
+    # ---------------------------
+    # Tabelas das abas (mesmo formato das funções sobre linhas)
+    # ---------------------------
+    def by_day(self) -> pd.DataFrame:
+        return (self.table.groupby("data")["focos"].sum()
+                .reset_index(name="contagem"))
+
+    def series_by_dimension(self, dimension: str) -> pd.DataFrame:
+        return (self.table.groupby(["data", dimension], observed=True)["focos"].sum()
+                .reset_index(name="contagem"))
+
+    def by_biome(self) -> pd.DataFrame:
+        counts = self.table.groupby("Bioma", observed=True)["focos"].sum()
+        return (counts.sort_values(ascending=False)
+                .rename_axis("Bioma")
+                .reset_index(name="Número de Focos"))
+
+    def top_municipios(self, n: int = 10) -> pd.DataFrame:
+        counts = self.table.groupby("municipio_nome", observed=True)["focos"].sum()
+        return (counts.nlargest(n)
+                .rename_axis("Município")
+                .reset_index(name="Número de Focos"))
+
+    def region_metrics(self, dims: list[str], half_life_days: float | None = None) -> pd.DataFrame:
+        """Métricas por região (as de compute_critical_regions) por roll-up; com meia-vida, focos_recentes."""
+        r = self.rollup(dims)
+        grp = r[dims].assign(
+            focos=r["focos"],
+            risco_medio=_mean(r, "RiscoFogo"),
+            frp_medio=_mean(r, "FRP"),
+            frp_max=r["FRP_max"],
+            precip_media=_mean(r, "Precipitacao"),
+            dias_sem_chuva_med=_mean(r, "DiaSemChuva"),
+            lat=r["lat_sum"] / r["focos"],
+            lon=r["lon_sum"] / r["focos"],
+        )
+        if half_life_days:
+            # mesmo agrupamento (sort=False) do roll-up: grupos na mesma ordem
+            w = self.table["focos"] * decay_weights(self.table["data"], half_life_days)
+            grp["focos_recentes"] = (w.groupby([self.table[c] for c in dims], observed=True, sort=False)
+                                     .sum().to_numpy())
+        return grp
+
+    @timed("analytics.cube_critical_regions")
+    def critical_regions(self, top_n: int = 5, scoring: ScoringConfig = DEFAULT_SCORING) -> pd.DataFrame:
+        if scoring.granularity == "grade":
+            raise ValueError("O cubo não guarda coordenadas por foco: use compute_critical_regions com os focos.")
+        return rank_regions(self.region_metrics(scoring.dims, scoring.half_life_days), scoring, top_n)
+
+    @timed("analytics.cube_summary")
+    def summary(self) -> dict:
+        """Métricas do topo da aba de resumo."""
+        mun = self.table.groupby("municipio_nome", observed=True)["focos"].sum()
+        n = self.table["DiaSemChuva_n"].sum()
+        return {
+            "total": self.total,
+            "municipio_top": mun.idxmax() if len(mun) else None,
+            "n_municipios": int((mun > 0).sum()),
+            "media_dias_sem_chuva": self.table["DiaSemChuva_sum"].sum() / n if n else float("nan"),
+        }
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from projeto_vigia.config import HIST_MAX_BINS, KDE_GRID_POINTS, STATS_SAMPLE_ROWS
+from projeto_vigia.instrumentation import timed
+
+# Variáveis numéricas da aba Estatística
+STATS_COLUMNS = ["DiaSemChuva", "Precipitacao", "RiscoFogo", "FRP"]
+
+# ---------------------------
+# Amostragem
+# ---------------------------
+def sample_rows(values: np.ndarray, k: int = STATS_SAMPLE_ROWS, seed: int = 0) -> np.ndarray:
+    """Até k linhas de values sorteadas sem reposição (todas, se couberem)."""
+    if len(values) <= k:
+        return values
+    idx = np.sort(np.random.default_rng(seed).choice(len(values), k, replace=False))
+    return values[idx]
+
+# ---------------------------
+# Resumo, histograma, densidade, correlação
+# ---------------------------
+@timed("analytics.describe_numeric")
+def describe_numeric(df: pd.DataFrame, cols: Sequence[str], qs: Sequence[float] = (0.25, 0.5, 0.75),
+                     sample: int = STATS_SAMPLE_ROWS) -> pd.DataFrame:
+    """
+    Mesmo formato de DataFrame.describe().T. Contagem, média, desvio, mín. e
+    máx. são exatos; os quantis saem de uma amostra de até sample valores.
+    """
+    rows = {}
+    for col in cols:
+        x = df[col].to_numpy(dtype="float64")
+        x = x[~np.isnan(x)]
+        if not len(x):
+            rows[col] = {"count": 0.0}
+            continue
+        s = sample_rows(x, sample)
+        row = {"count": float(len(x)), "mean": x.mean(), "std": x.std(ddof=1) if len(x) > 1 else np.nan,
+               "min": x.min()}
+        row.update({f"{q * 100:g}%": v for q, v in zip(qs, np.quantile(s, qs))})
+        row["max"] = x.max()
+        rows[col] = row
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+def _finite(x) -> np.ndarray:
+    x = np.asarray(x, dtype="float64")
+    return x[np.isfinite(x)]
+
+@timed("analytics.histogram")
+def histogram(x, bins: Optional[int] = None, value_range: Optional[tuple[float, float]] = None) -> pd.DataFrame:
+    """
+    Histograma pré-calculado: inicio, fim, contagem e densidade (contagem / (n × largura)).
+    Sem bins, o número de intervalos é o maior entre Freedman-Diaconis e Sturges
+    (a regra "auto" do NumPy), limitado a HIST_MAX_BINS: colunas quase todas
+    zero, como Precipitacao, têm IQR nulo e não caem em uma barra só.
+    """
+    x = _finite(x)
+    if not len(x):
+        return pd.DataFrame(columns=["inicio", "fim", "contagem", "densidade"])
+    if bins is None:
+        edges = np.histogram_bin_edges(sample_rows(x, STATS_SAMPLE_ROWS), bins="auto", range=value_range)
+        bins = int(np.clip(len(edges) - 1, 1, HIST_MAX_BINS))
+    counts, edges = np.histogram(x, bins=bins, range=value_range)
+    width = np.diff(edges)
+    return pd.DataFrame({
+        "inicio": edges[:-1],
+        "fim": edges[1:],
+        "contagem": counts,
+        "densidade": counts / (counts.sum() * np.where(width > 0, width, 1.0)),
+    })
+
+def scott_bandwidth(x: np.ndarray, n: Optional[int] = None) -> float:
+    """
+    Regra de Scott (a mesma do transform_density do Vega-Lite). x pode ser uma
+    amostra: a dispersão sai dela e n é o tamanho da população.
+    """
+    n = n or len(x)
+    sd = np.std(x, ddof=1) if len(x) > 1 else 0.0
+    iqr = np.subtract(*np.quantile(x, [0.75, 0.25])) if len(x) > 1 else 0.0
+    spread = min(sd, iqr / 1.34) if iqr > 0 else sd
+    return 1.06 * spread * n ** (-1 / 5) if spread > 0 else 1.0
+
+@timed("analytics.kde")
+def kde(x, grid_points: int = KDE_GRID_POINTS, bandwidth: Optional[float] = None,
+        value_range: Optional[tuple[float, float]] = None) -> pd.DataFrame:
+    """
+    Densidade gaussiana em grid_points pontos (x, densidade). Os valores são
+    distribuídos linearmente entre os dois pontos vizinhos da grade e a
+    convolução com o núcleo é feita por FFT: O(n + g log g), independente
+    do tamanho da amostra depois da binagem.
+    """
+    x = _finite(x)
+    if not len(x):
+        return pd.DataFrame(columns=["x", "densidade"])
+    h = bandwidth or scott_bandwidth(sample_rows(x, STATS_SAMPLE_ROWS), len(x))
+    lo, hi = value_range or (x.min() - 3 * h, x.max() + 3 * h)
+    g = grid_points
+    grid = np.linspace(lo, hi, g)
+    delta = grid[1] - grid[0]
+
+    # binagem linear
+    pos = np.clip((x - lo) / delta, 0, g - 1)
+    left = np.minimum(pos.astype(np.int64), g - 2)
+    frac = pos - left
+    weights = np.bincount(left, 1 - frac, minlength=g) + np.bincount(left + 1, frac, minlength=g)
+
+    # núcleo amostrado na grade; zero-padding evita a convolução circular
+    m = int(min(np.ceil(4 * h / delta), g - 1))
+    kernel = np.exp(-0.5 * (np.arange(-m, m + 1) * delta / h) ** 2)
+    size = 1 << int(np.ceil(np.log2(g + 2 * m + 1)))
+    conv = np.fft.irfft(np.fft.rfft(weights, size) * np.fft.rfft(kernel, size), size)[m:m + g]
+    dens = np.maximum(conv, 0) / (len(x) * h * np.sqrt(2 * np.pi))
+    return pd.DataFrame({"x": grid, "densidade": dens})
+
+@timed("analytics.correlation")
+def correlation(df: pd.DataFrame, cols: Sequence[str]) -> pd.DataFrame:
+    """Correlação de Pearson sobre as linhas completas; formato longo (Var1, Var2, corr)."""
+    values = df[list(cols)].to_numpy(dtype="float64")
+    values = values[~np.isnan(values).any(axis=1)]
+    if len(values) > 1:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mat = np.corrcoef(values, rowvar=False)
+    else:
+        mat = np.full((len(cols), len(cols)), np.nan)
+    return pd.DataFrame({
+        "Var1": np.repeat(list(cols), len(cols)),
+        "Var2": np.tile(list(cols), len(cols)),
+        "corr": np.asarray(mat).ravel(),
+    })
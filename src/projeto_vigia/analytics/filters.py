@@ -1,15 +1,21 @@
 from __future__ import annotations
 import pandas as pd
 from typing import Iterable, Optional, Tuple
+from projeto_vigia.instrumentation import timed
 
 # ---------------------------
-# Datas e turno
+# Datas
 # ---------------------------
+@timed("analytics.filter_by_date_range")
 def filter_by_date_range(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
     # end é inclusivo no dia; somamos 1 dia e cortamos < end+1
     mask = (df["data_hora"] >= start) & (df["data_hora"] < (end + pd.Timedelta(days=1)))
     return df.loc[mask].copy()
 
+# ---------------------------
+# Turno
+# ---------------------------
+@timed("analytics.filter_by_turno")
 def filter_by_turno(df: pd.DataFrame,
                     preset: Optional[str] = None,
                     custom_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> pd.DataFrame:
@@ -17,8 +23,8 @@ def filter_by_turno(df: pd.DataFrame,
     preset ∈ {"Madrugada","Manhã","Tarde","Noite"} ou None
     custom_range: (t0, t1) somente horas/minutos importam (do mesmo dia fictício)
     """
-    dff = df.copy()
-    dff["hora"] = dff["data_hora"].dt.hour + dff["data_hora"].dt.minute/60.0
+    # hora fracionária calculada à parte: não copia a base nem cria coluna temporária
+    hora = df["data_hora"].dt.hour + df["data_hora"].dt.minute/60.0
 
     if preset:
         ranges = {
@@ -28,24 +34,25 @@ def filter_by_turno(df: pd.DataFrame,
             "Noite": (18.0, 24.0),
         }
         h0, h1 = ranges[preset]
-        mask = (dff["hora"] >= h0) & (dff["hora"] < h1)
-        return dff.loc[mask].drop(columns=["hora"])
+        mask = (hora >= h0) & (hora < h1)
+        return df.loc[mask].copy()
     if custom_range:
         t0, t1 = custom_range
         h0 = t0.hour + t0.minute/60.0
         h1 = t1.hour + t1.minute/60.0
         if h0 <= h1:
-            mask = (dff["hora"] >= h0) & (dff["hora"] < h1)
+            mask = (hora >= h0) & (hora < h1)
         else:
             # faixa cruzando meia-noite
-            mask = (dff["hora"] >= h0) | (dff["hora"] < h1)
-        return dff.loc[mask].drop(columns=["hora"])
+            mask = (hora >= h0) | (hora < h1)
+        return df.loc[mask].copy()
 
-    return dff.drop(columns=["hora"])
+    return df.copy()
 
 # ---------------------------
 # Bioma
 # ---------------------------
+@timed("analytics.filter_by_biomes")
 def filter_by_biomes(df: pd.DataFrame, biomas: Optional[Iterable[str]]) -> pd.DataFrame:
     if not biomas:
         return df
@@ -80,6 +87,7 @@ def apply_numeric_filter(series: pd.Series, operator: str,
         return (series >= lo) & (series <= hi)
     return pd.Series(True, index=series.index)
 
+@timed("analytics.filter_numeric_columns")
 def filter_numeric_columns(df: pd.DataFrame,
                            rules: dict) -> pd.DataFrame:
     """
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from projeto_vigia.instrumentation import timed
+
+# ---------------------------
+# Grade regular lat/lon (tiling em graus)
+# ---------------------------
+def cell_size_for_extent(lat: np.ndarray, lon: np.ndarray, target_cells: int = 5000,
+                         min_deg: float = 0.01, max_deg: float = 2.0) -> float:
+    """
+    Tamanho de célula (graus) para que a extensão dos pontos caiba em ~target_cells
+    células: recortes pequenos ficam com grade fina, o país inteiro com grade grossa.
+    """
+    if len(lat) == 0:
+        return max_deg
+    area = max(float(np.ptp(lat)), min_deg) * max(float(np.ptp(lon)), min_deg)
+    size = float(np.sqrt(area / max(target_cells, 1)))
+    return float(np.clip(size, min_deg, max_deg))
+
+def grid_cells(lat: np.ndarray, lon: np.ndarray, cell_deg: float) -> np.ndarray:
+    """Chave int64 da célula de cada ponto (linha, coluna empacotadas)."""
+    iy = np.floor((np.asarray(lat, dtype=np.float64) + 90.0) / cell_deg).astype(np.int64)
+    ix = np.floor((np.asarray(lon, dtype=np.float64) + 180.0) / cell_deg).astype(np.int64)
+    return iy * 1_000_000 + ix
+
+def cell_centers(keys: np.ndarray, cell_deg: float) -> tuple[np.ndarray, np.ndarray]:
+    iy, ix = np.divmod(keys, 1_000_000)
+    return (iy + 0.5) * cell_deg - 90.0, (ix + 0.5) * cell_deg - 180.0
+
+@timed("analytics.aggregate_grid")
+def aggregate_grid(df: pd.DataFrame, cell_deg: float) -> pd.DataFrame:
+    """
+    Agrega focos por célula: contagem, RiscoFogo médio e FRP máximo/médio.
+    Ordena as chaves uma vez e reduz com reduceat (sem groupby/objetos Python).
+    """
+    cols = ["lat", "lon", "focos", "risco_medio", "frp_max", "frp_medio"]
+    if df.empty:
+        return pd.DataFrame(columns=cols)
+    keys = grid_cells(df["lat"].to_numpy(), df["lon"].to_numpy(), cell_deg)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+
+    risco = df["RiscoFogo"].to_numpy(dtype=np.float64)[order]
+    frp = df["FRP"].to_numpy(dtype=np.float64)[order]
+    frp_ok = ~np.isnan(frp)
+    frp_n = np.add.reduceat(frp_ok.astype(np.int64), starts)
+    frp_sum = np.add.reduceat(np.where(frp_ok, frp, 0.0), starts)
+    frp_max = np.maximum.reduceat(np.where(frp_ok, frp, -np.inf), starts)
+
+    lat_c, lon_c = cell_centers(keys[starts], cell_deg)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame({
+            "lat": lat_c,
+            "lon": lon_c,
+            "focos": counts,
+            "risco_medio": np.add.reduceat(risco, starts) / counts,
+            "frp_max": np.where(frp_n > 0, frp_max, np.nan),
+            "frp_medio": frp_sum / frp_n,
+        })
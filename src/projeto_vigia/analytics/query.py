@@ -0,0 +1,195 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from typing import Iterable, Mapping, Optional
+from projeto_vigia.domain.preprocessing import concat_normalized
+from projeto_vigia.instrumentation import stage, timed
+from .spatial import SpatialIndex
+
+# Turnos em minutos do dia: [início, fim)
+TURNO_RANGES = {
+    "Madrugada": (0, 360),
+    "Manhã": (360, 720),
+    "Tarde": (720, 1080),
+    "Noite": (1080, 1440),
+}
+
+NUMERIC_COLS = ["DiaSemChuva", "Precipitacao", "RiscoFogo", "FRP"]
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """Identificador barato da carga (a base só cresce por append)."""
+    if df.empty:
+        return "vazio"
+    return f"{len(df)}:{df['data_hora'].min()}:{df['data_hora'].max()}"
+
+def _numeric_mask(values: np.ndarray, operator: Optional[str],
+                  a: Optional[float] = None,
+                  b: Optional[float] = None) -> Optional[np.ndarray]:
+    """
+    Mesmo contrato de filters.apply_numeric_filter, sobre arrays NumPy.
+    Retorna None quando a regra não filtra nada.
+    """
+    if operator == "=" and a is not None:
+        return values == a
+    if operator == "<" and a is not None:
+        return values < a
+    if operator == ">" and a is not None:
+        return values > a
+    if operator == "<=" and a is not None:
+        return values <= a
+    if operator == ">=" and a is not None:
+        return values >= a
+    if operator == "entre" and a is not None and b is not None:
+        lo, hi = min(a, b), max(a, b)
+        return (values >= lo) & (values <= hi)
+    return None
+
+def _minute_of_day(t) -> int:
+    return t.hour * 60 + t.minute
+
+class FocosIndex:
+    """
+    Índices pré-calculados sobre a base normalizada, construídos uma vez por carga:
+    - data_hora ordenada (recorte de período por busca binária);
+    - códigos de categoria de estado/Bioma (seleção por tabela de consulta);
+    - minuto do dia (turno/faixa horária);
+    - colunas numéricas como arrays NumPy;
+    - índice espacial (criado no primeiro filtro por região de interesse).
+    Uma consulta combina tudo numa única máscara e materializa o resultado com um só take.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        with stage("analytics.index_build", rows_in=len(df)):
+            self._build(df)
+
+    def _build(self, df: pd.DataFrame) -> None:
+        self.version = dataset_version(df)
+        if df["data_hora"].is_monotonic_increasing:
+            # já ordenada (ex.: base publicada por services.shared_dataset): sem cópia
+            self.df = df.reset_index(drop=True)
+        else:
+            order = np.argsort(df["data_hora"].to_numpy(), kind="stable")
+            self.df = df.take(order).reset_index(drop=True)
+
+        dh = self.df["data_hora"]
+        self._ts = dh.to_numpy()
+        self._minute = (dh.dt.hour * 60 + dh.dt.minute).to_numpy(dtype=np.int16)
+        self._codes = {}
+        self._categories = {}
+        for col in ("estado_nome", "Bioma"):
+            cat = self.df[col].astype("category")
+            self._codes[col] = cat.cat.codes.to_numpy()
+            self._categories[col] = cat.cat.categories
+        self._numeric = {c: self.df[c].to_numpy() for c in NUMERIC_COLS if c in self.df.columns}
+        self._spatial: SpatialIndex | None = None
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def last_ts(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self._ts[-1]) if len(self._ts) else None
+
+    # ---------------------------
+    # Atualização incremental (cada operação devolve um novo índice; o atual
+    # continua válido para as sessões que ainda o usam)
+    # ---------------------------
+    @timed("analytics.index_append")
+    def append(self, df_new: pd.DataFrame) -> "FocosIndex":
+        if df_new.empty:
+            return self
+        return FocosIndex(concat_normalized([self.df, df_new]))
+
+    @timed("analytics.index_evict")
+    def evict_before(self, cutoff: pd.Timestamp) -> "FocosIndex":
+        """
+        Descarta os focos anteriores à hora de cutoff (a base está ordenada: é
+        um corte do início). O corte é na hora cheia, como em
+        DailyRollup.evict_before, para que os dois continuem concordando.
+        """
+        cutoff = pd.Timestamp(cutoff).floor("h")
+        lo = int(np.searchsorted(self._ts, np.datetime64(cutoff), side="left"))
+        if lo == 0:
+            return self
+        return FocosIndex(self.df.iloc[lo:])
+
+    @property
+    def spatial(self) -> SpatialIndex:
+        if self._spatial is None:
+            self._spatial = SpatialIndex.from_frame(self.df)
+        return self._spatial
+
+    # ---------------------------
+    # Máscaras parciais
+    # ---------------------------
+    def date_slice(self, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> slice:
+        # end é inclusivo no dia, como em filters.filter_by_date_range
+        lo = 0 if start is None else np.searchsorted(self._ts, np.datetime64(pd.Timestamp(start)), side="left")
+        if end is None:
+            hi = len(self._ts)
+        else:
+            stop = pd.Timestamp(end) + pd.Timedelta(days=1)
+            hi = np.searchsorted(self._ts, np.datetime64(stop), side="left")
+        return slice(int(lo), int(hi))
+
+    def _category_mask(self, col: str, values: Iterable[str], rows: slice) -> np.ndarray:
+        cats = self._categories[col]
+        lookup = np.zeros(len(cats) + 1, dtype=bool)  # última posição: código -1 (nulo)
+        idx = cats.get_indexer(list(values))
+        lookup[idx[idx >= 0]] = True
+        return lookup[self._codes[col][rows]]
+
+    def _turno_mask(self, preset: Optional[str], custom_range, rows: slice) -> Optional[np.ndarray]:
+        minute = self._minute[rows]
+        if preset:
+            m0, m1 = TURNO_RANGES[preset]
+            return (minute >= m0) & (minute < m1)
+        if custom_range and custom_range[0] is not None and custom_range[1] is not None:
+            m0, m1 = _minute_of_day(custom_range[0]), _minute_of_day(custom_range[1])
+            if m0 <= m1:
+                return (minute >= m0) & (minute < m1)
+            # faixa cruzando meia-noite
+            return (minute >= m0) | (minute < m1)
+        return None
+
+    # ---------------------------
+    # Consulta
+    # ---------------------------
+    @timed("analytics.index_positions")
+    def positions(self, spec: Mapping) -> np.ndarray:
+        """
+        spec segue o dicionário de ui.sidebar.render_sidebar:
+        estado, biomas, start, end, turno_preset, custom_time, numeric_rules
+        e roi ({"lat", "lon", "raio_km"} ou None).
+        Retorna as posições (em self.df) das linhas selecionadas, em ordem temporal.
+        """
+        rows = self.date_slice(spec.get("start"), spec.get("end"))
+        mask = np.ones(rows.stop - rows.start, dtype=bool)
+
+        estado = spec.get("estado")
+        if estado and estado != "Todos":
+            mask &= self._category_mask("estado_nome", [estado], rows)
+        if spec.get("biomas"):
+            mask &= self._category_mask("Bioma", spec["biomas"], rows)
+
+        turno = self._turno_mask(spec.get("turno_preset"), spec.get("custom_time"), rows)
+        if turno is not None:
+            mask &= turno
+
+        for col, cfg in (spec.get("numeric_rules") or {}).items():
+            m = _numeric_mask(self._numeric[col][rows], cfg.get("op"), cfg.get("a"), cfg.get("b"))
+            if m is not None:
+                mask &= m
+
+        roi = spec.get("roi")
+        if roi:
+            mask &= self.spatial.within_radius_mask(roi["lat"], roi["lon"], roi["raio_km"])[rows]
+
+        return rows.start + np.flatnonzero(mask)
+
+    @timed("analytics.index_take")
+    def take(self, positions: np.ndarray) -> pd.DataFrame:
+        return self.df.take(positions)
+
+    def query(self, spec: Mapping) -> pd.DataFrame:
+        return self.take(self.positions(spec))
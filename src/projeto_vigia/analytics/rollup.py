@@ -0,0 +1,107 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from typing import Mapping
+from projeto_vigia.domain.preprocessing import concat_normalized
+from projeto_vigia.instrumentation import timed
+from .aggregations import CUBE_DIMS, FocosCube, aggregate_stats, rollup_stats
+from .query import TURNO_RANGES
+
+ROLLUP_DIMS = CUBE_DIMS + ["hora"]
+
+class DailyRollup:
+    """
+    Tabela materializada (dia × estado × município × Bioma × hora) com as mesmas
+    estatísticas suficientes do FocosCube. Construída junto com a carga da base e
+    atualizada por append; consultas de período longo sem regras por linha
+    são respondidas daqui, sem tocar nos focos brutos.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        self.table = table
+        self._data = table["data"].to_numpy()
+        self._hora = table["hora"].to_numpy()
+
+    @staticmethod
+    def _aggregate(df: pd.DataFrame) -> pd.DataFrame:
+        dh = df["data_hora"]
+        keys = ([dh.dt.normalize().rename("data")]
+                + [df[c] for c in CUBE_DIMS[1:]]
+                + [dh.dt.hour.astype("int8").rename("hora")])
+        return aggregate_stats(df, keys)
+
+    @classmethod
+    @timed("analytics.rollup_from_frame")
+    def from_frame(cls, df: pd.DataFrame) -> "DailyRollup":
+        return cls(cls._aggregate(df))
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @timed("analytics.rollup_append")
+    def append(self, df_new: pd.DataFrame) -> "DailyRollup":
+        """Incorpora linhas novas: agrega só o delta e o soma à tabela existente."""
+        if df_new.empty:
+            return self
+        merged = concat_normalized([self.table, self._aggregate(df_new)])
+        return DailyRollup(rollup_stats(merged, ROLLUP_DIMS))
+
+    @timed("analytics.rollup_evict")
+    def evict_before(self, cutoff: pd.Timestamp) -> "DailyRollup":
+        """Descarta as horas anteriores à hora de cutoff (mesmo corte de FocosIndex.evict_before)."""
+        start = self._data + self._hora.astype("timedelta64[h]")
+        keep = start >= np.datetime64(pd.Timestamp(cutoff).floor("h"))
+        if keep.all():
+            return self
+        return DailyRollup(self.table[keep].reset_index(drop=True))
+
+    # ---------------------------
+    # Roteamento
+    # ---------------------------
+    @staticmethod
+    def _hour_range(spec: Mapping) -> tuple[int, int] | None | bool:
+        """(h0, h1) em horas cheias, None sem filtro de horário, False se não alinhado à hora."""
+        if spec.get("turno_preset"):
+            m0, m1 = TURNO_RANGES[spec["turno_preset"]]
+            return m0 // 60, m1 // 60
+        custom = spec.get("custom_time")
+        if custom and custom[0] is not None and custom[1] is not None:
+            t0, t1 = custom
+            if t0.minute or t1.minute:
+                return False
+            return t0.hour, t1.hour
+        return None
+
+    def can_answer(self, spec: Mapping) -> bool:
+        if spec.get("roi") or spec.get("eventos"):
+            return False
+        for cfg in (spec.get("numeric_rules") or {}).values():
+            if cfg.get("op") not in (None, "(sem filtro)"):
+                return False
+        for key in ("start", "end"):
+            ts = spec.get(key)
+            if ts is not None and pd.Timestamp(ts) != pd.Timestamp(ts).normalize():
+                return False
+        return self._hour_range(spec) is not False
+
+    @timed("analytics.rollup_cube")
+    def cube(self, spec: Mapping) -> FocosCube:
+        """Cubo equivalente a FocosCube.from_frame(index.query(spec)); requer can_answer(spec)."""
+        mask = np.ones(len(self.table), dtype=bool)
+        if spec.get("start") is not None:
+            mask &= self._data >= np.datetime64(pd.Timestamp(spec["start"]))
+        if spec.get("end") is not None:
+            mask &= self._data <= np.datetime64(pd.Timestamp(spec["end"]))
+        estado = spec.get("estado")
+        if estado and estado != "Todos":
+            mask &= (self.table["estado_nome"] == estado).to_numpy()
+        if spec.get("biomas"):
+            mask &= self.table["Bioma"].isin(list(spec["biomas"])).to_numpy()
+        hours = self._hour_range(spec)
+        if hours:
+            h0, h1 = hours
+            if h0 <= h1:
+                mask &= (self._hora >= h0) & (self._hora < h1)
+            else:
+                mask &= (self._hora >= h0) | (self._hora < h1)
+        return FocosCube(rollup_stats(self.table[mask], CUBE_DIMS))
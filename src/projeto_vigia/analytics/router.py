@@ -0,0 +1,54 @@
+from __future__ import annotations
+import pandas as pd
+from typing import Mapping
+from projeto_vigia.domain.preprocessing import fire_events
+from projeto_vigia.instrumentation import timed
+from .aggregations import FocosCube
+from .cache import ResultCache
+from .query import FocosIndex
+from .rollup import DailyRollup
+
+class QueryRouter:
+    """
+    Decide de onde sai cada consulta: agregados vêm do DailyRollup quando os
+    filtros permitem (sem regras numéricas por linha nem região de interesse,
+    horário em horas cheias);
+    caso contrário, dos focos brutos via FocosIndex. Com spec["eventos"], as
+    revisitas do satélite são consolidadas em eventos antes de agregar.
+
+    Com um ResultCache, guarda por (versão da base, FilterSpec.key()) as
+    posições selecionadas, os eventos e o cubo; spec precisa ser um FilterSpec.
+    """
+
+    def __init__(self, index: FocosIndex, rollup: DailyRollup | None = None,
+                 cache: ResultCache | None = None):
+        self.index = index
+        self.rollup = rollup
+        self.cache = cache
+
+    def _cached(self, spec: Mapping, name: str, compute):
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute((self.index.version, spec.key(), name), compute)
+
+    def positions(self, spec: Mapping):
+        return self._cached(spec, "posicoes", lambda: self.index.positions(spec))
+
+    @timed("analytics.router_rows")
+    def rows(self, spec: Mapping) -> pd.DataFrame:
+        if spec.get("eventos"):
+            return self._cached(spec, "eventos", lambda: fire_events(self.index.take(self.positions(spec))))
+        # as linhas não são guardadas: o take sobre as posições em cache é barato
+        return self.index.take(self.positions(spec))
+
+    def source(self, spec: Mapping) -> str:
+        """De onde sai o cubo de spec: "rollup", "eventos" ou "focos" (sem estado: o router é compartilhado)."""
+        if self.rollup is not None and self.rollup.can_answer(spec):
+            return "rollup"
+        return "eventos" if spec.get("eventos") else "focos"
+
+    @timed("analytics.router_cube")
+    def cube(self, spec: Mapping) -> FocosCube:
+        if self.source(spec) == "rollup":
+            return self._cached(spec, "cubo", lambda: self.rollup.cube(spec))
+        return self._cached(spec, "cubo", lambda: FocosCube.from_frame(self.rows(spec)))
@@ -0,0 +1,187 @@
+from __future__ import annotations
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from projeto_vigia.domain.geo import KM_PER_DEG
+from projeto_vigia.instrumentation import timed
+from .grid import aggregate_grid, grid_cells
+
+# Granularidades de ranking sobre o cubo (dimensões do agrupamento);
+# "grade" agrega os focos em células lat/lon (ver grid_metrics)
+GRANULARITIES = {
+    "municipio": ["estado_nome", "municipio_nome", "Bioma"],
+    "bioma_estado": ["estado_nome", "Bioma"],
+    "estado": ["estado_nome"],
+    "bioma": ["Bioma"],
+    "grade": [],
+}
+NORMALIZATIONS = ("bruto", "minmax", "zscore", "rank")
+
+@dataclass(frozen=True)
+class ScoreTerm:
+    """
+    Parcela do score: weight × normalização(scale × metric [/ per]).
+    metric/per são colunas da tabela de métricas (focos, risco_medio, frp_medio,
+    frp_max, precip_media, dias_sem_chuva_med, focos_recentes, area_km2 ou
+    colunas extras, como população).
+    """
+    metric: str
+    weight: float
+    scale: float = 1.0
+    norm: str = "bruto"
+    per: Optional[str] = None
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    """
+    Pesos do score das regiões críticas. half_life_days liga o decaimento por
+    recência: focos_recentes = Σ focos × 0,5^(idade em dias / meia-vida), com a
+    idade contada a partir do último dia da tabela.
+    """
+    terms: tuple[ScoreTerm, ...]
+    granularity: str = "municipio"
+    half_life_days: Optional[float] = None
+    cell_deg: float = 0.25
+    tiebreak: tuple[str, ...] = field(default=("focos", "frp_medio"))
+
+    def __post_init__(self):
+        if self.granularity not in GRANULARITIES:
+            raise ValueError(f"Granularidade desconhecida: {self.granularity}")
+        for t in self.terms:
+            if t.norm not in NORMALIZATIONS:
+                raise ValueError(f"Normalização desconhecida: {t.norm}")
+
+    @classmethod
+    def from_mapping(cls, d: Mapping) -> "ScoringConfig":
+        """
+        Aceita o JSON de to_dict(), p.ex.
+        {"granularity": "grade", "half_life_days": 3,
+         "terms": [{"metric": "focos_recentes", "weight": 1, "norm": "minmax"}]}
+        """
+        terms = tuple(ScoreTerm(**t) for t in d.get("terms", ())) or DEFAULT_SCORING.terms
+        return cls(
+            terms=terms,
+            granularity=d.get("granularity", "municipio"),
+            half_life_days=d.get("half_life_days") or None,
+            cell_deg=float(d.get("cell_deg", 0.25)),
+            tiebreak=tuple(d.get("tiebreak", ("focos", "frp_medio"))),
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def key(self) -> str:
+        payload = json.dumps(self.to_dict(), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def dims(self) -> list[str]:
+        return GRANULARITIES[self.granularity]
+
+# Score histórico do painel: focos×0,6 + risco médio×100×0,25 + FRP médio×0,15
+DEFAULT_SCORING = ScoringConfig(terms=(
+    ScoreTerm("focos", 0.6),
+    ScoreTerm("risco_medio", 0.25, scale=100.0),
+    ScoreTerm("frp_medio", 0.15),
+))
+
+# ---------------------------
+# Métricas por região
+# ---------------------------
+def decay_weights(days, half_life_days: float, ref=None) -> np.ndarray:
+    """0,5^(idade/meia-vida) para cada dia; idade contada a partir de ref (padrão: o último dia)."""
+    d = pd.to_datetime(pd.Series(days)).to_numpy(dtype="datetime64[ns]")
+    ref = d.max() if ref is None else np.datetime64(pd.Timestamp(ref), "ns")
+    age = (ref - d) / np.timedelta64(1, "D")
+    return np.exp2(-np.maximum(age, 0.0) / half_life_days)
+
+@timed("analytics.grid_metrics")
+def grid_metrics(df: pd.DataFrame, cell_deg: float, half_life_days: Optional[float] = None) -> pd.DataFrame:
+    """
+    Métricas por célula da grade a partir dos focos: as de aggregate_grid,
+    área da célula em km² e, com meia-vida, focos_recentes.
+    """
+    out = aggregate_grid(df, cell_deg)
+    if out.empty:
+        return out.assign(area_km2=pd.Series(dtype=float))
+    lat = out["lat"].to_numpy()
+    out["area_km2"] = (cell_deg * KM_PER_DEG) ** 2 * np.cos(np.radians(lat))
+    if half_life_days:
+        # aggregate_grid devolve as células em ordem crescente de chave
+        keys = grid_cells(df["lat"].to_numpy(), df["lon"].to_numpy(), cell_deg)
+        _, inverse = np.unique(keys, return_inverse=True)
+        w = decay_weights(df["data_hora"].dt.normalize(), half_life_days)
+        out["focos_recentes"] = np.bincount(inverse, weights=w, minlength=len(out))
+    return out
+
+# ---------------------------
+# Score e seleção
+# ---------------------------
+def _normalize(x: np.ndarray, how: str) -> np.ndarray:
+    if how == "bruto":
+        return x
+    ok = ~np.isnan(x)
+    if not ok.any():
+        return x
+    if how == "minmax":
+        lo, hi = np.nanmin(x), np.nanmax(x)
+        return (x - lo) / (hi - lo) if hi > lo else np.where(ok, 0.0, np.nan)
+    if how == "zscore":
+        sd = np.nanstd(x)
+        return (x - np.nanmean(x)) / sd if sd > 0 else np.where(ok, 0.0, np.nan)
+    # rank: posição percentual em [0, 1] (empates com a posição média)
+    ranks = pd.Series(x).rank(method="average", pct=True).to_numpy()
+    return ranks
+
+def score_array(metrics: pd.DataFrame, config: ScoringConfig) -> np.ndarray:
+    """Score de cada linha de metrics; nulo em qualquer parcela deixa o score nulo."""
+    total = np.zeros(len(metrics))
+    for t in config.terms:
+        x = metrics[t.metric].to_numpy(dtype="float64") * t.scale
+        if t.per:
+            den = metrics[t.per].to_numpy(dtype="float64")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x = np.where(den > 0, x / den, np.nan)
+        total += t.weight * _normalize(x, t.norm)
+    return total
+
+def top_k_indices(score: np.ndarray, k: int, tiebreak: Sequence[np.ndarray] = ()) -> np.ndarray:
+    """
+    Índices das k maiores pontuações, em ordem decrescente (nulos por último),
+    com desempate pelas colunas de tiebreak. Seleção parcial (argpartition):
+    só os candidatos (k + empates no corte) são ordenados.
+    """
+    n = len(score)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    key = np.where(np.isnan(score), -np.inf, score)
+    if k < n:
+        kth = np.partition(key, n - k)[n - k]
+        cand = np.flatnonzero(key >= kth)
+    else:
+        cand = np.arange(n)
+    # lexsort: última chave é a principal; negativas para ordem decrescente
+    cols = [np.nan_to_num(-np.asarray(c, dtype="float64")[cand], nan=np.inf) for c in reversed(tiebreak)]
+    order = np.lexsort(cols + [-key[cand]])
+    return cand[order[:k]]
+
+@timed("analytics.rank_regions")
+def rank_regions(metrics: pd.DataFrame, config: ScoringConfig = DEFAULT_SCORING, top_n: int = 5,
+                 extra: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Top top_n regiões pelo score de config. extra: colunas adicionais por
+    região (p.ex. população ou área dos municípios), unidas pelas colunas em
+    comum, para termos com per.
+    """
+    if extra is not None:
+        on = [c for c in extra.columns if c in metrics.columns]
+        metrics = metrics.merge(extra, on=on, how="left")
+    score = score_array(metrics, config)
+    idx = top_k_indices(score, top_n, [metrics[c].to_numpy() for c in config.tiebreak if c in metrics])
+    out = metrics.iloc[idx].copy()
+    out["score"] = score[idx]
+    return out
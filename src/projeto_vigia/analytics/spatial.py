@@ -0,0 +1,87 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from projeto_vigia.domain.geo import EARTH_RADIUS_KM, KM_PER_DEG, haversine_km
+from projeto_vigia.instrumentation import timed
+from .grid import grid_cells
+
+class SpatialIndex:
+    """
+    Índice em grade sobre lat/lon, construído uma vez por base: os pontos são
+    ordenados pela chave da célula, de modo que cada linha de células de uma
+    caixa de busca vira um único intervalo contíguo (duas buscas binárias).
+    Os candidatos da caixa são confirmados por haversine.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, cell_deg: float = 0.1):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.cell_deg = cell_deg
+        keys = grid_cells(self.lat, self.lon, cell_deg)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, cell_deg: float = 0.1) -> "SpatialIndex":
+        return cls(df["lat"].to_numpy(), df["lon"].to_numpy(), cell_deg)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _box_candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        dlat = radius_km / KM_PER_DEG
+        # a longitude encolhe com a latitude: usa a borda da caixa mais próxima do polo
+        max_lat = min(abs(lat) + dlat, 89.9)
+        dlon = radius_km / (KM_PER_DEG * np.cos(np.radians(max_lat)))
+        iy0, iy1 = np.floor((np.array([lat - dlat, lat + dlat]) + 90.0) / self.cell_deg).astype(np.int64)
+        ix0, ix1 = np.floor((np.array([lon - dlon, lon + dlon]) + 180.0) / self.cell_deg).astype(np.int64)
+        rows = np.arange(iy0, iy1 + 1, dtype=np.int64) * 1_000_000
+        starts = np.searchsorted(self._keys, rows + ix0, side="left")
+        stops = np.searchsorted(self._keys, rows + ix1, side="right")
+        if not len(starts):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._order[a:b] for a, b in zip(starts, stops)])
+
+    @timed("analytics.spatial_query_radius")
+    def query_radius(self, lat: float, lon: float, radius_km: float,
+                     return_distance: bool = False):
+        """Posições dos pontos a até radius_km de (lat, lon), em ordem crescente."""
+        cand = self._box_candidates(lat, lon, radius_km)
+        dist = haversine_km(lat, lon, self.lat[cand], self.lon[cand])
+        keep = dist <= radius_km
+        cand, dist = cand[keep], dist[keep]
+        order = np.argsort(cand)
+        if return_distance:
+            return cand[order], dist[order]
+        return cand[order]
+
+    @timed("analytics.spatial_query_knn")
+    def query_knn(self, lat: float, lon: float, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        k vizinhos mais próximos: busca por raio dobrando até juntar k pontos;
+        todo ponto fora do raio final está mais longe que os encontrados.
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        radius = self.cell_deg * KM_PER_DEG
+        while True:
+            pos, dist = self.query_radius(lat, lon, radius, return_distance=True)
+            if len(pos) >= k or radius > np.pi * EARTH_RADIUS_KM:
+                break
+            radius *= 2
+        best = np.argsort(dist, kind="stable")[:k]
+        return pos[best], dist[best]
+
+    def within_radius_mask(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.query_radius(lat, lon, radius_km)] = True
+        return mask
+
+def municipality_centroids(df: pd.DataFrame) -> pd.DataFrame:
+    """Centro (média dos focos) de cada município/estado, para escolher o centro de uma região de interesse."""
+    out = (df.groupby(["municipio_nome", "estado_nome"], observed=True)[["lat", "lon"]]
+             .mean()
+             .reset_index())
+    out["rotulo"] = out["municipio_nome"].astype(str) + "/" + out["estado_nome"].astype(str)
+    return out.sort_values("rotulo").reset_index(drop=True)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from datetime import time
+from typing import Any, Iterator, Optional
+
+import pandas as pd
+
+_NO_FILTER = (None, "(sem filtro)")
+
+def _to_time(value) -> Optional[time]:
+    if value is None:
+        return None
+    if isinstance(value, time):
+        return value
+    if isinstance(value, str):
+        return time.fromisoformat(value)
+    return pd.Timestamp(value).time()
+
+def _to_ts(value) -> Optional[pd.Timestamp]:
+    return None if value is None else pd.Timestamp(value)
+
+@dataclass(frozen=True, eq=False)
+class FilterSpec(Mapping):
+    """
+    Filtros de uma análise, no mesmo formato do dicionário de
+    ui.sidebar.render_sidebar (e lido por FocosIndex/DailyRollup como Mapping).
+    Imutável e normalizado: regras "(sem filtro)" são descartadas e listas viram
+    tuplas ordenadas, de modo que filtros equivalentes têm a mesma key().
+    """
+    estado: str = "Todos"
+    biomas: tuple[str, ...] = ()
+    start: Optional[pd.Timestamp] = None
+    end: Optional[pd.Timestamp] = None
+    turno_preset: Optional[str] = None
+    custom_time: Optional[tuple[time, time]] = None
+    numeric_rules: tuple[tuple[str, str, Optional[float], Optional[float]], ...] = ()
+    roi: Optional[tuple[float, float, float]] = None
+    eventos: bool = False
+
+    @classmethod
+    def from_mapping(cls, d: Mapping) -> "FilterSpec":
+        """Aceita o estado da sidebar ou o JSON de to_dict() (datas/horas como texto)."""
+        rules = []
+        for col, cfg in sorted((d.get("numeric_rules") or {}).items()):
+            op = cfg.get("op")
+            if op in _NO_FILTER:
+                continue
+            a, b = cfg.get("a"), cfg.get("b")
+            rules.append((col, op,
+                          None if a is None else float(a),
+                          None if (b is None or op != "entre") else float(b)))
+        custom = d.get("custom_time")
+        if custom and (custom[0] is None or custom[1] is None):
+            custom = None
+        roi = d.get("roi")
+        return cls(
+            estado=d.get("estado") or "Todos",
+            biomas=tuple(sorted(d.get("biomas") or ())),
+            start=_to_ts(d.get("start")),
+            end=_to_ts(d.get("end")),
+            turno_preset=d.get("turno_preset") or None,
+            custom_time=(_to_time(custom[0]), _to_time(custom[1])) if custom else None,
+            numeric_rules=tuple(rules),
+            roi=(float(roi["lat"]), float(roi["lon"]), float(roi["raio_km"])) if roi else None,
+            eventos=bool(d.get("eventos", False)),
+        )
+
+    # ---------------------------
+    # Mapping: mesma interface do dicionário da sidebar
+    # ---------------------------
+    def __getitem__(self, key: str) -> Any:
+        if key == "numeric_rules":
+            return {col: {"op": op, "a": a, "b": b} for col, op, a, b in self.numeric_rules}
+        if key == "roi":
+            return None if self.roi is None else dict(zip(("lat", "lon", "raio_km"), self.roi))
+        if key == "biomas":
+            return list(self.biomas)
+        if key not in self._keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    @classmethod
+    def _keys(cls) -> tuple[str, ...]:
+        return tuple(f.name for f in fields(cls))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FilterSpec):
+            return self.key() == other.key()
+        return NotImplemented
+
+    def to_dict(self) -> dict:
+        """Versão serializável em JSON (ida e volta com from_mapping)."""
+        return {
+            "estado": self.estado,
+            "biomas": list(self.biomas),
+            "start": self.start.isoformat() if self.start is not None else None,
+            "end": self.end.isoformat() if self.end is not None else None,
+            "turno_preset": self.turno_preset,
+            "custom_time": [t.isoformat() for t in self.custom_time] if self.custom_time else None,
+            "numeric_rules": self["numeric_rules"],
+            "roi": self["roi"],
+            "eventos": self.eventos,
+        }
+
+    def key(self) -> str:
+        """Hash canônico dos filtros (sha256 do JSON ordenado)."""
+        payload = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
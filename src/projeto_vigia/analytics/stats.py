@@ -0,0 +1,194 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from projeto_vigia.config import ANOMALY_MIN_FOCOS, ANOMALY_WINDOW_DAYS, ANOMALY_Z
+from projeto_vigia.instrumentation import timed
+
+ANOMALY_COLUMNS = ["focos_dia", "media_hist", "desvio_hist", "z", "percentil",
+                   "delta_dia", "delta_semana", "dias_hist"]
+
+# ---------------------------
+# Contagens diárias por região em matriz densa (região × dia)
+# ---------------------------
+@dataclass
+class DailyCounts:
+    """
+    Focos por região e dia numa matriz (regiões × dias), com zeros nos dias sem
+    foco. Janelas móveis e variações viram somas cumulativas e diferenças de
+    colunas, sem groupby por região.
+    """
+    regions: pd.DataFrame      # uma linha por região (colunas de dims)
+    days: pd.DatetimeIndex     # dias consecutivos
+    counts: np.ndarray         # int64 (len(regions), len(days))
+
+    @classmethod
+    @timed("analytics.daily_counts")
+    def from_table(cls, table: pd.DataFrame, dims: Sequence[str] = ("estado_nome", "municipio_nome"),
+                   weight: Optional[str] = "focos", start=None, end=None) -> "DailyCounts":
+        """
+        table: linhas com data (dia) e dims, como FocosCube.table; weight=None conta linhas.
+        start/end fixam o eixo de dias (padrão: primeiro e último dia da tabela).
+        """
+        dims = list(dims)
+        day = pd.to_datetime(table["data"]).dt.normalize().to_numpy(dtype="datetime64[D]")
+        d0 = np.datetime64(pd.Timestamp(start), "D") if start is not None else (day.min() if len(day) else None)
+        d1 = np.datetime64(pd.Timestamp(end), "D") if end is not None else (day.max() if len(day) else None)
+        if d0 is None or d1 is None or d1 < d0:
+            return cls(pd.DataFrame(columns=dims), pd.DatetimeIndex([], name="data"),
+                       np.zeros((0, 0), dtype=np.int64))
+        inside = (day >= d0) & (day <= d1)
+        if not inside.all():
+            table, day = table[inside], day[inside]
+        day_idx = (day - d0).astype(np.int64)
+        n_days = int((d1 - d0).astype(np.int64)) + 1
+        codes, regions = pd.MultiIndex.from_frame(table[dims]).factorize() if len(dims) > 1 \
+            else pd.factorize(table[dims[0]])
+        w = None if weight is None else table[weight].to_numpy()
+        flat = np.bincount(codes * n_days + day_idx, weights=w, minlength=len(regions) * n_days)
+        regions = (regions.to_frame(index=False, name=dims) if isinstance(regions, pd.MultiIndex)
+                   else pd.DataFrame({dims[0]: regions}))
+        days = pd.date_range(pd.Timestamp(d0), periods=n_days, freq="D", name="data")
+        return cls(regions, days, flat.astype(np.int64).reshape(len(regions), n_days))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dims: Sequence[str] = ("estado_nome", "municipio_nome")) -> "DailyCounts":
+        """A partir dos focos (data_hora)."""
+        table = df[list(dims)].assign(data=df["data_hora"].dt.normalize())
+        return cls.from_table(table, dims, weight=None)
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def day_index(self, day) -> int:
+        """Coluna de um dia (negativos contam do fim, como em listas)."""
+        if isinstance(day, (int, np.integer)):
+            return int(day) % len(self.days)
+        return int(self.days.get_loc(pd.Timestamp(day).normalize()))
+
+    # ---------------------------
+    # Janelas e variações (matrizes do mesmo formato de counts)
+    # ---------------------------
+    def rolling_sum(self, window: int) -> np.ndarray:
+        """Soma dos últimos window dias, incluindo o próprio (janelas incompletas no início)."""
+        c = np.cumsum(self.counts, axis=1)
+        out = c.copy()
+        out[:, window:] -= c[:, :-window]
+        return out
+
+    def rolling_mean(self, window: int) -> np.ndarray:
+        n = np.minimum(np.arange(1, len(self.days) + 1), window)
+        return self.rolling_sum(window) / n
+
+    def delta(self, lag: int = 1) -> np.ndarray:
+        """Variação em relação a lag dias antes (dia a dia com lag=1); zero onde não há histórico."""
+        out = np.zeros_like(self.counts)
+        out[:, lag:] = self.counts[:, lag:] - self.counts[:, :-lag]
+        return out
+
+    def week_over_week(self) -> np.ndarray:
+        """Focos dos últimos 7 dias menos os dos 7 anteriores."""
+        s = self.rolling_sum(7)
+        out = np.zeros_like(s)
+        out[:, 7:] = s[:, 7:] - s[:, :-7]
+        return out
+
+    def to_frame(self, values: np.ndarray, name: str) -> pd.DataFrame:
+        """Matriz (regiões × dias) em formato longo: dims, data, name."""
+        long = self.regions.loc[self.regions.index.repeat(len(self.days))].reset_index(drop=True)
+        long["data"] = np.tile(self.days.to_numpy(), len(self.regions))
+        long[name] = values.ravel()
+        return long
+
+    # ---------------------------
+    # Anomalias
+    # ---------------------------
+    @timed("analytics.daily_anomalies")
+    def anomalies(self, day=-1, window: int = ANOMALY_WINDOW_DAYS) -> pd.DataFrame:
+        """
+        Focos de cada região no dia contra os window dias anteriores:
+        média/desvio do histórico, z-score e percentil do dia no histórico.
+        O desvio tem piso de √média (mínimo 1): regiões quase sem histórico
+        não ganham z-score infinito com um único foco.
+        """
+        t = self.day_index(day)
+        hist = self.counts[:, max(t - window, 0):t].astype("float64")
+        today = self.counts[:, t]
+        if hist.shape[1]:
+            mean = hist.mean(axis=1)
+            std = hist.std(axis=1)
+            below = (hist < today[:, None]).sum(axis=1) + 0.5 * (hist == today[:, None]).sum(axis=1)
+            pct = 100.0 * below / hist.shape[1]
+        else:
+            mean = std = np.zeros(len(today))
+            pct = np.full(len(today), np.nan)
+        z = (today - mean) / np.maximum(std, np.sqrt(np.maximum(mean, 1.0)))
+        wow = self.week_over_week()[:, t]
+        values = [today, mean, std, z, pct, self.delta(1)[:, t], wow, hist.shape[1]]
+        return self.regions.assign(**dict(zip(ANOMALY_COLUMNS, values)))
+
+@timed("analytics.spiking_regions")
+def spiking_regions(table: pd.DataFrame, day=None, dims: Sequence[str] = ("estado_nome", "municipio_nome"),
+                    window: int = ANOMALY_WINDOW_DAYS, z_min: float = ANOMALY_Z,
+                    min_focos: int = ANOMALY_MIN_FOCOS, top_n: int | None = 20) -> pd.DataFrame:
+    """
+    Regiões "em alta" no dia (padrão: o último da tabela; dias posteriores são ignorados): z-score ≥ z_min e pelo
+    menos min_focos focos, ordenadas pelo z-score. table como FocosCube.table.
+    """
+    counts = DailyCounts.from_table(table, dims, end=day)
+    if not len(counts):
+        return pd.DataFrame(columns=list(dims) + ANOMALY_COLUMNS)
+    an = counts.anomalies(-1, window)
+    an = an[(an["z"] >= z_min) & (an["focos_dia"] >= min_focos)]
+    an = an.sort_values(["z", "focos_dia"], ascending=False, ignore_index=True)
+    return an if top_n is None else an.head(top_n)
+
+# ---------------------------
+# Quantis por grupo
+# ---------------------------
+@timed("analytics.grouped_quantiles")
+def grouped_quantiles(df: pd.DataFrame, by: str | Sequence[str], cols: Sequence[str],
+                      qs: Sequence[float] = (0.5, 0.9, 0.99)) -> pd.DataFrame:
+    """
+    Quantis (interpolação linear, como Series.quantile) de cols por grupo.
+    Uma ordenação por (grupo, valor) por coluna; cada quantil é um índice
+    calculado a partir do início e do tamanho de cada grupo, sem laço em Python
+    por grupo. Nulos são ignorados.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if len(by) > 1:
+        codes, groups = pd.MultiIndex.from_frame(df[by]).factorize()
+        index = groups.set_names(by)
+    else:
+        codes, groups = pd.factorize(df[by[0]], sort=True)
+        index = pd.Index(groups, name=by[0])
+    n_groups = len(groups)
+    # códigos de 16 bits: o argsort estável por grupo vira radix sort
+    codes = codes.astype(np.int16 if n_groups < 2**15 else np.int64)
+    out = {}
+    for col in cols:
+        v = df[col].to_numpy()
+        ok = ~np.isnan(v) & (codes >= 0)
+        c, v = codes[ok], v[ok]
+        # ordena pelo valor e, de forma estável, pelo grupo
+        by_value = np.argsort(v)
+        order = by_value[np.argsort(c[by_value], kind="stable")]
+        v = v[order].astype("float64")
+        n = np.bincount(c, minlength=n_groups)
+        start = np.cumsum(n) - n
+        out[(col, "n")] = n
+        for q in qs:
+            pos = start + q * np.maximum(n - 1, 0)
+            lo = np.floor(pos).astype(np.int64)
+            hi = np.minimum(lo + 1, start + np.maximum(n - 1, 0))
+            frac = pos - lo
+            if len(v):
+                val = v[np.minimum(lo, len(v) - 1)] * (1 - frac) + v[np.minimum(hi, len(v) - 1)] * frac
+            else:
+                val = np.zeros(n_groups)
+            out[(col, f"p{round(q * 100):g}")] = np.where(n > 0, val, np.nan)
+    res = pd.DataFrame(out, index=index)
+    res.columns = pd.MultiIndex.from_tuples(res.columns)
+    return res
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from typing import Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+from projeto_vigia.config import TIME_MAX_BINS, TIME_MAX_POINTS, TIME_TOP_K
+from projeto_vigia.instrumentation import timed
+
+# Larguras de agregação, da mais fina à mais grossa: (freq do pandas, rótulo, duração aproximada)
+FREQS = [
+    ("h", "hora", pd.Timedelta(hours=1)),
+    ("D", "dia", pd.Timedelta(days=1)),
+    ("W-MON", "semana", pd.Timedelta(days=7)),
+    ("MS", "mês", pd.Timedelta(days=30)),
+]
+FREQ_LABELS = {f: label for f, label, _ in FREQS}
+OTHERS_LABEL = "Outros"
+
+def choose_freq(start, end, max_bins: int = TIME_MAX_BINS, finest: str = "h") -> str:
+    """Menor largura (a partir de finest) que cobre [start, end] com até max_bins intervalos."""
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    names = [f for f, _, _ in FREQS]
+    for freq, _, width in FREQS[names.index(finest):]:
+        if span / width < max_bins:
+            return freq
+    return FREQS[-1][0]
+
+def _bin_start(ts: pd.Series, freq: str) -> pd.Series:
+    # início do intervalo; semanas começam na segunda-feira
+    if freq == "W-MON":
+        day = ts.dt.normalize()
+        return day - pd.to_timedelta(day.dt.dayofweek, unit="D")
+    if freq == "MS":
+        return ts.dt.to_period("M").dt.start_time
+    return ts.dt.floor(freq)
+
+@timed("analytics.bin_counts")
+def bin_counts(df: pd.DataFrame, freq: str, dimension: Optional[str] = None,
+               time_col: str = "data_hora", weight: Optional[str] = None) -> pd.DataFrame:
+    """
+    Contagem (ou soma de weight) por intervalo de freq e, opcionalmente, por dimension.
+    Serve tanto para os focos (data_hora) quanto para tabelas diárias
+    (time_col="data", weight="contagem"). Intervalos vazios entram com zero.
+    """
+    ts = pd.to_datetime(df[time_col])
+    keys = [_bin_start(ts, freq).rename("data")]
+    if dimension:
+        keys.append(df[dimension])
+    grouped = df.groupby(keys, observed=True, sort=True)
+    out = grouped[weight].sum() if weight else grouped.size()
+    if out.empty:
+        return out.reset_index(name="contagem")
+    bins = pd.date_range(out.index.get_level_values("data").min(),
+                         out.index.get_level_values("data").max(),
+                         freq=freq if freq != "W-MON" else "7D", name="data")
+    if dimension:
+        out = out.unstack(dimension, fill_value=0).reindex(bins, fill_value=0).stack(future_stack=True)
+    else:
+        out = out.reindex(bins, fill_value=0)
+    return out.astype("int64").reset_index(name="contagem")
+
+def top_k_labels(values: pd.Series, k: int = TIME_TOP_K, weights: Optional[pd.Series] = None,
+                 others: str = OTHERS_LABEL) -> pd.Series:
+    """
+    values com as k categorias de maior total (contagem de linhas ou soma de
+    weights) e as demais trocadas por "Outros"; categorias ordenadas do maior
+    ao menor, "Outros" por último (ordem da legenda).
+    """
+    totals = (values.value_counts() if weights is None
+              else weights.groupby(values, observed=True).sum())
+    totals = totals[totals > 0]
+    keep = [str(c) for c in totals.nlargest(k).index]
+    order = keep + ([others] if len(totals) > k else [])
+    codes = pd.Categorical(values.astype(str), categories=order).codes
+    if len(totals) > k:
+        codes = np.where(codes < 0, len(keep), codes)
+    return pd.Series(pd.Categorical.from_codes(codes, order), index=values.index, name=values.name)
+
+@timed("analytics.collapse_top_k")
+def collapse_top_k(series: pd.DataFrame, dimension: str, k: int = TIME_TOP_K,
+                   others: str = OTHERS_LABEL) -> pd.DataFrame:
+    """Série (data, dimension, contagem) com as k maiores categorias e as demais somadas em "Outros"."""
+    label = top_k_labels(series[dimension], k, series["contagem"], others)
+    return (series.groupby(["data", label], observed=True, sort=True)["contagem"].sum()
+            .reset_index())
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: índices de n_out pontos que preservam a
+    forma da linha (picos e vales), sempre incluindo o primeiro e o último.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # n_out - 2 baldes entre as pontas
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # média do balde seguinte (ou o último ponto)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+@timed("analytics.downsample_series")
+def downsample_series(series: pd.DataFrame, max_points: int = TIME_MAX_POINTS,
+                      dimension: Optional[str] = None) -> pd.DataFrame:
+    """LTTB em cada linha (por dimension) até max_points pontos por linha."""
+    def one(g: pd.DataFrame) -> pd.DataFrame:
+        if len(g) <= max_points:
+            return g
+        x = g["data"].to_numpy(dtype="datetime64[ns]").astype("int64")
+        return g.iloc[lttb_indices(x, g["contagem"].to_numpy(), max_points)]
+    if not dimension:
+        return one(series).reset_index(drop=True)
+    parts = [one(g) for _, g in series.groupby(dimension, observed=True, sort=False)]
+    return pd.concat(parts, ignore_index=True) if parts else series
+
+def chart_series(daily: pd.DataFrame, dimension: Optional[str] = None,
+                 rows: Union[pd.DataFrame, Callable[[], pd.DataFrame], None] = None, freq: Optional[str] = None,
+                 top_k: int = TIME_TOP_K, max_bins: int = TIME_MAX_BINS,
+                 max_points: int = TIME_MAX_POINTS) -> tuple[pd.DataFrame, str]:
+    """
+    Série pronta para o gráfico a partir da tabela diária (data, [dimension], contagem):
+    largura escolhida pelo período (por hora só com os focos em rows), top-k
+    categorias + "Outros" e LTTB por linha. Retorna (série, freq). rows pode
+    ser uma função que devolve os focos: só é chamada se a série for por hora.
+    """
+    if daily.empty:
+        return daily, freq or "D"
+    dates = pd.to_datetime(daily["data"])
+    if freq == "h" and rows is None:
+        freq = "D"  # a tabela diária não tem a hora
+    if freq is None:
+        end = dates.max() + pd.Timedelta(days=1)
+        freq = choose_freq(dates.min(), end, max_bins, finest="h" if rows is not None else "D")
+    # top-k antes de agregar: o custo não cresce com o número de categorias
+    if freq == "h" and rows is not None:
+        if callable(rows):
+            rows = rows()
+        src, kw = rows, {}
+        if dimension:
+            src = rows[["data_hora"]].assign(**{dimension: top_k_labels(rows[dimension], top_k)})
+    else:
+        src, kw = daily.assign(data=dates), {"time_col": "data", "weight": "contagem"}
+        if dimension:
+            src[dimension] = top_k_labels(src[dimension], top_k, src["contagem"])
+    out = bin_counts(src, freq, dimension, **kw)
+    return downsample_series(out, max_points, dimension), freq
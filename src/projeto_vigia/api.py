@@ -0,0 +1,382 @@
+from __future__ import annotations
+import dataclasses
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from projeto_vigia.analytics.cache import ResultCache
+from projeto_vigia.analytics.aggregations import compute_critical_regions
+from projeto_vigia.analytics.distributions import STATS_COLUMNS, describe_numeric
+from projeto_vigia.analytics.query import FocosIndex, dataset_version
+from projeto_vigia.analytics.rollup import DailyRollup
+from projeto_vigia.analytics.router import QueryRouter
+from projeto_vigia.analytics.scoring import DEFAULT_SCORING, ScoringConfig
+from projeto_vigia.analytics.spatial import municipality_centroids
+from projeto_vigia.analytics.spec import FilterSpec
+from projeto_vigia.analytics.stats import grouped_quantiles, spiking_regions
+from projeto_vigia.config import (ANOMALY_WINDOW_DAYS, ARCHIVE_MAX_SLICES, EXPORT_CHUNK_ROWS,
+                                  RESULT_CACHE_MAX_MB, RESULT_CACHE_TTL_S)
+from projeto_vigia.services.data_io import read_normalized_file
+from projeto_vigia.domain.preprocessing import concat_normalized
+from projeto_vigia.instrumentation import timed
+from projeto_vigia.services.archive import FocosArchive, month_key
+from projeto_vigia.services.dataset_store import refresh_dataset, refresh_datasets
+from projeto_vigia.services.export import EXPORTERS, frame_reader, page_bounds, sort_order
+from projeto_vigia.services.live_ingest import LiveIngestor, make_source
+from projeto_vigia.services.shared_dataset import open_arrow, publish_arrow
+
+# Tabelas que uma consulta pode produzir (mesmas do painel)
+TABLES = ("regioes_criticas", "por_dia", "serie_estado", "serie_bioma", "serie_municipio",
+          "por_bioma", "top_municipios", "resumo", "municipios_em_alta", "estatisticas",
+          "quantis_estado", "focos")
+DEFAULT_TABLES = ("regioes_criticas", "por_dia", "por_bioma", "top_municipios", "resumo")
+
+def _source_key(source: str | Sequence[str]) -> str:
+    return source if isinstance(source, str) else "|".join(source)
+
+def load_source(source: str | Sequence[str]) -> pd.DataFrame:
+    """
+    Carrega a base normalizada de um arquivo local (.csv, .csv.gz, .parquet,
+    .arrow de publish_arrow) ou de uma URL (via cache Parquet de
+    services.dataset_store). Uma lista de fontes é unida numa só base; as
+    URLs são buscadas em paralelo.
+    """
+    if not isinstance(source, str):
+        sources = list(source)
+        urls = [s for s in sources if not Path(s).exists()]
+        frames = [load_source(s) for s in sources if Path(s).exists()]
+        if urls:
+            frames.append(refresh_datasets(urls))
+        return concat_normalized(frames)
+    path = Path(source)
+    if path.exists():
+        if path.suffix == ".arrow":
+            return open_arrow(path)
+        return read_normalized_file(path)
+    return refresh_dataset(source)
+
+def _filter_options(df: pd.DataFrame) -> dict:
+    """Estados, biomas, período e centros de município da base (formato de FocosArchive.filter_options)."""
+    return {
+        "estados": sorted(df["estado_nome"].dropna().unique().tolist()),
+        "biomas": sorted(df["Bioma"].dropna().unique().tolist()),
+        "inicio": df["data_hora"].min() if len(df) else None,
+        "fim": df["data_hora"].max() if len(df) else None,
+        # só com o filtro por raio aberto; calculado uma vez por versão
+        "centros": functools.cache(lambda: municipality_centroids(df)),
+    }
+
+class VigiaAPI:
+    """
+    Análises do painel sem Streamlit: a base é indexada uma vez e cada
+    consulta (FilterSpec ou dicionário no formato da sidebar) devolve as
+    mesmas tabelas das abas. Consultas repetidas (por qualquer sessão que
+    compartilhe a instância) saem do ResultCache.
+    """
+
+    def __init__(self, df: pd.DataFrame, cache_mb: float = RESULT_CACHE_MAX_MB,
+                 cache_ttl: float | None = RESULT_CACHE_TTL_S, cache: ResultCache | None = None):
+        self.cache = cache if cache is not None else ResultCache(int(cache_mb * 2**20), ttl=cache_ttl)
+        self.router = QueryRouter(FocosIndex(df), DailyRollup.from_frame(df), cache=self.cache)
+        self.live: LiveIngestor | None = None
+        self.window: pd.Timedelta | None = None
+        self._ingest_lock = threading.Lock()
+        self._options: tuple[str, dict] | None = None
+
+    @classmethod
+    def from_source(cls, source: str | Sequence[str]) -> "VigiaAPI":
+        return cls(load_source(source))
+
+    @classmethod
+    def shared(cls, source: str | Sequence[str], cache_dir: Path | None = None) -> "VigiaAPI":
+        """
+        Instância para ser compartilhada por todas as sessões de um processo
+        (st.cache_resource): a base, ordenada por data_hora, é publicada como
+        arquivo Arrow mapeado em memória e indexada sem nova cópia.
+        """
+        df = load_source(source)
+        df = df.sort_values("data_hora", kind="stable", ignore_index=True)
+        return cls(open_arrow(publish_arrow(df, _source_key(source), dataset_version(df), cache_dir)))
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Base indexada (somente leitura: use view() para entregar a uma sessão)."""
+        return self.router.index.df
+
+    @property
+    def version(self) -> str:
+        return self.router.index.version
+
+    def filter_options(self) -> dict:
+        """Opções dos filtros da sidebar, recalculadas só quando a versão da base muda."""
+        version = self.version
+        if self._options is None or self._options[0] != version:
+            self._options = (version, _filter_options(self.frame))
+        return self._options[1]
+
+    def view(self) -> pd.DataFrame:
+        """Cópia rasa da base: compartilha os buffers (com copy-on-write do pandas)."""
+        return self.frame.copy(deep=False)
+
+    def for_spec(self, spec: Mapping) -> "VigiaAPI":
+        """Instância que responde à consulta (aqui, a própria; ver ArchiveAPI)."""
+        return self
+
+    # ---------------------------
+    # Ingestão contínua
+    # ---------------------------
+    def ingest(self, df_new: pd.DataFrame) -> None:
+        """
+        Anexa um lote já normalizado ao índice e ao rollup (só o delta é
+        agregado) e descarta o que saiu da janela móvel. O router é trocado
+        de uma vez: consultas em andamento terminam sobre a versão anterior,
+        e a nova versão da base invalida as chaves do cache.
+        """
+        with self._ingest_lock:
+            index = self.router.index.append(df_new)
+            rollup = self.router.rollup.append(df_new) if self.router.rollup is not None else None
+            if self.window is not None and index.last_ts is not None:
+                cutoff = index.last_ts - self.window  # índice e rollup cortam na hora cheia
+                index = index.evict_before(cutoff)
+                rollup = rollup.evict_before(cutoff) if rollup is not None else None
+            self.router = QueryRouter(index, rollup, cache=self.cache)
+
+    def follow(self, location: str, poll_seconds: float = 60,
+               window_hours: float | None = None) -> LiveIngestor:
+        """Passa a acompanhar uma fonte de lotes novos (diretório ou URL); ver poll_live()."""
+        self.window = pd.Timedelta(hours=window_hours) if window_hours else None
+        self.ingest(self.frame.iloc[:0])  # aplica a janela à carga inicial
+        self.live = LiveIngestor(make_source(location, self.frame),
+                                 self.ingest, poll_seconds)
+        return self.live
+
+    def poll_live(self, force: bool = False) -> int:
+        """Consulta a fonte acompanhada (no máximo uma vez por intervalo); linhas novas."""
+        return self.live.poll(force) if self.live is not None else 0
+
+    def _spiking(self, spec: FilterSpec) -> pd.DataFrame:
+        """
+        Municípios em alta no último dia do período. O histórico vai além do
+        início do período: mesmos filtros nos ANOMALY_WINDOW_DAYS dias anteriores.
+        """
+        end = spec.end
+        if end is None:
+            last = self.router.index.last_ts
+            end = last.normalize() if last is not None else None
+        if end is not None:
+            spec = dataclasses.replace(spec, start=end - pd.Timedelta(days=ANOMALY_WINDOW_DAYS), end=end)
+        return spiking_regions(self.router.cube(spec).table, day=end)
+
+    def _critical(self, spec: FilterSpec, top_n: int, scoring: ScoringConfig) -> pd.DataFrame:
+        # a grade precisa das coordenadas de cada foco; as demais granularidades saem do cubo
+        if scoring.granularity == "grade":
+            return compute_critical_regions(self.router.rows(spec), top_n, scoring)
+        return self.router.cube(spec).critical_regions(top_n, scoring)
+
+    @timed("api.run")
+    def run(self, spec: Mapping, tables: Iterable[str] = DEFAULT_TABLES,
+            top_n: int = 5, scoring: ScoringConfig | Mapping | None = None) -> dict[str, pd.DataFrame]:
+        """scoring: pesos/granularidade das regiões críticas (ScoringConfig ou seu JSON)."""
+        spec = spec if isinstance(spec, FilterSpec) else FilterSpec.from_mapping(spec)
+        if scoring is None:
+            scoring = DEFAULT_SCORING
+        elif not isinstance(scoring, ScoringConfig):
+            scoring = ScoringConfig.from_mapping(scoring)
+        tables = list(tables)
+        unknown = set(tables) - set(TABLES)
+        if unknown:
+            raise ValueError(f"Tabelas desconhecidas: {', '.join(sorted(unknown))}")
+
+        out: dict[str, pd.DataFrame] = {}
+        cube = lambda: self.router.cube(spec)
+        builders = {
+            "regioes_criticas": lambda: self._critical(spec, top_n, scoring),
+            "por_dia": lambda: cube().by_day(),
+            "serie_estado": lambda: cube().series_by_dimension("estado_nome"),
+            "serie_bioma": lambda: cube().series_by_dimension("Bioma"),
+            "serie_municipio": lambda: cube().series_by_dimension("municipio_nome"),
+            "por_bioma": lambda: cube().by_biome(),
+            "top_municipios": lambda: cube().top_municipios(),
+            "resumo": lambda: pd.DataFrame([cube().summary()]),
+            "municipios_em_alta": lambda: self._spiking(spec),
+            "estatisticas": lambda: describe_numeric(self.router.rows(spec)[STATS_COLUMNS].dropna(),
+                                                     STATS_COLUMNS),
+            "quantis_estado": lambda: grouped_quantiles(self.router.rows(spec), "estado_nome",
+                                                        ["FRP", "RiscoFogo"]),
+        }
+        for name in tables:
+            if name == "focos":
+                # linhas brutas não entram no cache (só as posições, no router)
+                out[name] = self.router.rows(spec).reset_index(drop=True)
+                continue
+            key = (self.version, spec.key(), name,
+                   (top_n, scoring.key()) if name == "regioes_criticas" else None)
+            # cópia rasa: quem recebe pode acrescentar colunas sem alterar o cache
+            out[name] = self.cache.get_or_compute(key, builders[name]).copy(deep=False)
+        return out
+
+    # ---------------------------
+    # Dados brutos: páginas e exportação
+    # ---------------------------
+    def _selection(self, spec: FilterSpec) -> tuple[pd.DataFrame, np.ndarray | None]:
+        """Base e posições selecionadas (com eventos, a tabela de eventos inteira)."""
+        if spec.get("eventos"):
+            return self.router.rows(spec), None
+        return self.router.index.df, self.router.positions(spec)
+
+    def count(self, spec: Mapping) -> int:
+        """Número de linhas da consulta (focos ou eventos)."""
+        spec = spec if isinstance(spec, FilterSpec) else FilterSpec.from_mapping(spec)
+        frame, pos = self._selection(spec)
+        return len(frame) if pos is None else len(pos)
+
+    def columns(self, spec: Mapping) -> list[str]:
+        """Colunas das linhas da consulta (com eventos, as da tabela de eventos)."""
+        spec = spec if isinstance(spec, FilterSpec) else FilterSpec.from_mapping(spec)
+        return list(self._selection(spec)[0].columns)
+
+    def _ordered(self, spec: FilterSpec, sort_by: str | None, ascending: bool):
+        frame, pos = self._selection(spec)
+        if not sort_by:
+            return frame, pos
+        col = frame[sort_by] if pos is None else frame[sort_by].take(pos)
+        key = (self.version, spec.key(), "ordem", (sort_by, ascending))
+        order = self.cache.get_or_compute(key, lambda: sort_order(col, ascending))
+        return frame, (order if pos is None else pos[order])
+
+    @timed("api.page")
+    def page(self, spec: Mapping, page: int = 1, page_size: int = 100, sort_by: str | None = None,
+             ascending: bool = True, columns: Sequence[str] | None = None) -> tuple[pd.DataFrame, int]:
+        """
+        Uma página das linhas da consulta e o total de linhas. Só a página é
+        copiada da base; a ordenação (por sort_by) fica no cache junto das posições.
+        """
+        spec = spec if isinstance(spec, FilterSpec) else FilterSpec.from_mapping(spec)
+        frame, pos = self._ordered(spec, sort_by, ascending)
+        read, total = frame_reader(frame, columns, pos)
+        a, b = page_bounds(total, page, page_size)
+        return read(a, b).reset_index(drop=True), total
+
+    def export(self, spec: Mapping, fmt: str = "csv", columns: Sequence[str] | None = None,
+               rename: Mapping[str, str] | None = None, sort_by: str | None = None, ascending: bool = True,
+               chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+        """
+        Linhas da consulta em CSV ou Parquet, como um gerador de pedaços de
+        bytes: cada bloco de chunk_rows linhas é lido da base e escrito, sem
+        montar a seleção inteira (nem uma cópia renomeada) em memória.
+        """
+        if fmt not in EXPORTERS:
+            raise ValueError(f"Formato desconhecido: {fmt}")
+        spec = spec if isinstance(spec, FilterSpec) else FilterSpec.from_mapping(spec)
+        frame, pos = self._ordered(spec, sort_by, ascending)
+        read, total = frame_reader(frame, columns, pos)
+        return EXPORTERS[fmt](read, total, rename, chunk_rows)
+
+class ArchiveAPI:
+    """
+    Consultas sobre o histórico particionado (services.archive): cada
+    consulta lê só os meses/estado/biomas que cobre — incluindo os
+    ANOMALY_WINDOW_DAYS dias anteriores, para os municípios em alta — e é
+    respondida por um VigiaAPI sobre esse recorte. Os recortes são de meses
+    inteiros, então períodos diferentes dentro dos mesmos meses reaproveitam
+    a leitura; os últimos max_slices ficam em memória, com um ResultCache comum.
+    Um append (por esta instância ou por outro processo, visto pela versão do
+    catálogo) descarta os recortes guardados.
+    """
+
+    live = None
+
+    def __init__(self, root: Path, max_slices: int = ARCHIVE_MAX_SLICES,
+                 cache_mb: float = RESULT_CACHE_MAX_MB, cache_ttl: float | None = RESULT_CACHE_TTL_S):
+        self.archive = FocosArchive(root)
+        self.cache = ResultCache(int(cache_mb * 2**20), ttl=cache_ttl)
+        self.max_slices = max_slices
+        self._slices: OrderedDict[tuple, VigiaAPI] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = self.archive.version
+
+    def filter_options(self) -> dict:
+        return self.archive.filter_options()
+
+    def append(self, df: pd.DataFrame) -> int:
+        """Acrescenta focos ao histórico (ver FocosArchive.append) e descarta os recortes em memória."""
+        written = self.archive.append(df)
+        with self._lock:
+            self._slices.clear()
+            self._version = self.archive.version
+        return written
+
+    def _slice_spec(self, spec: FilterSpec) -> dict:
+        start = spec.start - pd.Timedelta(days=ANOMALY_WINDOW_DAYS) if spec.start is not None else None
+        return {
+            "estado": spec.estado,
+            "biomas": list(spec.biomas),
+            "start": start.to_period("M").start_time if start is not None else None,
+            "end": spec.end.to_period("M").end_time.normalize() if spec.end is not None else None,
+        }
+
+    def for_spec(self, spec: Mapping) -> VigiaAPI:
+        spec = spec if isinstance(spec, FilterSpec) else FilterSpec.from_mapping(spec)
+        part = self._slice_spec(spec)
+        key = (part["estado"], tuple(part["biomas"]),
+               *(month_key(part[k]) if part[k] is not None else None for k in ("start", "end")))
+        version = self.archive.version
+        with self._lock:
+            if version != self._version:
+                self._slices.clear()
+                self._version = version
+            api = self._slices.get(key)
+            if api is not None:
+                self._slices.move_to_end(key)
+                return api
+        # cada FilterSpec cai sempre no mesmo recorte: as chaves do cache comum não colidem
+        api = VigiaAPI(self.archive.scan(part), cache=self.cache)
+        with self._lock:
+            self._slices[key] = api
+            while len(self._slices) > self.max_slices:
+                self._slices.popitem(last=False)
+        return api
+
+    def run(self, spec: Mapping, tables: Iterable[str] = DEFAULT_TABLES,
+            top_n: int = 5, scoring: ScoringConfig | Mapping | None = None) -> dict[str, pd.DataFrame]:
+        return self.for_spec(spec).run(spec, tables, top_n, scoring)
+
+# ---------------------------
+# Lote em processos
+# ---------------------------
+_WORKER_API: VigiaAPI | None = None
+
+def _init_worker(source: str) -> None:
+    global _WORKER_API
+    _WORKER_API = VigiaAPI.from_source(source)
+
+def _run_in_worker(spec: dict, tables: Sequence[str], top_n: int,
+                   scoring: dict | None) -> dict[str, pd.DataFrame]:
+    return _WORKER_API.run(spec, tables, top_n, scoring)
+
+def run_batch(source: str | Sequence[str], specs: Sequence[Mapping], tables: Sequence[str] = DEFAULT_TABLES,
+              top_n: int = 5, workers: int = 1,
+              scoring: ScoringConfig | None = None) -> list[dict[str, pd.DataFrame]]:
+    """
+    Executa várias consultas sobre uma única carga da base. Com workers > 1,
+    as consultas são distribuídas num pool de processos; a base é carregada
+    uma vez aqui e publicada como arquivo Arrow, que cada processo abre via
+    memory-map.
+    """
+    specs = [s if isinstance(s, FilterSpec) else FilterSpec.from_mapping(s) for s in specs]
+    if workers <= 1 or len(specs) <= 1:
+        api = VigiaAPI.from_source(source)
+        return [api.run(s, tables, top_n, scoring) for s in specs]
+    df = load_source(source)
+    df = df.sort_values("data_hora", kind="stable", ignore_index=True)
+    path = publish_arrow(df, _source_key(source), dataset_version(df))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(path),)) as pool:
+        scoring_dict = scoring.to_dict() if scoring is not None else None
+        futures = [pool.submit(_run_in_worker, s.to_dict(), tuple(tables), top_n, scoring_dict) for s in specs]
+        return [f.result() for f in futures]
@@ -1,99 +1,150 @@
 from __future__ import annotations
+from contextlib import nullcontext
 import streamlit as st
 import pandas as pd
 from projeto_vigia.theming import setup_page, inject_css
-from projeto_vigia.config import FILE_URL, LOGO_URL
-from projeto_vigia.services.data_io import read_csv_from_gdrive
-from projeto_vigia.domain.preprocessing import normalize_dataframe
-from projeto_vigia.analytics.filters import (
-    filter_by_date_range, filter_by_turno, filter_by_biomes, filter_numeric_columns
-)
-from projeto_vigia.analytics.aggregations import (
-    by_day, by_biome, top_municipios, series_by_dimension, compute_critical_regions
-)
+from projeto_vigia.config import (SOURCE_URLS, LOGO_URL, LIVE_SOURCE, LIVE_POLL_SECONDS, LIVE_WINDOW_HOURS,
+                                  ARCHIVE_DIR)
+from projeto_vigia.api import ArchiveAPI, VigiaAPI
+from projeto_vigia.instrumentation import trace
+from projeto_vigia.analytics.scoring import ScoringConfig
+from projeto_vigia.analytics.spec import FilterSpec
 from projeto_vigia.ui.sidebar import render_sidebar
 from projeto_vigia.ui.sections import (
     render_summary_tab, render_time_tab, render_biome_city_tab,
-    render_prevention_tab, render_stats_tab
+    render_prevention_tab, render_stats_tab, render_raw_viewer, render_debug_panel
 )
 
+ABAS = {
+    "mapa": "🗺️ Mapa e Métricas",
+    "tempo": "📈 Séries Temporais",
+    "bioma": "🌳 Bioma & Município",
+    "estatistica": "📊 Estatística",
+    "prevencao": "💡 Prevenção",
+}
+
+# Sessões recebem visões rasas da base compartilhada: com copy-on-write,
+# qualquer alteração numa visão copia só a coluna alterada, nunca a base.
+pd.set_option("mode.copy_on_write", True)
+
 setup_page()
 inject_css()
 
 st.title("🔥 Painel de Análise de Queimadas no Brasil")
 st.markdown("Este painel realiza uma análise interativa de focos de queimadas com base em um arquivo de dados da web.")
 
-@st.cache_data(ttl=86400, show_spinner="Baixando e processando dados CSV...")
-def load_dataset(url: str) -> pd.DataFrame:
-    df = read_csv_from_gdrive(url)
-    return normalize_dataframe(df)
+@st.cache_resource(ttl=86400, show_spinner="Baixando e processando dados CSV...")
+def load_dataset(urls: tuple[str, ...]) -> VigiaAPI:
+    # Uma instância por processo, compartilhada por todas as sessões (sem pickle/cópia
+    # a cada rerun). Cache Parquet local: só baixa/normaliza de novo se a fonte mudou.
+    api = VigiaAPI.shared(list(urls))
+    if LIVE_SOURCE:
+        api.follow(LIVE_SOURCE, LIVE_POLL_SECONDS, LIVE_WINDOW_HOURS)
+    return api
 
+@st.cache_resource(show_spinner="Abrindo o histórico...")
+def open_archive(root: str) -> ArchiveAPI:
+    # Histórico particionado: nada é carregado aqui; cada consulta lê só os seus meses/estado
+    return ArchiveAPI(root)
+
+options = None
 try:
-    df_full = load_dataset(FILE_URL)
+    if ARCHIVE_DIR:
+        api = open_archive(ARCHIVE_DIR)
+    else:
+        api = load_dataset(SOURCE_URLS)
+    # do catálogo (histórico) ou da base, calculadas uma vez por versão
+    options = api.filter_options()
 except Exception as e:
-    df_full = pd.DataFrame()
+    api = None
     st.error(f"Falha ao carregar dados: {e}")
 
-sidebar_state = render_sidebar(df_full, LOGO_URL)
+sidebar_state = render_sidebar(LOGO_URL, options)
+
+if api is not None and api.live is not None:
+    @st.fragment(run_every=LIVE_POLL_SECONDS)
+    def live_status():
+        # Uma sessão por vez consulta a fonte; todas recarregam quando a versão da base muda
+        api.poll_live()
+        if st.session_state.setdefault("versao_base", api.version) != api.version:
+            st.session_state["versao_base"] = api.version
+            st.session_state["atualizacao_ao_vivo"] = True
+            st.rerun()
+        ultimo = api.router.index.last_ts
+        st.caption(f"🔴 Ao vivo: {len(api.frame):,} focos".replace(",", ".")
+                   + (f", último em {ultimo:%d/%m %H:%M}" if ultimo is not None else ""))
+        if api.live.last_error is not None:
+            st.caption(f"Fonte indisponível: {api.live.last_error}")
+
+    with st.sidebar:
+        live_status()
 
-if df_full.empty:
+# Reruns sem novo clique (atualização ao vivo, paginação dos dados brutos, widgets
+# das abas) refazem a última análise da sessão; as tabelas saem do cache
+spec = None
+if sidebar_state and sidebar_state["buscar"]:
+    spec = FilterSpec.from_mapping(sidebar_state)
+    scoring = ScoringConfig.from_mapping(sidebar_state["pontuacao"])
+    st.session_state["ultima_consulta"] = (spec, scoring)
+else:
+    st.session_state.pop("atualizacao_ao_vivo", False)
+    spec, scoring = st.session_state.get("ultima_consulta", (None, None))
+
+if options is None or options["inicio"] is None:
     st.warning("Os dados não puderam ser carregados. Verifique o link/permissões.")
-elif sidebar_state and sidebar_state["buscar"]:
-    estado = sidebar_state["estado"]
-    biomas = sidebar_state["biomas"]
-    start_dt = sidebar_state["start"]
-    end_dt = sidebar_state["end"]
-    turno_preset = sidebar_state["turno_preset"]
-    custom_time = sidebar_state["custom_time"]
-    numeric_rules = sidebar_state["numeric_rules"]
-
-    # Estado
-    dff = df_full if estado == "Todos" else df_full[df_full["estado_nome"] == estado].copy()
-    # Período
-    dff = filter_by_date_range(dff, start_dt, end_dt)
-    # Bioma(s)
-    dff = filter_by_biomes(dff, biomas)
-    # Turno
-    dff = filter_by_turno(dff, preset=turno_preset, custom_range=custom_time)
-    # Regras numéricas
-    dff = filter_numeric_columns(dff, numeric_rules)
-
-    if dff.empty:
-        st.warning("Nenhum foco de queimada foi encontrado para os filtros selecionados.")
-    else:
-        # Regiões críticas (box na tela principal)
-        crit = compute_critical_regions(dff, top_n=5)
-
-        st.success(f"Análise concluída para **{estado}** entre **{start_dt:%d/%m/%Y}** e **{end_dt:%d/%m/%Y}**!")
-        st.subheader("Regiões Críticas (top 5)")
-        st.dataframe(crit[["estado_nome","municipio_nome","Bioma","focos","risco_medio","frp_medio","frp_max","precip_media","dias_sem_chuva_med"]])
-
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "🗺️ Mapa e Métricas",
-            "📈 Séries Temporais",
-            "🌳 Bioma & Município",
-            "📊 Estatística",
-            "💡 Prevenção",
-        ])
-
-        with tab1:
-            render_summary_tab(dff, estado)
-        with tab2:
-            render_time_tab(
-                by_day(dff),
-                series_by_dimension(dff, "estado_nome"),
-                series_by_dimension(dff, "Bioma"),
-            )
-        with tab3:
-            render_biome_city_tab(by_biome(dff), top_municipios(dff))
-        with tab4:
-            render_stats_tab(dff)
-        with tab5:
-            render_prevention_tab()
-
-        with st.expander("Ver dados brutos (todas as colunas)"):
-            df_disp = dff.rename(columns={"lat":"Latitude","lon":"Longitude","data_hora":"Data/Hora",
-                                          "municipio_nome":"Município","estado_nome":"Estado"})
-            st.dataframe(df_disp)
+elif spec is not None:
+    diagnostico = bool(sidebar_state and sidebar_state.get("diagnostico"))
+    with (trace() if diagnostico else nullcontext()) as tr:
+        estado = spec.estado
+        start_dt = spec.start
+        end_dt = spec.end
+
+        # com o histórico, o recorte (meses/estado) que cobre a consulta
+        api_q = api.for_spec(spec)
+        router = api_q.router
+        # Na abertura só o resumo e as regiões críticas; as tabelas de cada aba
+        # são pedidas quando ela é aberta. Consultas repetidas (de qualquer
+        # sessão) saem do cache de resultados
+        out = api_q.run(spec, tables=["resumo", "regioes_criticas"], top_n=5, scoring=scoring)
+        summary = out["resumo"].iloc[0].to_dict()
+
+        if summary["total"] == 0:
+            st.warning("Nenhum foco de queimada foi encontrado para os filtros selecionados.")
+        else:
+            # Estado, período, bioma(s), turno e regras numéricas numa única máscara;
+            # as linhas só são montadas pelas abas que precisam delas
+            focos = lambda: router.rows(spec)
+            # Regiões críticas (box na tela principal)
+            crit = out["regioes_criticas"]
+
+            st.success(f"Análise concluída para **{estado}** entre **{start_dt:%d/%m/%Y}** e **{end_dt:%d/%m/%Y}**!")
+            st.subheader("Regiões Críticas (top 5)")
+            cols = scoring.dims or ["lat", "lon"]
+            st.dataframe(crit[cols + [c for c in ["focos", "focos_recentes", "risco_medio", "frp_medio", "frp_max",
+                                                  "precip_media", "dias_sem_chuva_med", "score"]
+                                      if c in crit.columns]], hide_index=True)
+
+            # st.tabs executaria o conteúdo de todas as abas a cada rerun: só a escolhida é calculada
+            aba = st.radio("Aba", list(ABAS), format_func=ABAS.get, horizontal=True,
+                           key="aba", label_visibility="collapsed")
+            if aba == "mapa":
+                render_summary_tab(focos(), estado, summary)
+            elif aba == "tempo":
+                t = api_q.run(spec, ["por_dia", "serie_estado", "serie_bioma", "serie_municipio"])
+                render_time_tab(t["por_dia"], t["serie_estado"], t["serie_bioma"], t["serie_municipio"],
+                                focos=focos)
+            elif aba == "bioma":
+                t = api_q.run(spec, ["por_bioma", "top_municipios"])
+                render_biome_city_tab(t["por_bioma"], t["top_municipios"])
+            elif aba == "estatistica":
+                t = api_q.run(spec, ["municipios_em_alta", "estatisticas", "quantis_estado"])
+                render_stats_tab(focos(), t["municipios_em_alta"], t["estatisticas"], t["quantis_estado"])
+            else:
+                render_prevention_tab()
+
+            with st.expander("Ver dados brutos (todas as colunas)"):
+                render_raw_viewer(api_q, spec)
+    if tr is not None:
+        render_debug_panel(tr)
 else:
     st.info("⬅️ Selecione os filtros na barra lateral e clique em **Analisar** para começar.")
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import argparse
+import sys
+from pathlib import Path
+
+from .suite import BENCHMARKS, compare, load_results, run_suite, save_results
+from .synthetic import generate_focos, to_raw
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m projeto_vigia.benchmarks",
+        description="Base sintética de focos e benchmarks do pipeline.",
+    )
+    sub = p.add_subparsers(dest="comando", required=True)
+
+    g = sub.add_parser("gerar", help="Grava uma base sintética (CSV no formato do INPE ou Parquet normalizado).")
+    g.add_argument("saida", type=Path, help="Arquivo .csv, .csv.gz ou .parquet.")
+    g.add_argument("--linhas", type=int, default=100_000)
+    g.add_argument("--semente", type=int, default=0)
+    g.add_argument("--dias", type=int, default=30)
+
+    r = sub.add_parser("rodar", help="Executa os benchmarks e grava os tempos em JSON.")
+    r.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    r.add_argument("--repeticoes", type=int, default=3)
+    r.add_argument("--filtro", help="Só os benchmarks cujo nome contém este texto.")
+    r.add_argument("--semente", type=int, default=0)
+    r.add_argument("--saida", type=Path, help="JSON de resultados (com commit e versões).")
+    r.add_argument("--comparar", type=Path, help="JSON de uma execução anterior para comparar.")
+    r.add_argument("--limite", type=float, default=1.2,
+                   help="Razão de tempo acima da qual um benchmark conta como regressão.")
+    r.add_argument("--listar", action="store_true", help="Só lista os benchmarks.")
+    return p
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.comando == "gerar":
+        df = generate_focos(args.linhas, seed=args.semente, days=args.dias)
+        args.saida.parent.mkdir(parents=True, exist_ok=True)
+        if args.saida.suffix == ".parquet":
+            df.to_parquet(args.saida, index=False)
+        else:
+            to_raw(df).to_csv(args.saida, index=False)
+        print(f"{len(df)} focos -> {args.saida}")
+        return 0
+
+    if args.listar:
+        print("\n".join(n for n in BENCHMARKS if not args.filtro or args.filtro in n))
+        return 0
+    results = run_suite(args.linhas, args.repeticoes, args.filtro, args.semente, log=print)
+    if args.saida:
+        print(f"resultados -> {save_results(results, args.saida)}")
+    if args.comparar:
+        import pandas as pd
+        cmp = compare(load_results(args.comparar), pd.DataFrame([vars(r) for r in results]), args.limite)
+        print(cmp[["name", "rows", "min_s_base", "min_s_novo", "razao_tempo", "razao_memoria"]]
+              .to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        regressoes = cmp[cmp["regressao"]]
+        if not regressoes.empty:
+            print(f"{len(regressoes)} regressão(ões) acima de {args.limite:.2f}x:", ", ".join(
+                f"{n} ({r:,} linhas)" for n, r in zip(regressoes["name"], regressoes["rows"])))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
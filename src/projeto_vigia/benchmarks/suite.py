@@ -0,0 +1,217 @@
+from __future__ import annotations
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+from projeto_vigia.analytics import aggregations, filters
+from projeto_vigia.analytics.aggregations import FocosCube
+from projeto_vigia.analytics.distributions import correlation, describe_numeric, histogram, kde
+from projeto_vigia.analytics.query import FocosIndex
+from projeto_vigia.analytics.scoring import ScoringConfig, ScoreTerm
+from projeto_vigia.analytics.stats import grouped_quantiles, spiking_regions
+from projeto_vigia.analytics.timeseries import chart_series
+from projeto_vigia.charts.colormap import colormap
+from projeto_vigia.charts.maps import grid_layer_data, point_layer_data
+from projeto_vigia.charts.time_series import time_chart_overall
+from projeto_vigia.config import RISK_PALETTE
+from projeto_vigia.domain.preprocessing import normalize_dataframe
+from projeto_vigia.domain.validation import validate_focos
+from .synthetic import generate_focos, to_raw
+
+# ---------------------------
+# Registro de benchmarks
+# ---------------------------
+# Cada benchmark recebe os dados preparados (Dados) e devolve a função a cronometrar;
+# o preparo não entra no tempo.
+BENCHMARKS: dict[str, Callable[["Dados"], Callable[[], Any]]] = {}
+
+def benchmark(name: str):
+    def deco(setup: Callable[["Dados"], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return deco
+
+class Dados:
+    """Base sintética de um tamanho, com as derivações (CSV bruto, cubo, índice) criadas sob demanda."""
+
+    def __init__(self, rows: int, seed: int = 0):
+        self.rows = rows
+        self.df = generate_focos(rows, seed=seed)
+        self.start = self.df["data_hora"].iloc[0].normalize() + pd.Timedelta(days=3)
+        self.end = self.start + pd.Timedelta(days=7)
+        self._cache: dict[str, Any] = {}
+
+    def _get(self, key: str, build: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def raw(self) -> pd.DataFrame:
+        return self._get("raw", lambda: to_raw(self.df))
+
+    @property
+    def cube(self) -> FocosCube:
+        return self._get("cube", lambda: FocosCube.from_frame(self.df))
+
+    @property
+    def index(self) -> FocosIndex:
+        return self._get("index", lambda: FocosIndex(self.df))
+
+_NUMERIC_RULES = {
+    "DiaSemChuva": {"op": "entre", "a": 5, "b": 60},
+    "RiscoFogo": {"op": ">=", "a": 0.7},
+    "FRP": {"op": ">", "a": 30},
+}
+
+_NUMERIC_COLS = ("DiaSemChuva", "Precipitacao", "RiscoFogo", "FRP")
+
+_GRID_SCORING = ScoringConfig(terms=(ScoreTerm("focos_recentes", 1.0, per="area_km2"),),
+                              granularity="grade", half_life_days=3)
+_RECENT_SCORING = ScoringConfig(terms=(ScoreTerm("focos_recentes", 1.0, norm="rank"),
+                                       ScoreTerm("risco_medio", 1.0, norm="minmax")), half_life_days=3)
+
+# domain
+benchmark("domain.normalize_dataframe")(lambda d: (lambda raw=d.raw: normalize_dataframe(raw)))
+benchmark("domain.validate_focos")(lambda d: lambda: validate_focos(d.df))
+
+# analytics.filters
+benchmark("filters.filter_by_date_range")(lambda d: lambda: filters.filter_by_date_range(d.df, d.start, d.end))
+benchmark("filters.filter_by_turno[preset]")(lambda d: lambda: filters.filter_by_turno(d.df, preset="Tarde"))
+benchmark("filters.filter_by_turno[custom]")(
+    lambda d: lambda: filters.filter_by_turno(d.df, custom_range=(pd.Timestamp("2000-01-01 22:00"),
+                                                                   pd.Timestamp("2000-01-01 05:30"))))
+benchmark("filters.filter_by_biomes")(lambda d: lambda: filters.filter_by_biomes(d.df, ["Cerrado", "Pantanal"]))
+benchmark("filters.filter_numeric_columns")(lambda d: lambda: filters.filter_numeric_columns(d.df, _NUMERIC_RULES))
+
+# analytics.aggregations (funções sobre linhas e o cubo)
+benchmark("aggregations.by_day")(lambda d: lambda: aggregations.by_day(d.df))
+benchmark("aggregations.by_biome")(lambda d: lambda: aggregations.by_biome(d.df))
+benchmark("aggregations.top_municipios")(lambda d: lambda: aggregations.top_municipios(d.df))
+benchmark("aggregations.series_by_dimension")(lambda d: lambda: aggregations.series_by_dimension(d.df, "estado_nome"))
+benchmark("aggregations.compute_critical_regions")(lambda d: lambda: aggregations.compute_critical_regions(d.df))
+benchmark("aggregations.FocosCube.from_frame")(lambda d: lambda: FocosCube.from_frame(d.df))
+benchmark("aggregations.FocosCube.critical_regions")(lambda d: (lambda cube=d.cube: cube.critical_regions()))
+benchmark("aggregations.compute_critical_regions[grade]")(
+    lambda d: lambda: aggregations.compute_critical_regions(d.df, scoring=_GRID_SCORING))
+benchmark("aggregations.FocosCube.critical_regions[recencia]")(
+    lambda d: (lambda cube=d.cube: cube.critical_regions(scoring=_RECENT_SCORING)))
+
+# analytics.stats
+benchmark("stats.spiking_regions")(lambda d: (lambda t=d.cube.table: spiking_regions(t)))
+benchmark("stats.grouped_quantiles")(
+    lambda d: lambda: grouped_quantiles(d.df, "municipio_nome", ["FRP", "RiscoFogo"]))
+benchmark("distributions.describe_numeric")(lambda d: lambda: describe_numeric(d.df, list(_NUMERIC_COLS)))
+benchmark("distributions.histogram+kde")(
+    lambda d: (lambda x=d.df["FRP"].to_numpy(): (histogram(x), kde(x))))
+benchmark("distributions.correlation")(lambda d: lambda: correlation(d.df, list(_NUMERIC_COLS)))
+
+# consulta indexada (caminho do painel)
+benchmark("query.FocosIndex.build")(lambda d: lambda: FocosIndex(d.df))
+benchmark("query.FocosIndex.query")(
+    lambda d: (lambda idx=d.index: idx.query({"estado": "PARÁ", "start": d.start, "end": d.end,
+                                              "numeric_rules": _NUMERIC_RULES})))
+
+# preparo de dados de mapas/gráficos
+benchmark("charts.colormap")(lambda d: lambda: colormap(d.df["RiscoFogo"].to_numpy(), RISK_PALETTE))
+benchmark("charts.point_layer_data")(lambda d: lambda: point_layer_data(d.df))
+benchmark("charts.grid_layer_data")(lambda d: lambda: grid_layer_data(d.df))
+benchmark("charts.chart_series[municipio]")(
+    lambda d: (lambda t=d.cube.series_by_dimension("municipio_nome"): chart_series(t, "municipio_nome")))
+benchmark("charts.time_chart_overall.to_dict")(
+    lambda d: (lambda dia=d.cube.by_day(): time_chart_overall(dia).to_dict()))
+
+# ---------------------------
+# Execução
+# ---------------------------
+@dataclass
+class BenchResult:
+    name: str
+    rows: int
+    min_s: float
+    median_s: float
+    repeats: int
+    peak_mb: float
+
+def measure(fn: Callable[[], Any], repeat: int = 3) -> tuple[list[float], float]:
+    """Tempos de repeat execuções e pico de memória alocada (MB) numa execução à parte."""
+    fn()  # aquecimento (imports, caches de dtype)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    # tracemalloc deixa a execução mais lenta: o pico é medido fora da cronometragem
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return times, peak / 2**20
+
+def run_suite(sizes: Iterable[int], repeat: int = 3, select: str | None = None,
+              seed: int = 0, log: Callable[[str], None] | None = None) -> list[BenchResult]:
+    """select: só os benchmarks cujo nome contém esse texto."""
+    names = [n for n in BENCHMARKS if not select or select in n]
+    results = []
+    for rows in sizes:
+        dados = Dados(rows, seed)
+        for name in names:
+            fn = BENCHMARKS[name](dados)
+            times, peak = measure(fn, repeat)
+            res = BenchResult(name, rows, min(times), float(np.median(times)), repeat, peak)
+            results.append(res)
+            if log:
+                log(f"{name:<45} {rows:>10,} linhas  {res.min_s * 1e3:>10.2f} ms  pico {peak:>8.1f} MB")
+    return results
+
+# ---------------------------
+# Resultados comparáveis entre commits
+# ---------------------------
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def save_results(results: list[BenchResult], path: Path) -> Path:
+    payload = {
+        "commit": _git_commit(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "maquina": {"python": platform.python_version(), "pandas": pd.__version__,
+                    "numpy": np.__version__, "plataforma": platform.platform(),
+                    "processador": platform.processor() or platform.machine()},
+        "resultados": [asdict(r) for r in results],
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+def load_results(path: Path) -> pd.DataFrame:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    return pd.DataFrame(payload["resultados"])
+
+def compare(base: pd.DataFrame, new: pd.DataFrame, threshold: float = 1.2) -> pd.DataFrame:
+    """
+    Razão novo/base do menor tempo e do pico de memória por (benchmark, linhas);
+    regressao=True quando o tempo piora mais que threshold.
+    """
+    keys = ["name", "rows"]
+    m = base[keys + ["min_s", "peak_mb"]].merge(new[keys + ["min_s", "peak_mb"]], on=keys,
+                                                 suffixes=("_base", "_novo"))
+    m["razao_tempo"] = m["min_s_novo"] / m["min_s_base"]
+    m["razao_memoria"] = m["peak_mb_novo"] / m["peak_mb_base"].where(m["peak_mb_base"] > 0)
+    m["regressao"] = m["razao_tempo"] > threshold
+    return m.sort_values("razao_tempo", ascending=False, ignore_index=True)
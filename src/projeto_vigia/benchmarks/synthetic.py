@@ -0,0 +1,135 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from projeto_vigia.config import FOCOS_SCHEMA, RENAME_MAP
+
+# (estado, sigla, peso nos focos, (lat_min, lat_max, lon_min, lon_max), {bioma: peso}, nº de municípios)
+_ESTADOS = [
+    ("PARÁ", "PA", 0.17, (-9.5, 2.5, -58.0, -46.5), {"Amazônia": .85, "Cerrado": .15}, 144),
+    ("MATO GROSSO", "MT", 0.16, (-18.0, -7.5, -61.5, -50.5), {"Amazônia": .45, "Cerrado": .45, "Pantanal": .10}, 141),
+    ("AMAZONAS", "AM", 0.10, (-9.5, 2.0, -72.0, -57.0), {"Amazônia": 1.0}, 62),
+    ("MARANHÃO", "MA", 0.09, (-10.0, -1.0, -48.5, -42.0), {"Cerrado": .65, "Amazônia": .30, "Caatinga": .05}, 217),
+    ("TOCANTINS", "TO", 0.08, (-13.0, -5.5, -50.5, -46.0), {"Cerrado": .90, "Amazônia": .10}, 139),
+    ("BAHIA", "BA", 0.07, (-18.0, -9.0, -46.5, -38.0), {"Caatinga": .50, "Cerrado": .35, "Mata Atlântica": .15}, 417),
+    ("RONDÔNIA", "RO", 0.06, (-13.5, -8.0, -66.5, -60.0), {"Amazônia": 1.0}, 52),
+    ("PIAUÍ", "PI", 0.05, (-10.5, -3.0, -45.5, -41.0), {"Cerrado": .55, "Caatinga": .45}, 224),
+    ("MATO GROSSO DO SUL", "MS", 0.05, (-24.0, -17.5, -58.0, -51.0), {"Cerrado": .60, "Pantanal": .30, "Mata Atlântica": .10}, 79),
+    ("MINAS GERAIS", "MG", 0.05, (-22.5, -14.5, -50.5, -40.0), {"Cerrado": .60, "Mata Atlântica": .35, "Caatinga": .05}, 853),
+    ("GOIÁS", "GO", 0.04, (-19.0, -13.0, -53.0, -46.0), {"Cerrado": 1.0}, 246),
+    ("ACRE", "AC", 0.03, (-11.0, -7.5, -73.5, -67.0), {"Amazônia": 1.0}, 22),
+    ("RORAIMA", "RR", 0.02, (0.0, 4.5, -64.0, -59.0), {"Amazônia": 1.0}, 15),
+    ("SÃO PAULO", "SP", 0.02, (-25.0, -20.0, -53.0, -44.5), {"Mata Atlântica": .75, "Cerrado": .25}, 645),
+    ("RIO GRANDE DO SUL", "RS", 0.01, (-33.5, -27.5, -57.5, -49.5), {"Pampa": .60, "Mata Atlântica": .40}, 497),
+]
+
+_SATELITES = (["GOES-19", "AQUA_M-T", "NOAA-20", "NPP-375"], [0.70, 0.10, 0.10, 0.10])
+
+# Revisitas: o GOES-19 varre a cada 10 minutos, então um mesmo fogo reaparece
+# em detecções quase coincidentes
+REVISIT_STEP_MIN = 10
+
+def _municipios(rng: np.random.Generator):
+    """Nome, centro, Bioma dominante e CDF de frequência de cada município sintético."""
+    names, lat, lon, bioma, cdf, offsets = [], [], [], [], [], [0]
+    biomas = sorted({b for e in _ESTADOS for b in e[4]})
+    for _, sigla, _, (la0, la1, lo0, lo1), mix, n_mun in _ESTADOS:
+        names += [f"MUNICIPIO {k + 1:03d} ({sigla})" for k in range(n_mun)]
+        lat.append(rng.uniform(la0, la1, n_mun))
+        lon.append(rng.uniform(lo0, lo1, n_mun))
+        p = np.array(list(mix.values()))
+        bioma.append(np.array([biomas.index(b) for b in mix])[rng.choice(len(mix), n_mun, p=p / p.sum())])
+        # cauda longa: peso do k-ésimo município ∝ 1/(k + 5)^1.2
+        w = 1.0 / (np.arange(n_mun) + 5.0) ** 1.2
+        cdf.append(len(cdf) + np.cumsum(w) / w.sum())  # deslocado pelo índice do estado
+        offsets.append(offsets[-1] + n_mun)
+    return (names, np.concatenate(lat), np.concatenate(lon), biomas,
+            np.concatenate(bioma), np.concatenate(cdf))
+
+def generate_focos(n: int, seed: int = 0, start: str = "2025-08-01", days: int = 30,
+                   revisit_frac: float = 0.3) -> pd.DataFrame:
+    """
+    Tabela de focos sintética já no esquema normalizado (config.FOCOS_SCHEMA),
+    com n linhas em ordem temporal:
+    - estados com pesos próximos aos da série do INPE e municípios com
+      frequência de cauda longa (Zipf), cada um com um Bioma dominante;
+    - ciclo diurno com pico no meio da tarde, horários na grade de 10 min;
+    - revisit_frac das detecções repetidas 1-3 vezes (a cada 10 min, ~1 km
+      de deslocamento), como as revisitas do GOES-19;
+    - DiaSemChuva/Precipitacao/RiscoFogo/FRP com nulos e caudas plausíveis.
+    Vetorizado: 10M linhas levam alguns segundos.
+    """
+    rng = np.random.default_rng(seed)
+    mun_names, mun_lat, mun_lon, biomas, mun_bioma, mun_cdf = _municipios(np.random.default_rng(12345))
+
+    # detecções "originais" + revisitas até completar n
+    extra = rng.geometric(0.6, n)  # 1, 2 ou 3 revisitas (cauda curta)
+    is_rev = rng.random(n) < revisit_frac
+    copies = 1 + np.where(is_rev, np.minimum(extra, 3), 0)
+    n_base = int(np.searchsorted(np.cumsum(copies), n)) + 1
+    copies = copies[:n_base]
+
+    w = np.array([e[2] for e in _ESTADOS])
+    estado = rng.choice(len(_ESTADOS), n_base, p=w / w.sum())
+    # município dentro do estado: busca na CDF concatenada (estado e ocupa (e, e + 1]);
+    # o mínimo protege do arredondamento em u ≈ 1
+    mun = np.minimum(np.searchsorted(mun_cdf, estado + rng.random(n_base), side="right"), len(mun_cdf) - 1)
+
+    day = rng.integers(0, days, n_base)
+    hour = np.where(rng.random(n_base) < 0.85,
+                    rng.normal(15.5, 2.5, n_base),
+                    rng.uniform(0, 24, n_base)) % 24
+    minutes = (day * 1440 + (hour * 60 // REVISIT_STEP_MIN) * REVISIT_STEP_MIN).astype(np.int64)
+
+    # expande as revisitas: índice da detecção original e ordem da repetição
+    src = np.repeat(np.arange(n_base), copies)[:n]
+    rep = (np.arange(len(src)) - np.repeat(np.cumsum(copies) - copies, copies)[:n])
+
+    # foco a ~15 km do centro do município; revisitas a ~1 km da detecção original
+    base_lat = mun_lat[mun] + rng.normal(0, 0.15, n_base)
+    base_lon = mun_lon[mun] + rng.normal(0, 0.15, n_base)
+    jitter = np.where(rep > 0, 0.01, 0.0)
+    lat = base_lat[src] + rng.normal(0, 1, n) * jitter
+    lon = base_lon[src] + rng.normal(0, 1, n) * jitter
+
+    data_hora = (np.datetime64(pd.Timestamp(start), "m")
+                 + (minutes[src] + rep * REVISIT_STEP_MIN).astype("timedelta64[m]")).astype("datetime64[ns]")
+
+    dias_base = np.minimum(rng.geometric(0.08, n_base) - 1, 120).astype("float32")
+    # risco cresce com a estiagem
+    risco = np.clip(rng.beta(5, 2, n_base) + dias_base / 300, 0, 1).astype("float32")
+    dias = dias_base[src]
+    dias[rng.random(n) < 0.02] = np.nan  # -999 no CSV bruto
+    precip = np.where(rng.random(n_base) < 0.8, 0.0, rng.exponential(3.0, n_base)).astype("float32")[src]
+    frp = (rng.lognormal(3.2, 1.0, n_base)[src] * rng.lognormal(0, 0.3, n)).astype("float32")
+    frp[rng.random(n) < 0.03] = np.nan
+    sat_names, sat_p = _SATELITES
+    sat = np.where(rep > 0, 0, rng.choice(len(sat_names), n, p=sat_p))
+
+    estado_names = [e[0] for e in _ESTADOS]
+    df = pd.DataFrame({
+        "data_hora": data_hora,
+        "lat": lat.astype("float32"),
+        "lon": lon.astype("float32"),
+        "estado_nome": pd.Categorical.from_codes(estado[src], estado_names),
+        "municipio_nome": pd.Categorical.from_codes(mun[src], mun_names),
+        "Bioma": pd.Categorical.from_codes(mun_bioma[mun[src]], biomas),
+        "Satelite": pd.Categorical.from_codes(sat, sat_names),
+        "Pais": pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), ["Brasil"]),
+        "DiaSemChuva": dias,
+        "Precipitacao": precip,
+        "RiscoFogo": risco[src],
+        "FRP": frp,
+    })
+    df = df.sort_values("data_hora", kind="stable", ignore_index=True)
+    return df[list(FOCOS_SCHEMA)]
+
+def to_raw(df: pd.DataFrame) -> pd.DataFrame:
+    """Mesmo conteúdo no formato do CSV do INPE (entrada de normalize_dataframe)."""
+    inverse = {v: k for k, v in RENAME_MAP.items()}
+    raw = df.rename(columns=inverse)
+    raw.insert(0, "FocoId", np.arange(1, len(df) + 1))
+    raw["DataHora"] = df["data_hora"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    for col in ("Estado", "Municipio", "Bioma", "Satelite", "Pais"):
+        raw[col] = raw[col].astype(str)
+    raw["DiaSemChuva"] = raw["DiaSemChuva"].fillna(-999)
+    return raw
@@ -1,7 +1,9 @@
 import altair as alt
 import pandas as pd
 from projeto_vigia.config import PRIMARY_COLOR
+from projeto_vigia.instrumentation import timed
 
+@timed("charts.bioma_chart")
 def bioma_chart(df_bioma: pd.DataFrame) -> alt.Chart:
     return (alt.Chart(df_bioma)
             .mark_bar()
@@ -11,6 +13,7 @@ def bioma_chart(df_bioma: pd.DataFrame) -> alt.Chart:
                     color=alt.Color("Bioma:N", legend=None, scale=alt.Scale(scheme="redyellowgreen")))
             .properties(title="Focos de Queimada por Bioma"))
 
+@timed("charts.municipio_chart")
 def municipio_chart(df_mun: pd.DataFrame) -> alt.Chart:
     return (alt.Chart(df_mun)
             .mark_bar(color=PRIMARY_COLOR)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from typing import Sequence, Tuple
+from projeto_vigia.instrumentation import timed
+
+Stop = Tuple[float, Tuple[int, int, int]]
+
+@timed("charts.colormap")
+def colormap(values: np.ndarray, stops: Sequence[Stop]) -> np.ndarray:
+    """
+    Rampa de cores vetorizada com N paradas (posição, (r, g, b)).
+    Valores fora das paradas são saturados; nulos recebem a primeira cor.
+    Retorna array (n, 3) uint8.
+    """
+    pos = np.array([p for p, _ in stops], dtype=np.float64)
+    rgb = np.array([c for _, c in stops], dtype=np.float64)
+    v = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=pos[0])
+    out = np.empty((len(v), 3), dtype=np.uint8)
+    for ch in range(3):
+        out[:, ch] = np.interp(v, pos, rgb[:, ch])
+    return out
+
+def add_color_columns(df: pd.DataFrame, values: np.ndarray, stops: Sequence[Stop]) -> pd.DataFrame:
+    """Grava as cores como colunas r, g, b (uint8), lidas no pydeck por "[r, g, b]"."""
+    rgb = colormap(values, stops)
+    df["r"], df["g"], df["b"] = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    return df
+
+def scaled_radius(values: np.ndarray, r_min: float, r_max: float) -> np.ndarray:
+    """Normaliza values para [0, 1] (min–máx) e mapeia em [r_min, r_max] metros."""
+    v = np.clip(np.asarray(values, dtype=np.float32), 0.0, None)
+    if not np.isfinite(v).any():
+        return np.full(len(v), r_min, dtype=np.float32)
+    lo, hi = np.nanmin(v), np.nanmax(v)
+    norm = (v - lo) / (hi - lo + 1e-9)
+    return np.nan_to_num(r_min + norm * (r_max - r_min), nan=r_min).astype(np.float32)
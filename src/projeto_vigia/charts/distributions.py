@@ -0,0 +1,32 @@
+import altair as alt
+import pandas as pd
+from projeto_vigia.instrumentation import timed
+
+@timed("charts.histogram_density_chart")
+def histogram_density_chart(hist: pd.DataFrame, dens: pd.DataFrame, variable: str) -> alt.LayerChart:
+    """
+    hist: inicio, fim, contagem, densidade; dens: x, densidade (analytics.distributions).
+    As barras usam a densidade para dividir o eixo y com a curva.
+    """
+    bars = (alt.Chart(hist)
+            .mark_bar(opacity=0.5)
+            .encode(x=alt.X("inicio:Q", title=variable, bin="binned"),
+                    x2="fim:Q",
+                    y=alt.Y("densidade:Q", title="Densidade"),
+                    tooltip=[alt.Tooltip("inicio:Q", format=".2f"), alt.Tooltip("fim:Q", format=".2f"),
+                             "contagem:Q"]))
+    curve = (alt.Chart(dens)
+             .mark_area(opacity=0.4)
+             .encode(x=alt.X("x:Q", title=variable), y="densidade:Q"))
+    return bars + curve
+
+@timed("charts.correlation_heatmap")
+def correlation_heatmap(corr: pd.DataFrame) -> alt.Chart:
+    # corr: Var1, Var2, corr (formato longo)
+    return (alt.Chart(corr)
+            .mark_rect()
+            .encode(
+                x="Var1:O", y="Var2:O",
+                color=alt.Color("corr:Q", scale=alt.Scale(scheme="redyellowblue", domain=(-1,1))),
+                tooltip=["Var1","Var2","corr"]
+            ).properties(height=300))
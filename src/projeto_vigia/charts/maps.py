@@ -1,36 +1,64 @@
 import streamlit as st
 import pydeck as pdk
 import pandas as pd
+import numpy as np
+from projeto_vigia.config import MAP_MAX_POINTS, MAP_TARGET_CELLS, RISK_PALETTE
+from projeto_vigia.domain.geo import KM_PER_DEG
+from projeto_vigia.instrumentation import timed
+from ..analytics.grid import aggregate_grid, cell_size_for_extent
+from .colormap import add_color_columns, scaled_radius
 
-def _risk_to_rgb(r):
+# ---------------------------
+# Dados das camadas (sem Streamlit: também usados pelos benchmarks)
+# ---------------------------
+@timed("charts.point_layer_data")
+def point_layer_data(df: pd.DataFrame, palette=RISK_PALETTE) -> pd.DataFrame:
+    dff = df[["lat","lon","RiscoFogo","FRP","estado_nome","municipio_nome","Bioma","Precipitacao","DiaSemChuva"]].copy()
+    # cor em colunas uint8 r/g/b (sem lista Python por linha)
+    add_color_columns(dff, dff["RiscoFogo"].to_numpy(), palette)
+    # raio base (em metros). FRP ~ 60..300 -> 300m a 2000m
+    dff["radius"] = scaled_radius(dff["FRP"].to_numpy(), 300, 2000)
+    return dff
+
+@timed("charts.grid_layer_data")
+def grid_layer_data(df: pd.DataFrame, cell_deg: float | None = None,
+                    palette=RISK_PALETTE) -> tuple[pd.DataFrame, float]:
+    """Células agregadas com cor/raio e o tamanho de célula usado."""
+    if cell_deg is None:
+        cell_deg = cell_size_for_extent(df["lat"].to_numpy(), df["lon"].to_numpy(), MAP_TARGET_CELLS)
+    cells = aggregate_grid(df, cell_deg)
+    add_color_columns(cells, cells["risco_medio"].to_numpy(), palette)
+    # raio: meia célula (em metros) escalada pela raiz da contagem relativa
+    half_cell_m = cell_deg * KM_PER_DEG * 1000 / 2
+    cells["radius"] = half_cell_m * np.sqrt(cells["focos"] / cells["focos"].max())
+    return cells, cell_deg
+
+# ---------------------------
+# Mapas
+# ---------------------------
+@timed("charts.simple_map")
+def simple_map(df: pd.DataFrame,
+               max_points: int = MAP_MAX_POINTS,
+               cell_deg: float | None = None,
+               palette=RISK_PALETTE):
     """
-    Mapeia RiscoFogo ∈ [0,1] para cor do amarelo ao vermelho:
-    0 -> amarelo (255, 215, 0)
-    1 -> vermelho (220, 20, 60)
+    Até max_points focos: um ponto por foco. Acima disso, os focos são agregados
+    numa grade lat/lon (cell_deg graus; None escolhe pela extensão dos dados) e
+    só as células vão para o navegador.
     """
-    r = max(0.0, min(1.0, float(r)))
-    # interpolação linear entre amarelo e vermelho
-    yellow = (255, 215, 0)
-    red = (220, 20, 60)
-    return [int(yellow[i] + (red[i]-yellow[i])*r) for i in range(3)]
-
-def simple_map(df: pd.DataFrame):
     if df.empty:
         st.info("Sem dados para mapear.")
         return
+    if len(df) > max_points:
+        grid_map(df, cell_deg, palette)
+        return
 
-    dff = df[["lat","lon","RiscoFogo","FRP","estado_nome","municipio_nome","Bioma","Precipitacao","DiaSemChuva"]].copy()
-    dff["color"] = dff["RiscoFogo"].apply(_risk_to_rgb)
-    # raio base (em metros). FRP ~ 60..300 -> normalize
-    frp = dff["FRP"].clip(lower=0.0)
-    frp_norm = (frp - frp.min()) / (frp.max() - frp.min() + 1e-9)
-    dff["radius"] = 300 + (frp_norm * 1700)  # 300m a 2000m
-
+    dff = point_layer_data(df, palette)
     layer = pdk.Layer(
         "ScatterplotLayer",
         data=dff,
         get_position="[lon, lat]",
-        get_fill_color="color",
+        get_fill_color="[r, g, b]",
         get_radius="radius",
         pickable=True,
         opacity=0.6,
@@ -44,3 +72,30 @@ def simple_map(df: pd.DataFrame):
     }
     r = pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip=tooltip, map_style=None)
     st.pydeck_chart(r)
+
+@timed("charts.grid_map")
+def grid_map(df: pd.DataFrame, cell_deg: float | None = None, palette=RISK_PALETTE):
+    lat = df["lat"].to_numpy()
+    lon = df["lon"].to_numpy()
+    cells, cell_deg = grid_layer_data(df, cell_deg, palette)
+    st.caption(f"{len(df)} focos agregados em {len(cells)} células de {cell_deg:.2f}° "
+               "(cor=risco médio, raio=nº de focos).")
+
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=cells,
+        get_position="[lon, lat]",
+        get_fill_color="[r, g, b]",
+        get_radius="radius",
+        pickable=True,
+        opacity=0.7,
+        radius_min_pixels=2,
+        radius_max_pixels=60,
+    )
+    view_state = pdk.ViewState(latitude=float(lat.mean()), longitude=float(lon.mean()), zoom=4)
+    tooltip = {
+        "html": "<b>{focos} focos</b><br/>Risco médio: {risco_medio}<br/>FRP máx: {frp_max}<br/>FRP médio: {frp_medio}",
+        "style": {"backgroundColor": "black", "color": "white"}
+    }
+    r = pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip=tooltip, map_style=None)
+    st.pydeck_chart(r)
@@ -1,26 +1,43 @@
 import altair as alt
 import pandas as pd
+from projeto_vigia.analytics.timeseries import FREQ_LABELS
+from projeto_vigia.instrumentation import timed
 
-def time_chart_overall(focos_por_dia: pd.DataFrame) -> alt.Chart:
+# acima disso os marcadores de ponto só poluem a linha (e pesam no navegador)
+_MAX_POINT_MARKS = 120
+
+def _x(freq: str) -> alt.X:
+    return alt.X("data:T", title="Data/Hora" if freq == "h" else "Data")
+
+@timed("charts.time_chart_overall")
+def time_chart_overall(focos_por_dia: pd.DataFrame, freq: str = "D") -> alt.Chart:
+    # focos_por_dia: colunas data, contagem (um intervalo de freq por linha; ver analytics.timeseries)
+    unidade = FREQ_LABELS.get(freq, "dia")
     return (alt.Chart(focos_por_dia)
-            .mark_line(point=True)
+            .mark_line(point=len(focos_por_dia) <= _MAX_POINT_MARKS)
             .encode(
-                x=alt.X("data:T", title="Data"),
-                y=alt.Y("contagem:Q", title="Focos por dia"),
+                x=_x(freq),
+                y=alt.Y("contagem:Q", title=f"Focos por {unidade}"),
                 tooltip=["data:T","contagem:Q"]
             )
-            .properties(title="Evolução diária (geral)")
+            .properties(title=f"Evolução por {unidade} (geral)")
             .interactive())
 
-def time_chart_by_dimension(df_series: pd.DataFrame, dimension: str) -> alt.Chart:
+@timed("charts.time_chart_by_dimension")
+def time_chart_by_dimension(df_series: pd.DataFrame, dimension: str, freq: str = "D") -> alt.Chart:
     # df_series: colunas: data, dimension, contagem
+    unidade = FREQ_LABELS.get(freq, "dia")
+    n_lines = max(df_series[dimension].nunique(), 1) if len(df_series) else 1
+    # ordem das categorias (top-k + "Outros") vira a ordem da legenda
+    order = (list(df_series[dimension].cat.categories)
+             if isinstance(df_series[dimension].dtype, pd.CategoricalDtype) else alt.Undefined)
     return (alt.Chart(df_series)
-            .mark_line(point=True)
+            .mark_line(point=len(df_series) / n_lines <= _MAX_POINT_MARKS)
             .encode(
-                x=alt.X("data:T", title="Data"),
-                y=alt.Y("contagem:Q", title="Focos por dia"),
-                color=alt.Color(f"{dimension}:N", title=dimension),
+                x=_x(freq),
+                y=alt.Y("contagem:Q", title=f"Focos por {unidade}"),
+                color=alt.Color(f"{dimension}:N", title=dimension, sort=order),
                 tooltip=["data:T","contagem:Q", alt.Tooltip(f"{dimension}:N", title=dimension)]
             )
-            .properties(title=f"Evolução diária por {dimension}")
+            .properties(title=f"Evolução por {unidade} e {dimension}")
             .interactive())
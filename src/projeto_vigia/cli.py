@@ -0,0 +1,89 @@
+from __future__ import annotations
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from projeto_vigia import instrumentation
+from projeto_vigia.analytics.scoring import ScoringConfig
+from projeto_vigia.api import DEFAULT_TABLES, TABLES, ArchiveAPI, load_source, run_batch
+from projeto_vigia.config import SOURCE_URLS
+
+def write_table(df: pd.DataFrame, path: Path, fmt: str) -> Path:
+    path = path.with_suffix(f".{fmt}")
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_json(path, orient="records", date_format="iso", force_ascii=False, indent=2)
+    return path
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="vigia",
+        description="Executa análises do Painel de Queimadas sem o Streamlit.",
+    )
+    p.add_argument("consultas", type=Path,
+                   help="JSON com uma lista de consultas no formato dos filtros da sidebar "
+                        "(campo opcional 'nome' para nomear a saída).")
+    p.add_argument("--fonte", action="append",
+                   help="URL ou arquivo .csv/.csv.gz/.parquet; repita para unir várias fontes (padrão: SOURCE_URLS, as mesmas do painel).")
+    p.add_argument("--saida", type=Path, default=Path("saida_vigia"), help="Diretório de saída.")
+    p.add_argument("--formato", choices=["parquet", "csv", "json"], default="csv")
+    p.add_argument("--tabelas", nargs="+", choices=TABLES, default=list(DEFAULT_TABLES))
+    p.add_argument("--top-n", type=int, default=5, help="Quantidade de regiões críticas.")
+    p.add_argument("--pontuacao", type=Path,
+                   help="JSON com pesos/granularidade do score das regiões críticas "
+                        "(formato de analytics.scoring.ScoringConfig).")
+    p.add_argument("--processos", type=int, default=1,
+                   help="Processos para consultas em paralelo (não vale com --historico).")
+    p.add_argument("--historico", type=Path,
+                   help="Diretório do histórico particionado (services.archive): cada consulta lê só "
+                        "os meses/estado que cobre, em vez de carregar a base inteira.")
+    p.add_argument("--arquivar", action="store_true",
+                   help="Com --historico, acrescenta as fontes de --fonte ao histórico antes das consultas.")
+    p.add_argument("--metricas", type=Path,
+                   help="Grava tempos/linhas por etapa (formato texto do Prometheus) neste arquivo; "
+                        "com --processos > 1, só as etapas do processo principal.")
+    return p
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.historico and args.processos > 1:
+        # cada consulta do histórico já lê só o seu recorte; os recortes ficam num único processo
+        parser.error("--processos não pode ser usado com --historico (as consultas rodam em sequência).")
+    consultas = json.loads(args.consultas.read_text(encoding="utf-8"))
+    if isinstance(consultas, dict):
+        consultas = [consultas]
+    nomes = [c.get("nome") or f"consulta_{i:03d}" for i, c in enumerate(consultas)]
+
+    if args.metricas:
+        instrumentation.enable()
+    fonte = args.fonte or list(SOURCE_URLS)
+    scoring = (ScoringConfig.from_mapping(json.loads(args.pontuacao.read_text(encoding="utf-8")))
+               if args.pontuacao else None)
+    if args.historico:
+        api = ArchiveAPI(args.historico)
+        if args.arquivar:
+            n = api.append(load_source(fonte[0] if len(fonte) == 1 else fonte))
+            print(f"histórico: {n} arquivos gravados em {args.historico}")
+        results = [api.run(c, args.tabelas, args.top_n, scoring) for c in consultas]
+    else:
+        results = run_batch(fonte[0] if len(fonte) == 1 else fonte, consultas, args.tabelas, args.top_n,
+                            args.processos, scoring)
+    for nome, tables in zip(nomes, results):
+        out_dir = args.saida / nome
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for table, df in tables.items():
+            path = write_table(df, out_dir / table, args.formato)
+            print(f"{nome}: {table} -> {path} ({len(df)} linhas)")
+    if args.metricas:
+        args.metricas.write_text(instrumentation.prometheus_text(), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
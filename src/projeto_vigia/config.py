@@ -1,13 +1,94 @@
 from __future__ import annotations
+import os
+from pathlib import Path
 
 PRIMARY_COLOR = "#ff6347"  # Tomate
 FILE_URL = "https://drive.google.com/uc?export=download&id=1YlThY76iiE6TwU9ZPlBfNkm8FsccjCZm"
+# Fontes da base, unidas numa só (ex.: acrescente um CSV por mês ou satélite);
+# são buscadas em paralelo, cada uma com seu cache
+SOURCE_URLS = (FILE_URL,)
 LOGO_URL = "https://drive.google.com/uc?export=download&id=1sUYhDEuduVYtF9dBn0CcIRYiMT9qc7o4"
 
+# Cache local (Parquet) da base normalizada; sobrescreva com VIGIA_CACHE_DIR
+CACHE_DIR = Path(os.environ.get("VIGIA_CACHE_DIR", Path.home() / ".cache" / "projeto_vigia"))
+
 ESSENTIAL_COLS = [
     "DataHora", "Latitude", "Longitude", "Estado", "Municipio", "Bioma", "DiaSemChuva", "RiscoFogo"
 ]
 
+# Colunas lidas junto com as essenciais (ausentes no CSV viram nulas)
+OPTIONAL_COLS = ["FRP", "Precipitacao", "Satelite", "Pais"]
+
+# Rampa de cor do risco de fogo: (posição em [0, 1], (r, g, b)); aceita N paradas
+RISK_PALETTE = [
+    (0.0, (255, 215, 0)),   # amarelo
+    (1.0, (220, 20, 60)),   # vermelho
+]
+
+# Mapa: acima de MAP_MAX_POINTS focos, os pontos são agregados em grade
+MAP_MAX_POINTS = 20_000
+MAP_TARGET_CELLS = 5_000
+
+# Séries temporais: largura (hora/dia/semana/mês) escolhida para ter até
+# TIME_MAX_BINS intervalos; dimensões com muitas categorias mostram as
+# TIME_TOP_K maiores + "Outros"; linhas longas são reduzidas (LTTB) a
+# TIME_MAX_POINTS pontos (o Altair recusa mais de 5000 linhas por gráfico)
+TIME_MAX_BINS = 400
+TIME_TOP_K = 8
+TIME_MAX_POINTS = 300
+
+# Aba Estatística: histogramas (até HIST_MAX_BINS barras) e densidades
+# (KDE em KDE_GRID_POINTS pontos) calculados no servidor; quantis e
+# largura de banda a partir de uma amostra de até STATS_SAMPLE_ROWS valores
+HIST_MAX_BINS = 60
+KDE_GRID_POINTS = 256
+STATS_SAMPLE_ROWS = 200_000
+
+# Municípios em alta: focos do dia contra os ANOMALY_WINDOW_DAYS dias
+# anteriores; alerta com z-score ≥ ANOMALY_Z e ao menos ANOMALY_MIN_FOCOS focos
+ANOMALY_WINDOW_DAYS = 28
+ANOMALY_Z = 3.0
+ANOMALY_MIN_FOCOS = 5
+
+# Agrupamento de revisitas do satélite em eventos de fogo: detecções a até
+# EVENT_MAX_DIST_KM e EVENT_MAX_GAP_MIN minutos de outra do mesmo evento
+EVENT_MAX_DIST_KM = 5.0
+EVENT_MAX_GAP_MIN = 60
+
+# Validação da base: caixa (lat_min, lat_max, lon_min, lon_max) que contém o
+# Brasil com as ilhas oceânicas; valor usado pelo INPE para "sem dado"
+BRAZIL_BBOX = (-34.0, 5.5, -74.1, -28.5)
+MISSING_SENTINEL = -999
+
+# Histórico de várias temporadas (opcional): diretório de services.archive
+# (Parquet particionado por mês e estado). Com VIGIA_ARCHIVE_DIR, o painel lê
+# de lá só os meses/estado de cada consulta, em vez de carregar SOURCE_URLS;
+# os últimos ARCHIVE_MAX_SLICES recortes lidos ficam em memória
+ARCHIVE_DIR = os.environ.get("VIGIA_ARCHIVE_DIR") or None
+ARCHIVE_MAX_SLICES = 4
+
+# Linhas por bloco na leitura em streaming do CSV
+CSV_CHUNKSIZE = 200_000
+
+# Dados brutos: linhas por página no visualizador e por bloco na exportação
+RAW_PAGE_SIZES = (50, 100, 500, 1000)
+EXPORT_CHUNK_ROWS = 100_000
+# Teto do arquivo entregue pelo botão de download: o st.download_button lê o
+# arquivo inteiro e o Streamlit guarda essa cópia em memória enquanto o botão
+# estiver na tela; seleções maiores saem pela linha de comando (--tabelas focos)
+EXPORT_MAX_DOWNLOAD_MB = 200
+
+# Ingestão contínua (opcional): diretório com lotes novos ou URL de um arquivo
+# que cresce; sem VIGIA_LIVE_SOURCE o painel só recarrega a base uma vez por dia.
+LIVE_SOURCE = os.environ.get("VIGIA_LIVE_SOURCE") or None
+LIVE_POLL_SECONDS = 60
+# Janela móvel: focos mais antigos que isso (em relação ao mais recente) saem da memória
+LIVE_WINDOW_HOURS = 72
+
+# Cache de resultados de consultas (compartilhado entre sessões)
+RESULT_CACHE_MAX_MB = 256
+RESULT_CACHE_TTL_S = 3600
+
 RENAME_MAP = {
     "DataHora": "data_hora",
     "Latitude": "lat",
@@ -15,3 +96,20 @@ RENAME_MAP = {
     "Estado": "estado_nome",
     "Municipio": "municipio_nome",
 }
+
+# Esquema da base normalizada (nomes após RENAME_MAP). Colunas fora dele são
+# descartadas na carga; textos de baixa cardinalidade viram category.
+FOCOS_SCHEMA = {
+    "data_hora": "datetime64[ns]",
+    "lat": "float32",
+    "lon": "float32",
+    "estado_nome": "category",
+    "municipio_nome": "category",
+    "Bioma": "category",
+    "Satelite": "category",
+    "Pais": "category",
+    "DiaSemChuva": "float32",
+    "Precipitacao": "float32",
+    "RiscoFogo": "float32",
+    "FRP": "float32",
+}
@@ -3,11 +3,19 @@ from pydantic import BaseModel
 from datetime import datetime
 
 class FocoQueimada(BaseModel):
+    """
+    Um registro da base normalizada (ver config.FOCOS_SCHEMA). As mesmas regras
+    são aplicadas em lote, por coluna, em domain.validation.
+    """
     data_hora: datetime
     lat: float
     lon: float
     estado_nome: str
     municipio_nome: str
     Bioma: str
+    Satelite: str | None = None
+    Pais: str | None = None
     DiaSemChuva: float | None
+    Precipitacao: float | None = None
     RiscoFogo: float
+    FRP: float | None = None
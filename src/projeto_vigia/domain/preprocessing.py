@@ -1,17 +1,190 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
-from projeto_vigia.config import ESSENTIAL_COLS, RENAME_MAP
+from pandas.api.types import union_categoricals
+from projeto_vigia.config import (
+    ESSENTIAL_COLS, RENAME_MAP, FOCOS_SCHEMA, EVENT_MAX_DIST_KM, EVENT_MAX_GAP_MIN
+)
+from projeto_vigia.instrumentation import timed
+from .geo import KM_PER_DEG, haversine_km
+from .validation import FocosValidator
 
-def normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+@timed("domain.normalize_dataframe")
+def normalize_dataframe(df: pd.DataFrame, validator: FocosValidator | None = None) -> pd.DataFrame:
+    """
+    Renomeia, tipa e valida um bloco do CSV do INPE. Linhas que violam o
+    esquema de FocoQueimada saem; validator acumula o relatório (e as
+    duplicatas) entre blocos de um mesmo arquivo.
+    """
     # Garante colunas essenciais
     if not all(c in df.columns for c in ESSENTIAL_COLS):
         missing = [c for c in ESSENTIAL_COLS if c not in df.columns]
         raise ValueError(f"CSV sem colunas essenciais: {', '.join(missing)}")
 
-    df = df.copy()
-    df.rename(columns=RENAME_MAP, inplace=True)
-    df["data_hora"] = pd.to_datetime(df["data_hora"], errors="coerce")
-    df["DiaSemChuva"] = pd.to_numeric(df["DiaSemChuva"], errors="coerce").replace(-999, pd.NA)
-    df["RiscoFogo"] = pd.to_numeric(df["RiscoFogo"], errors="coerce")
-    df.dropna(subset=["lat", "lon", "data_hora", "RiscoFogo"], inplace=True)
-    return df
+    df = df.rename(columns=RENAME_MAP)
+    # Projeta no esquema fixo: colunas extras saem, opcionais ausentes entram nulas
+    out = pd.DataFrame(index=df.index)
+    for col, dtype in FOCOS_SCHEMA.items():
+        src = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+        if col == "data_hora":
+            out[col] = pd.to_datetime(src, errors="coerce")
+        elif dtype == "category":
+            out[col] = src.astype("category")
+        else:
+            out[col] = pd.to_numeric(src, errors="coerce").astype(dtype)
+    # sentinelas -999 viram nulos e as linhas fora do esquema saem (domain.validation)
+    return (validator or FocosValidator())(out)
+
+@timed("domain.concat_normalized")
+def concat_normalized(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena blocos normalizados preservando as colunas category
+    (pd.concat cairia para object se as categorias dos blocos diferirem).
+    """
+    parts = [p for p in parts if len(p)] or parts[:1]
+    if len(parts) == 1:
+        return parts[0].reset_index(drop=True)
+    out = pd.concat(parts, ignore_index=True)
+    for col, dtype in FOCOS_SCHEMA.items():
+        if dtype == "category" and col in out.columns:
+            out[col] = union_categoricals([p[col] for p in parts], ignore_order=True)
+    return out
+
+# Identidade de um foco: a mesma detecção (hora e posição) não entra duas vezes
+ROW_KEY = ["data_hora", "lat", "lon", "estado_nome", "municipio_nome", "Bioma"]
+
+def row_hash(df: pd.DataFrame) -> np.ndarray:
+    """Hash (uint64) da ROW_KEY de cada linha."""
+    return pd.util.hash_pandas_object(df[ROW_KEY], index=False).to_numpy()
+
+# ---------------------------
+# Revisitas -> eventos de fogo
+# ---------------------------
+def _connected_components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Rótulo (menor índice) do componente de cada nó; ligação + compressão de caminhos vetorizadas."""
+    labels = np.arange(n)
+    while True:
+        la, lb = labels[a], labels[b]
+        diff = la != lb
+        if not diff.any():
+            return labels
+        lo = np.minimum(la[diff], lb[diff])
+        np.minimum.at(labels, la[diff], lo)
+        np.minimum.at(labels, lb[diff], lo)
+        while True:
+            nxt = labels[labels]
+            if np.array_equal(nxt, labels):
+                break
+            labels = nxt
+
+def _expand_ranges(lo: np.ndarray, hi: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pares (i, j) com lo[i] <= j < hi[i], sem laço Python."""
+    counts = np.maximum(hi - lo, 0)
+    owner = np.repeat(np.arange(len(lo)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(lo, counts) + offset
+
+@timed("domain.cluster_fire_events")
+def cluster_fire_events(df: pd.DataFrame,
+                        max_dist_km: float = EVENT_MAX_DIST_KM,
+                        max_gap_min: float = EVENT_MAX_GAP_MIN) -> np.ndarray:
+    """
+    Rótulo de evento (0..k-1, na ordem da primeira detecção) para cada linha de df.
+    Duas detecções ficam no mesmo evento se houver uma cadeia de detecções com
+    distância <= max_dist_km e intervalo <= max_gap_min entre elos consecutivos.
+
+    Hash em grade + ordenação: os pontos são ordenados por (célula, tempo) e, em
+    cada célula vizinha, as detecções dos max_gap_min minutos anteriores a um
+    ponto formam um intervalo contíguo (duas buscas binárias). Todos os pares
+    desses intervalos são conferidos por haversine, então a ligação simples é
+    exata; o custo é O(n log n + pares candidatos), sem laço Python por linha.
+    """
+    n = len(df)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    lat = df["lat"].to_numpy(dtype=np.float64)
+    lon = df["lon"].to_numpy(dtype=np.float64)
+    ts = df["data_hora"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    t = ts - ts.min()
+    gap = int(round(max_gap_min * 60))  # inteiro: entra no deslocamento de bits abaixo
+
+    # células com lado = max_dist_km (em latitude); em longitude, mais vizinhas
+    # conforme a latitude encolhe o grau
+    cell = max_dist_km / KM_PER_DEG
+    iy = np.floor((lat + 90.0) / cell).astype(np.int64)
+    ix = np.floor((lon + 180.0) / cell).astype(np.int64)
+    nx = int(np.ceil(1.0 / np.cos(np.radians(min(np.abs(lat).max() + cell, 89.0)))))
+    key = iy * 10_000_000 + ix
+    ukeys, cid = np.unique(key, return_inverse=True)
+
+    # tudo em espaço ordenado por (célula, tempo): as buscas binárias recebem
+    # agulhas quase ordenadas, o que as mantém amigáveis ao cache
+    order = np.lexsort((t, cid))
+    lat, lon, t, key, cid = lat[order], lon[order], t[order], key[order], cid[order]
+    comp = (cid << 31) | t
+
+    src, dst = [], []
+    for dy in (-1, 0, 1):
+        for dx in range(-nx, nx + 1):
+            nkey = key + dy * 10_000_000 + dx
+            nid = np.searchsorted(ukeys, nkey)
+            ok = nid < len(ukeys)
+            ok[ok] = ukeys[nid[ok]] == nkey[ok]
+            p = np.flatnonzero(ok)
+            # detecções da célula vizinha em [t - gap, t]: cada par é visto a partir do mais recente
+            lo = np.searchsorted(comp, (nid[p] << 31) | np.maximum(t[p] - gap, 0), side="left")
+            hi = np.searchsorted(comp, (nid[p] << 31) | t[p], side="right")
+            i, j = _expand_ranges(lo, hi)
+            keep = p[i] != j
+            src.append(p[i][keep])
+            dst.append(j[keep])
+
+    a = np.concatenate(src)
+    b = np.concatenate(dst)
+    close = haversine_km(lat[a], lon[a], lat[b], lon[b]) <= max_dist_km
+    labels_sorted = _connected_components(n, a[close], b[close])
+    labels = np.empty(n, dtype=np.int64)
+    labels[order] = labels_sorted
+    t_orig = np.empty(n, dtype=np.int64)
+    t_orig[order] = t
+    t = t_orig
+
+    # renumera pela ordem da primeira detecção
+    roots, inv = np.unique(labels, return_inverse=True)
+    first = np.full(len(roots), np.iinfo(np.int64).max)
+    np.minimum.at(first, inv, t)
+    rank = np.empty(len(roots), dtype=np.int64)
+    rank[np.lexsort((roots, first))] = np.arange(len(roots))
+    return rank[inv]
+
+@timed("domain.fire_events")
+def fire_events(df: pd.DataFrame,
+                max_dist_km: float = EVENT_MAX_DIST_KM,
+                max_gap_min: float = EVENT_MAX_GAP_MIN) -> pd.DataFrame:
+    """
+    Consolida detecções em eventos de fogo, no mesmo esquema da base normalizada
+    (uma linha por evento, então contagens e agregações passam a contar eventos):
+    data_hora = primeira detecção, lat/lon = centro, FRP = pico, RiscoFogo e
+    DiaSemChuva = máximos, Precipitacao = média; dimensões (todas) da linha da
+    primeira detecção, mesmo as nulas.
+    Colunas extras: ultima_deteccao, n_deteccoes.
+    """
+    if df.empty:
+        return df.assign(ultima_deteccao=df["data_hora"], n_deteccoes=pd.Series(dtype="int64"))
+    ev = cluster_fire_events(df, max_dist_km, max_gap_min)
+    ordered = df.assign(_evento=ev).sort_values(["_evento", "data_hora"], kind="stable")
+    g = ordered.groupby("_evento", sort=True)
+    dims = [c for c, dtype in FOCOS_SCHEMA.items() if dtype == "category" and c in df.columns]
+    # first() pularia nulos e misturaria linhas; a primeira linha de cada evento inteira
+    out = ordered.drop_duplicates("_evento").set_index("_evento")[dims]
+    out["data_hora"] = g["data_hora"].min()
+    out["ultima_deteccao"] = g["data_hora"].max()
+    out["n_deteccoes"] = g.size()
+    out["lat"] = g["lat"].mean()
+    out["lon"] = g["lon"].mean()
+    out["FRP"] = g["FRP"].max()
+    out["RiscoFogo"] = g["RiscoFogo"].max()
+    out["DiaSemChuva"] = g["DiaSemChuva"].max()
+    out["Precipitacao"] = g["Precipitacao"].mean()
+    cols = [c for c in FOCOS_SCHEMA if c in out.columns] + ["ultima_deteccao", "n_deteccoes"]
+    return out[cols].reset_index(drop=True)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import unicodedata
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+from projeto_vigia.config import BRAZIL_BBOX, FOCOS_SCHEMA, MISSING_SENTINEL
+from projeto_vigia.instrumentation import timed
+
+# Vocabulários de FocoQueimada (comparados sem acento e sem distinção de caixa)
+ESTADOS = (
+    "ACRE", "ALAGOAS", "AMAPÁ", "AMAZONAS", "BAHIA", "CEARÁ", "DISTRITO FEDERAL",
+    "ESPÍRITO SANTO", "GOIÁS", "MARANHÃO", "MATO GROSSO", "MATO GROSSO DO SUL",
+    "MINAS GERAIS", "PARÁ", "PARAÍBA", "PARANÁ", "PERNAMBUCO", "PIAUÍ", "RIO DE JANEIRO",
+    "RIO GRANDE DO NORTE", "RIO GRANDE DO SUL", "RONDÔNIA", "RORAIMA", "SANTA CATARINA",
+    "SÃO PAULO", "SERGIPE", "TOCANTINS",
+)
+BIOMAS = ("Amazônia", "Caatinga", "Cerrado", "Mata Atlântica", "Pampa", "Pantanal")
+
+# Regras, na ordem do relatório; uma linha pode violar várias
+NON_NEGATIVE = {"FRP": "frp_negativo", "DiaSemChuva": "dias_sem_chuva_negativo",
+                "Precipitacao": "precipitacao_negativa"}
+RULES = ("data_hora_invalida", "coordenada_ausente", "fora_do_brasil", "risco_fora_de_0_1",
+         *NON_NEGATIVE.values(), "estado_desconhecido", "municipio_ausente", "bioma_desconhecido",
+         "duplicada")
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text).strip())
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold()
+
+_ESTADOS_FOLDED = frozenset(_fold(e) for e in ESTADOS)
+_BIOMAS_FOLDED = frozenset(_fold(b) for b in BIOMAS)
+
+@dataclass
+class ValidationReport:
+    """Linhas lidas, aceitas e rejeitadas por regra; sentinelas -999 trocados por nulo, por coluna."""
+    rows: int = 0
+    accepted: int = 0
+    rejected_by_rule: dict[str, int] = field(default_factory=lambda: dict.fromkeys(RULES, 0))
+    sentinels: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rejected(self) -> int:
+        return self.rows - self.accepted
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "rejected": self.rejected}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Uma linha por regra: linhas rejeitadas e % das linhas lidas."""
+        out = pd.DataFrame({"regra": list(self.rejected_by_rule),
+                            "linhas": list(self.rejected_by_rule.values())})
+        out["pct"] = 100.0 * out["linhas"] / max(self.rows, 1)
+        return out
+
+def _category_mask(values: pd.Series, allowed: frozenset[str]) -> np.ndarray:
+    """True onde values está fora de allowed (ou é nulo); só as categorias passam pelo Python."""
+    cat = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category")
+    known = np.array([_fold(c) in allowed for c in cat.cat.categories] + [False])
+    return ~known[cat.cat.codes.to_numpy()]  # código -1 (nulo) cai no último item
+
+def _in_sorted(values: np.ndarray, sorted_values: np.ndarray) -> np.ndarray:
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[pos] == values
+
+class FocosValidator:
+    """
+    Aplica as regras de FocoQueimada a blocos já tipados (normalize_dataframe),
+    coluna a coluna, e acumula o relatório. Duplicatas valem entre blocos: o
+    hash de cada linha aceita fica guardado (8 bytes por linha).
+    """
+
+    def __init__(self, bbox: tuple[float, float, float, float] = BRAZIL_BBOX):
+        self.bbox = bbox
+        self.report = ValidationReport()
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    def _nullify_sentinels(self, df: pd.DataFrame) -> pd.DataFrame:
+        for col, dtype in FOCOS_SCHEMA.items():
+            if col not in df.columns or not dtype.startswith("float"):
+                continue
+            hit = df[col].to_numpy() == MISSING_SENTINEL
+            n = int(hit.sum())
+            if n:
+                df[col] = df[col].mask(hit)
+                self.report.sentinels[col] = self.report.sentinels.get(col, 0) + n
+        return df
+
+    def _duplicates(self, df: pd.DataFrame, ok: np.ndarray) -> np.ndarray:
+        h = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        idx = np.flatnonzero(ok)
+        uniq, first = np.unique(h[idx], return_index=True)
+        dup = np.zeros(len(df), dtype=bool)
+        dup[idx] = True
+        dup[idx[first]] = False                         # repetidas dentro do bloco
+        seen = _in_sorted(h[idx], self._seen)           # já vistas em blocos anteriores
+        dup[idx] |= seen
+        new = uniq[~seen[first]]
+        # intercalação de dois vetores ordenados (a ordenação estável aproveita as sequências)
+        self._seen = np.sort(np.concatenate([self._seen, new]), kind="stable")
+        return dup
+
+    @timed("domain.validate_focos")
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Linhas de df que passam em todas as regras (sentinelas já trocados por nulo)."""
+        df = self._nullify_sentinels(df.copy(deep=False))
+        lat_min, lat_max, lon_min, lon_max = self.bbox
+        lat = df["lat"].to_numpy(dtype="float64")
+        lon = df["lon"].to_numpy(dtype="float64")
+        risco = df["RiscoFogo"].to_numpy(dtype="float64")
+        with np.errstate(invalid="ignore"):
+            masks = {
+                "data_hora_invalida": df["data_hora"].isna().to_numpy(),
+                "coordenada_ausente": np.isnan(lat) | np.isnan(lon),
+                "fora_do_brasil": (lat < lat_min) | (lat > lat_max) | (lon < lon_min) | (lon > lon_max),
+                "risco_fora_de_0_1": ~((risco >= 0) & (risco <= 1)),
+                **{rule: df[col].to_numpy(dtype="float64") < 0
+                   for col, rule in NON_NEGATIVE.items() if col in df.columns},
+                "estado_desconhecido": _category_mask(df["estado_nome"], _ESTADOS_FOLDED),
+                "municipio_ausente": df["municipio_nome"].isna().to_numpy(),
+                "bioma_desconhecido": _category_mask(df["Bioma"], _BIOMAS_FOLDED),
+            }
+        bad = np.logical_or.reduce(list(masks.values()))
+        masks["duplicada"] = self._duplicates(df, ~bad)
+        bad |= masks["duplicada"]
+
+        report = self.report
+        report.rows += len(df)
+        report.accepted += int(len(df) - bad.sum())
+        for rule, mask in masks.items():
+            report.rejected_by_rule[rule] += int(mask.sum())
+        return df[~bad] if bad.any() else df
+
+def validate_focos(df: pd.DataFrame) -> tuple[pd.DataFrame, ValidationReport]:
+    """Linhas aceitas de df e o relatório (use FocosValidator para vários blocos)."""
+    validator = FocosValidator()
+    return validator(df), validator.report
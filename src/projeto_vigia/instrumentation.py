@@ -0,0 +1,178 @@
+from __future__ import annotations
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Iterator
+
+logger = logging.getLogger("projeto_vigia.perf")
+
+# Coleta global (logs + métricas Prometheus); sobrescreva com VIGIA_PROFILE=1.
+# Desligada, cada etapa instrumentada custa só uma checagem de flag e um ContextVar.get.
+_enabled = os.environ.get("VIGIA_PROFILE") == "1"
+
+@dataclass
+class StageRecord:
+    stage: str
+    seconds: float = 0.0
+    rows_in: int | None = None
+    rows_out: int | None = None
+    mem_delta: int | None = None  # bytes de RSS (pode ser negativo)
+    depth: int = 0
+
+@dataclass
+class Trace:
+    """Etapas de uma execução (ex.: um clique em "Analisar"), na ordem em que terminaram."""
+    records: list[StageRecord] = field(default_factory=list)
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame([asdict(r) for r in self.records],
+                            columns=["stage", "seconds", "rows_in", "rows_out", "mem_delta", "depth"])
+
+_trace: ContextVar[Trace | None] = ContextVar("vigia_trace", default=None)
+_depth: ContextVar[int] = ContextVar("vigia_stage_depth", default=0)
+
+# Totais por etapa desde o início do processo (export Prometheus)
+_totals: dict[str, list[float]] = {}
+_totals_lock = threading.Lock()
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+def is_active() -> bool:
+    return _enabled or _trace.get() is not None
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """Coleta as etapas executadas neste contexto (thread/sessão), mesmo com a coleta global desligada."""
+    t = Trace()
+    token = _trace.set(t)
+    try:
+        yield t
+    finally:
+        _trace.reset(token)
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _rows(obj: Any) -> int | None:
+    # DataFrame, Series, ndarray, FocosCube, FocosIndex...: o que tiver __len__ e não for texto/mapa
+    if obj is None or isinstance(obj, (str, bytes, dict)):
+        return None
+    try:
+        return len(obj)
+    except Exception:
+        return None
+
+def _accumulate(totals: dict[str, list[float]], rec: StageRecord) -> None:
+    tot = totals.setdefault(rec.stage, [0, 0.0, 0, 0])
+    tot[0] += 1
+    tot[1] += rec.seconds
+    tot[2] += rec.rows_in or 0
+    tot[3] += rec.rows_out or 0
+
+def _record(rec: StageRecord) -> None:
+    t = _trace.get()
+    if t is not None:
+        t.records.append(rec)
+    if _enabled:
+        with _totals_lock:
+            _accumulate(_totals, rec)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(asdict(rec), ensure_ascii=False))
+
+class _Stage:
+    """Registro de uma etapa em andamento; ajuste rows_out antes de sair do bloco."""
+    __slots__ = ("rows_in", "rows_out")
+
+    def __init__(self, rows_in: int | None):
+        self.rows_in = rows_in
+        self.rows_out: int | None = None
+
+@contextmanager
+def stage(name: str, rows_in: int | None = None) -> Iterator[_Stage]:
+    """
+    Mede uma etapa (tempo de parede, linhas e variação de memória):
+
+        with stage("charts.altair", rows_in=len(df)) as s:
+            ...
+            s.rows_out = n
+    """
+    s = _Stage(rows_in)
+    if not is_active():
+        yield s
+        return
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    mem0 = _rss_bytes()
+    t0 = time.perf_counter()
+    try:
+        yield s
+    finally:
+        seconds = time.perf_counter() - t0
+        mem1 = _rss_bytes()
+        _depth.reset(token)
+        _record(StageRecord(name, seconds, s.rows_in, s.rows_out,
+                            None if mem0 is None or mem1 is None else mem1 - mem0, depth))
+
+def timed(name: str) -> Callable:
+    """
+    Decorador de stage(): linhas de entrada = primeiro argumento com tamanho
+    (após self), linhas de saída = tamanho do retorno.
+    """
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not (_enabled or _trace.get() is not None):
+                return fn(*args, **kwargs)
+            rows_in = next((n for n in map(_rows, args) if n is not None), None)
+            with stage(name, rows_in) as s:
+                out = fn(*args, **kwargs)
+                s.rows_out = _rows(out)
+            return out
+        return wrapper
+    return deco
+
+def prometheus_text(trace: Trace | None = None, prefix: str = "vigia_stage") -> str:
+    """
+    Totais por etapa no formato de exposição de texto do Prometheus: do
+    processo (coleta global) ou, com trace, só das etapas dele.
+    """
+    metrics = [
+        ("calls_total", "Execuções da etapa", 0),
+        ("seconds_total", "Tempo de parede acumulado (s)", 1),
+        ("rows_in_total", "Linhas de entrada acumuladas", 2),
+        ("rows_out_total", "Linhas de saída acumuladas", 3),
+    ]
+    if trace is not None:
+        totals: dict[str, list[float]] = {}
+        for rec in trace.records:
+            _accumulate(totals, rec)
+        items = sorted(totals.items())
+    else:
+        with _totals_lock:
+            items = sorted(_totals.items())
+    lines = []
+    for suffix, help_text, i in metrics:
+        lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+        lines.append(f"# TYPE {prefix}_{suffix} counter")
+        for name, tot in items:
+            value = tot[i]
+            lines.append(f'{prefix}_{suffix}{{stage="{name}"}} '
+                         + (f"{value:.6f}" if isinstance(value, float) else str(value)))
+    return "\n".join(lines) + "\n"
+
+def reset() -> None:
+    with _totals_lock:
+        _totals.clear()
@@ -0,0 +1,219 @@
+from __future__ import annotations
+import functools
+import uuid
+from pathlib import Path
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from projeto_vigia.config import FOCOS_SCHEMA
+from projeto_vigia.domain.preprocessing import ROW_KEY, row_hash
+from projeto_vigia.instrumentation import timed
+
+# Partições (hive): <raiz>/ano_mes=2025-04/estado=BAHIA/part-....parquet
+PARTITIONING = ds.partitioning(pa.schema([("ano_mes", pa.string()), ("estado", pa.string())]), flavor="hive")
+CATALOG_FILE = "catalogo.parquet"
+CATALOG_KEYS = ["ano_mes", "estado_nome", "municipio_nome", "Bioma"]
+# Linhas por row group: o recorte de período dentro de uma partição usa as
+# estatísticas (mín./máx. de data_hora) de cada grupo
+ROW_GROUP_ROWS = 128 * 1024
+
+def month_key(ts) -> str:
+    return pd.Timestamp(ts).strftime("%Y-%m")
+
+def month_keys(dh: pd.Series) -> pd.Categorical:
+    """"AAAA-MM" de cada data (o texto só é montado para os meses distintos)."""
+    ym = (dh.dt.year * 12 + dh.dt.month - 1).to_numpy()
+    months, codes = np.unique(ym, return_inverse=True)
+    return pd.Categorical.from_codes(codes, [f"{m // 12:04d}-{m % 12 + 1:02d}" for m in months])
+
+def _to_frame(table: pa.Table, cols: Sequence[str]) -> pd.DataFrame:
+    """Tabela lida do histórico nos dtypes de FOCOS_SCHEMA."""
+    df = table.to_pandas()
+    for col in cols:
+        dtype = FOCOS_SCHEMA[col]
+        if dtype == "category":
+            df[col] = df[col].astype("category")
+        elif str(df[col].dtype) != dtype:
+            df[col] = df[col].astype(dtype)
+    return df
+
+def _catalog(df: pd.DataFrame, ano_mes: pd.Categorical) -> pd.DataFrame:
+    """Resumo por ano_mes/estado/município/Bioma: focos, soma de lat/lon e primeira/última data."""
+    keys = [pd.Series(ano_mes, index=df.index, name="ano_mes")] + [df[c] for c in CATALOG_KEYS[1:]]
+    g = df.groupby(keys, observed=True, dropna=False)
+    out = pd.DataFrame({
+        "focos": g.size(),
+        "lat_soma": g["lat"].sum().astype("float64"),
+        "lon_soma": g["lon"].sum().astype("float64"),
+        "inicio": g["data_hora"].min(),
+        "fim": g["data_hora"].max(),
+    }).reset_index()
+    return out.astype({c: "string" for c in CATALOG_KEYS})
+
+class FocosArchive:
+    """
+    Histórico de vários anos em Parquet particionado por mês e estado. Uma
+    consulta traduz período/estado em poda de partições (só os diretórios do
+    mês/estado são abertos), Bioma e data_hora em filtros empurrados para a
+    leitura (row groups fora do intervalo são pulados) e lê só as colunas
+    pedidas. Um catálogo pequeno (focos e centro por município/mês) alimenta
+    os filtros da sidebar sem ler os focos.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._options: tuple[tuple[int, int, int], dict] | None = None
+
+    @property
+    def catalog_path(self) -> Path:
+        return self.root / CATALOG_FILE
+
+    @property
+    def version(self) -> tuple[int, int, int]:
+        """Muda a cada append: o catálogo é regravado (arquivo novo) no fim de cada um."""
+        if not self.catalog_path.exists():
+            return (0, 0, 0)
+        st = self.catalog_path.stat()
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def dataset(self) -> ds.Dataset:
+        # o catálogo fica na raiz, fora das partições
+        self.root.mkdir(parents=True, exist_ok=True)
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING,
+                          ignore_prefixes=[".", "_", CATALOG_FILE])
+
+    # ---------------------------
+    # Escrita
+    # ---------------------------
+    @timed("services.archive_append")
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Acrescenta focos normalizados (de qualquer período): cada mês/estado
+        ganha um arquivo novo, e o catálogo é atualizado. Focos que já estão no
+        histórico (mesma ROW_KEY nas partições tocadas) ou repetidos em df são
+        pulados, então arquivar de novo a mesma fonte (ou uma que cresceu) não
+        duplica nada. Devolve os arquivos escritos.
+        """
+        if df.empty:
+            return 0
+        df = df.sort_values("data_hora", kind="stable", ignore_index=True)
+        ano_mes = month_keys(df["data_hora"])
+        h = row_hash(df)
+        fresh = ~pd.Index(h).duplicated() & ~np.isin(h, self._stored_hashes(ano_mes, df["estado_nome"]))
+        if not fresh.all():
+            df, ano_mes = df[fresh].reset_index(drop=True), ano_mes[fresh]
+        if df.empty:
+            return 0
+        table = pa.Table.from_pandas(df[[c for c in FOCOS_SCHEMA if c in df.columns]], preserve_index=False)
+        table = table.append_column("ano_mes", pc.cast(pa.array(ano_mes), pa.string()))
+        table = table.append_column("estado", pc.cast(table["estado_nome"], pa.string()))
+        written = []
+        ds.write_dataset(
+            table, self.root, format="parquet", partitioning=PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            max_rows_per_group=ROW_GROUP_ROWS, min_rows_per_group=min(ROW_GROUP_ROWS, len(df)),
+            file_visitor=lambda f: written.append(f.path),
+        )
+        self._update_catalog(_catalog(df, ano_mes))
+        return len(written)
+
+    def _stored_hashes(self, ano_mes: pd.Categorical, estados: pd.Series) -> np.ndarray:
+        """Hash da ROW_KEY dos focos já gravados nos meses/estados de um lote (só essas partições são lidas)."""
+        dataset = self.dataset()
+        if "data_hora" not in dataset.schema.names:
+            return np.empty(0, dtype=np.uint64)
+        part = (ds.field("ano_mes").isin(list(pd.unique(np.asarray(ano_mes))))
+                & ds.field("estado").isin([str(e) for e in pd.unique(estados.dropna())]))
+        return row_hash(_to_frame(dataset.to_table(columns=ROW_KEY, filter=part), ROW_KEY))
+
+    def _update_catalog(self, new: pd.DataFrame) -> None:
+        if self.catalog_path.exists():
+            new = pd.concat([pd.read_parquet(self.catalog_path), new], ignore_index=True)
+            g = new.groupby(CATALOG_KEYS, dropna=False)
+            new = g.agg(focos=("focos", "sum"), lat_soma=("lat_soma", "sum"), lon_soma=("lon_soma", "sum"),
+                        inicio=("inicio", "min"), fim=("fim", "max")).reset_index()
+        tmp = self.catalog_path.with_suffix(".tmp")
+        new.to_parquet(tmp, index=False)
+        tmp.replace(self.catalog_path)
+
+    # ---------------------------
+    # Leitura
+    # ---------------------------
+    def catalog(self) -> pd.DataFrame:
+        if not self.catalog_path.exists():
+            empty = pd.DataFrame({c: pd.Series(dtype=t) for c, t in FOCOS_SCHEMA.items()})
+            return _catalog(empty, month_keys(empty["data_hora"]))
+        return pd.read_parquet(self.catalog_path)
+
+    @staticmethod
+    def _filter(spec: Mapping) -> Optional[ds.Expression]:
+        """Expressão de filtro: partições (ano_mes, estado) + predicados de linha (data_hora, Bioma)."""
+        parts = []
+        start, end = spec.get("start"), spec.get("end")
+        if start is not None:
+            parts.append(ds.field("ano_mes") >= month_key(start))
+            parts.append(ds.field("data_hora") >= pa.scalar(pd.Timestamp(start), pa.timestamp("ns")))
+        if end is not None:
+            # fim inclusivo no dia, como em FocosIndex.date_slice
+            stop = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+            parts.append(ds.field("ano_mes") <= month_key(end))
+            parts.append(ds.field("data_hora") < pa.scalar(stop, pa.timestamp("ns")))
+        estado = spec.get("estado")
+        if estado and estado != "Todos":
+            parts.append(ds.field("estado") == str(estado))
+        biomas = spec.get("biomas")
+        if biomas:
+            parts.append(ds.field("Bioma").isin(list(biomas)))
+        if not parts:
+            return None
+        expr = parts[0]
+        for p in parts[1:]:
+            expr = expr & p
+        return expr
+
+    def files(self, spec: Mapping) -> list[str]:
+        """Arquivos que uma consulta abriria (depois da poda por partição)."""
+        return [f.path for f in self.dataset().get_fragments(filter=self._filter(spec))]
+
+    @timed("services.archive_scan")
+    def scan(self, spec: Mapping, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Focos da consulta (período, estado e biomas de spec) já no esquema
+        normalizado, lidos só das partições e colunas necessárias.
+        """
+        dataset = self.dataset()
+        # colunas opcionais (Satelite, Pais) só existem se a fonte as trouxe
+        cols = [c for c in (columns or FOCOS_SCHEMA) if c in FOCOS_SCHEMA and c in dataset.schema.names]
+        if "data_hora" not in dataset.schema.names:  # histórico ainda vazio
+            return pd.DataFrame({c: pd.Series(dtype=FOCOS_SCHEMA[c]) for c in (columns or FOCOS_SCHEMA)})
+        df = _to_frame(dataset.to_table(columns=cols, filter=self._filter(spec)), cols)
+        return df.sort_values("data_hora", kind="stable", ignore_index=True) if "data_hora" in cols else df
+
+    def filter_options(self) -> dict:
+        """
+        Estados, biomas, período e centros de município para a sidebar, a
+        partir do catálogo (relido só quando o arquivo muda).
+        """
+        version = self.version
+        if self._options is None or self._options[0] != version:
+            self._options = (version, self._filter_options())
+        return self._options[1]
+
+    def _filter_options(self) -> dict:
+        cat = self.catalog()
+        g = cat.groupby(["municipio_nome", "estado_nome"], dropna=True)[["focos", "lat_soma", "lon_soma"]].sum()
+        centros = pd.DataFrame({"lat": g["lat_soma"] / g["focos"], "lon": g["lon_soma"] / g["focos"]}).reset_index()
+        centros["rotulo"] = centros["municipio_nome"].astype(str) + "/" + centros["estado_nome"].astype(str)
+        return {
+            "estados": sorted(cat["estado_nome"].dropna().unique().tolist()),
+            "biomas": sorted(cat["Bioma"].dropna().unique().tolist()),
+            "inicio": pd.Timestamp(cat["inicio"].min()) if len(cat) else None,
+            "fim": pd.Timestamp(cat["fim"].max()) if len(cat) else None,
+            "centros": functools.cache(lambda: centros.sort_values("rotulo").reset_index(drop=True)),
+        }
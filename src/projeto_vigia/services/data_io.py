@@ -1,8 +1,51 @@
 from __future__ import annotations
-import io
+import gzip
+from pathlib import Path
 import pandas as pd
-from .drive_fetch import download_text_from_gdrive
+from typing import BinaryIO, Iterator
+from projeto_vigia.config import ESSENTIAL_COLS, OPTIONAL_COLS, CSV_CHUNKSIZE, FOCOS_SCHEMA
+from projeto_vigia.domain.preprocessing import normalize_dataframe, concat_normalized
+from projeto_vigia.domain.validation import FocosValidator
+from projeto_vigia.instrumentation import timed
 
-def read_csv_from_gdrive(url: str) -> pd.DataFrame:
-    text = download_text_from_gdrive(url)
-    return pd.read_csv(io.StringIO(text))
+_CSV_COLS = frozenset(ESSENTIAL_COLS) | frozenset(OPTIONAL_COLS)
+
+def iter_csv_chunks(fileobj: BinaryIO, chunksize: int = CSV_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """Lê o CSV em blocos, já projetado nas colunas usadas pelo painel."""
+    return pd.read_csv(fileobj, chunksize=chunksize, usecols=lambda c: c in _CSV_COLS)
+
+@timed("services.read_normalized_csv")
+def read_normalized_csv(fileobj: BinaryIO,
+                        chunksize: int = CSV_CHUNKSIZE,
+                        after: pd.Timestamp | None = None,
+                        inclusive: bool = False,
+                        validator: FocosValidator | None = None) -> pd.DataFrame:
+    """
+    Lê e normaliza o CSV bloco a bloco; o pico de memória fica limitado a um
+    bloco bruto + os blocos já tipados.
+    after: se informado, mantém apenas linhas com DataHora > after (>= com
+    inclusive=True).
+    validator: acumula o relatório de validação do arquivo inteiro (as
+    duplicatas são procuradas entre todos os blocos).
+    """
+    validator = validator or FocosValidator()
+    parts = []
+    for chunk in iter_csv_chunks(fileobj, chunksize):
+        if after is not None and "DataHora" in chunk.columns:
+            ts = pd.to_datetime(chunk["DataHora"], errors="coerce")
+            chunk = chunk.loc[(ts >= after) if inclusive else (ts > after)]
+        parts.append(normalize_dataframe(chunk, validator))
+    if not parts:
+        raise ValueError("CSV vazio.")
+    return concat_normalized(parts)
+
+@timed("services.read_normalized_file")
+def read_normalized_file(path: Path) -> pd.DataFrame:
+    """Arquivo local: CSV bruto (.csv, .csv.gz) ou Parquet já normalizado."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+        return df[[c for c in FOCOS_SCHEMA if c in df.columns]]
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as fh:
+        return read_normalized_csv(fh)
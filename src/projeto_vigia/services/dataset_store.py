@@ -0,0 +1,224 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from projeto_vigia.config import CACHE_DIR, FOCOS_SCHEMA
+from projeto_vigia.domain.preprocessing import concat_normalized
+from projeto_vigia.domain.validation import FocosValidator
+from projeto_vigia.instrumentation import timed
+from .data_io import read_normalized_csv
+from .drive_fetch import stream_from_gdrive
+
+# Incrementar quando o formato da base normalizada mudar (invalida o cache)
+STORE_SCHEMA_VERSION = 3
+# Acima desse número de partes, as partes são regravadas num único arquivo
+MAX_PARTS = 16
+
+def _arrow_type(dtype: str) -> pa.DataType:
+    if dtype == "category":
+        # índices fixos em int32: partes com dicionários diferentes continuam concatenáveis
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype.startswith("datetime64"):
+        return pa.timestamp("ns")
+    return pa.from_numpy_dtype(dtype)
+
+ARROW_SCHEMA = pa.schema([(col, _arrow_type(dtype)) for col, dtype in FOCOS_SCHEMA.items()])
+
+class DatasetStore:
+    """
+    Cópia local e tipada (Parquet) da base normalizada de uma fonte.
+
+    Layout em disco:
+        <root>/meta.json          validadores da fonte (ETag/Last-Modified/sha256 do CSV),
+                                  watermark e relatório de validação da última leitura
+        <root>/part-00000.parquet carga inicial
+        <root>/part-0000N.parquet linhas novas anexadas a cada atualização
+                                  (acima de MAX_PARTS, tudo é regravado em part-00000)
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    @classmethod
+    def for_source(cls, url: str, cache_dir: Path | None = None) -> "DatasetStore":
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return cls(Path(cache_dir or CACHE_DIR) / "datasets" / key)
+
+    @property
+    def meta_path(self) -> Path:
+        return self.root / "meta.json"
+
+    def read_meta(self) -> dict | None:
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("schema_version") != STORE_SCHEMA_VERSION:
+            return None
+        if not all((self.root / p).exists() for p in meta.get("parts", [])):
+            return None
+        return meta
+
+    def _write_meta(self, meta: dict) -> None:
+        meta["schema_version"] = STORE_SCHEMA_VERSION
+        tmp = self.meta_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        os.replace(tmp, self.meta_path)
+
+    def revalidate(self, validators: dict) -> None:
+        """Fonte sem mudanças: atualiza só os validadores (partes e relatório ficam)."""
+        self._write_meta({**(self.read_meta() or {}), **validators})
+
+    def _write_part(self, df: pd.DataFrame, name: str) -> None:
+        table = pa.Table.from_pandas(df[ARROW_SCHEMA.names], schema=ARROW_SCHEMA, preserve_index=False)
+        tmp = self.root / f"{name}.tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, self.root / name)
+
+    @timed("services.store_load")
+    def load(self) -> pd.DataFrame | None:
+        """Lê todas as partes via memory-map. None se o cache não existir/for inválido."""
+        meta = self.read_meta()
+        if meta is None:
+            return None
+        tables = [pq.read_table(self.root / p, memory_map=True) for p in meta["parts"]]
+        if not tables:
+            return None
+        return pa.concat_tables(tables).to_pandas()
+
+    @timed("services.store_write")
+    def write(self, df: pd.DataFrame, validators: dict) -> None:
+        """Regrava a base inteira (carga inicial ou reconstrução)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        old = self.read_meta() or {}
+        name = "part-00000.parquet"
+        self._write_part(df, name)
+        self._write_meta({
+            **validators,
+            "parts": [name],
+            "rows": int(len(df)),
+            "watermark": _watermark(df),
+        })
+        for p in old.get("parts", []):
+            if p != name:
+                (self.root / p).unlink(missing_ok=True)
+
+    @timed("services.store_append")
+    def append(self, df_new: pd.DataFrame, validators: dict) -> None:
+        """Anexa apenas linhas novas como uma parte adicional."""
+        meta = self.read_meta()
+        if meta is None:
+            raise RuntimeError("Cache inexistente: use write() para a carga inicial.")
+        parts = list(meta["parts"])
+        rows = meta["rows"]
+        watermark = meta["watermark"]
+        if not df_new.empty:
+            name = f"part-{len(parts):05d}.parquet"
+            self._write_part(df_new, name)
+            parts.append(name)
+            rows += int(len(df_new))
+            watermark = max(filter(None, [watermark, _watermark(df_new)]), default=None)
+        self._write_meta({**validators, "parts": parts, "rows": rows, "watermark": watermark})
+        if len(parts) > MAX_PARTS:
+            self.compact()
+
+    def compact(self) -> None:
+        meta = self.read_meta()
+        df = self.load()
+        if meta is None or df is None:
+            return
+        validators = {k: meta.get(k) for k in ("source", "etag", "last_modified", "sha256", "validacao")}
+        self.write(df, validators)
+
+def _watermark(df: pd.DataFrame) -> str | None:
+    if df.empty:
+        return None
+    return pd.Timestamp(df["data_hora"].max()).isoformat()
+
+def _spool(stream, path: Path, chunk_size: int = 1 << 20) -> str:
+    """Copia stream para path em blocos; devolve o sha256 do conteúdo."""
+    sha = hashlib.sha256()
+    with stream, open(path, "wb") as fh:
+        while chunk := stream.read(chunk_size):
+            sha.update(chunk)
+            fh.write(chunk)
+    return sha.hexdigest()
+
+@timed("services.refresh_dataset")
+def refresh_dataset(url: str, cache_dir: Path | None = None) -> pd.DataFrame:
+    """
+    Carrega a base a partir do cache local, revalidando a fonte:
+    - 304: nada é baixado nem reprocessado;
+    - mesmo sha256 da última carga (fontes sem ETag/Last-Modified, como o
+      Google Drive): o CSV é baixado, mas não é normalizado nem anexado;
+    - conteúdo novo: só as linhas com DataHora > watermark são normalizadas
+      e anexadas.
+    O corpo passa por um arquivo temporário no diretório do cache (o hash
+    precisa do arquivo inteiro antes da leitura), então a memória continua
+    limitada a um bloco do CSV. Se a fonte estiver inacessível mas houver
+    cache, usa o cache.
+    """
+    store = DatasetStore.for_source(url, cache_dir)
+    meta = store.read_meta()
+
+    try:
+        res = stream_from_gdrive(
+            url,
+            etag=meta.get("etag") if meta else None,
+            last_modified=meta.get("last_modified") if meta else None,
+        )
+    except Exception:
+        cached = store.load() if meta else None
+        if cached is None:
+            raise
+        return cached
+
+    if meta is not None and res.not_modified:
+        return store.load()
+
+    store.root.mkdir(parents=True, exist_ok=True)
+    spool = store.root / f"download-{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        digest = _spool(res.stream, spool)
+        validators = {"source": url, "etag": res.etag, "last_modified": res.last_modified, "sha256": digest}
+        if meta is not None and meta.get("sha256") == digest:
+            store.revalidate(validators)
+            return store.load()
+
+        # Atualização incremental: só as linhas posteriores ao watermark são normalizadas
+        watermark = pd.Timestamp(meta["watermark"]) if meta and meta.get("watermark") else None
+        validator = FocosValidator()
+        with open(spool, "rb") as fh:
+            df = read_normalized_csv(fh, after=watermark, validator=validator)
+    finally:
+        spool.unlink(missing_ok=True)
+    # relatório da última leitura (linhas rejeitadas por regra), para auditoria
+    validators["validacao"] = validator.report.to_dict()
+
+    if watermark is None:
+        store.write(df, validators)
+    else:
+        store.append(df, validators)
+    return store.load()
+
+@timed("services.refresh_datasets")
+def refresh_datasets(urls: Sequence[str], cache_dir: Path | None = None,
+                     max_workers: int = 4) -> pd.DataFrame:
+    """
+    Várias fontes (ex.: um CSV por mês ou satélite), cada uma com seu cache,
+    revalidadas/baixadas em paralelo sobre a sessão HTTP compartilhada.
+    """
+    if len(urls) == 1:
+        return refresh_dataset(urls[0], cache_dir)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as pool:
+        frames = list(pool.map(lambda u: refresh_dataset(u, cache_dir), urls))
+    return concat_normalized(frames)
@@ -1,19 +1,100 @@
 from __future__ import annotations
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
 import requests
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
 from urllib.parse import urlparse, parse_qs
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from projeto_vigia.config import CACHE_DIR
+from projeto_vigia.instrumentation import timed
+
+_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# Tentativas com espera exponencial (RETRY_BACKOFF * 2**n segundos) para falhas
+# de conexão e respostas 429/5xx
+RETRY_TOTAL = 4
+RETRY_BACKOFF = 0.5
+POOL_SIZE = 8
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Sessão HTTP compartilhada pelo processo (pool de conexões + retries)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF,
+                          status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=("GET", "HEAD"), raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers.update(_HEADERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+class _IterStream(io.RawIOBase):
+    """Adapta resp.iter_content (bytes) para um arquivo binário somente-leitura."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+@dataclass
+class StreamResult:
+    """
+    Corpo de um download condicional exposto como stream binário.
+    stream é None quando o servidor respondeu 304 (não modificado).
+    """
+    stream: BinaryIO | None
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.stream is None
 
 def _extract_file_id(url: str) -> str | None:
     parsed = urlparse(url)
     qs = parse_qs(parsed.query)
     return qs.get("id", [None])[0]
 
-def download_text_from_gdrive(url: str, timeout: int = 30) -> str:
+def _is_gdrive(url: str) -> bool:
+    return urlparse(url).netloc.endswith("drive.google.com")
+
+def _open_gdrive_response(session: requests.Session, url: str, headers: dict, timeout: int) -> requests.Response:
     """
-    Faz o fluxo de confirmação do Google Drive e retorna o conteúdo como texto.
-    Levanta requests.exceptions em caso de falha.
+    Executa o fluxo de confirmação do Google Drive (cookie download_warning)
+    e devolve a resposta final, ainda não consumida. Outras URLs HTTP são
+    buscadas diretamente.
     """
-    session = requests.Session()
-    headers = {"User-Agent": "Mozilla/5.0"}
+    if not _is_gdrive(url):
+        return session.get(url, stream=True, headers=headers, timeout=timeout)
     file_id = _extract_file_id(url)
     if not file_id:
         raise ValueError("URL do Google Drive inválida: id ausente.")
@@ -27,6 +108,139 @@ def download_text_from_gdrive(url: str, timeout: int = 30) -> str:
     if token:
         params = {"id": file_id, "export": "download", "confirm": token}
         resp = session.get("https://drive.google.com/uc", params=params, stream=True, headers=headers, timeout=timeout)
+    return resp
 
+def stream_from_gdrive(url: str,
+                       etag: str | None = None,
+                       last_modified: str | None = None,
+                       timeout: int = 30,
+                       chunk_size: int = 1 << 20,
+                       gzipped: bool | None = None) -> StreamResult:
+    """
+    Download condicional em streaming: envia If-None-Match / If-Modified-Since
+    quando houver validadores de uma versão anterior; o corpo nunca é
+    materializado inteiro em memória. Content-Encoding: gzip é decodificado
+    pelo urllib3; arquivos .gz são descompactados aqui (gzipped=None detecta
+    pelo número mágico).
+    """
+    headers = {**_HEADERS, "Accept-Encoding": "gzip"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    resp = _open_gdrive_response(get_session(), url, headers, timeout)
+    if resp.status_code == 304:
+        resp.close()
+        return StreamResult(stream=None, etag=etag, last_modified=last_modified)
     resp.raise_for_status()
-    return resp.text
+
+    buffered = io.BufferedReader(_IterStream(resp.iter_content(chunk_size=chunk_size)), buffer_size=chunk_size)
+    if gzipped is None:
+        gzipped = buffered.peek(2)[:2] == b"\x1f\x8b"
+    stream = gzip.GzipFile(fileobj=buffered, mode="rb") if gzipped else buffered
+    return StreamResult(
+        stream=stream,
+        etag=resp.headers.get("ETag"),
+        last_modified=resp.headers.get("Last-Modified"),
+    )
+
+# ---------------------------
+# Downloads para disco: retomada por Range e revalidação
+# ---------------------------
+@dataclass
+class FetchResult:
+    url: str
+    path: Path
+    etag: str | None = None
+    last_modified: str | None = None
+    downloaded: bool = True  # False: 304, o arquivo local continua válido
+
+def _meta_path(dest: Path) -> Path:
+    return dest.with_name(dest.name + ".meta.json")
+
+def _read_meta(dest: Path) -> dict:
+    try:
+        return json.loads(_meta_path(dest).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+@timed("services.download_to_file")
+def download_to_file(url: str, dest: Path, timeout: int = 30,
+                     chunk_size: int = 1 << 16, max_attempts: int = RETRY_TOTAL + 1) -> FetchResult:
+    """
+    Baixa url para dest de forma resumível: o corpo vai para dest.part e, se a
+    conexão cair no meio, a próxima tentativa pede só o restante (Range +
+    If-Range; perde-se no máximo o último bloco de chunk_size). Com dest já presente, revalida com If-None-Match /
+    If-Modified-Since e não baixa nada em caso de 304.
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = dest.with_name(dest.name + ".part")
+    meta = _read_meta(dest) if dest.exists() else {}
+    session = get_session()
+
+    attempt = 0
+    while True:
+        headers = dict(_HEADERS)
+        offset = part.stat().st_size if part.exists() else 0
+        partial = _read_meta(part) if offset else {}
+        if offset and (partial.get("etag") or partial.get("last_modified")):
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = partial.get("etag") or partial["last_modified"]
+        elif meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            resp = _open_gdrive_response(session, url, headers, timeout)
+            if resp.status_code == 304:
+                resp.close()
+                return FetchResult(url, dest, meta.get("etag"), meta.get("last_modified"), downloaded=False)
+            resp.raise_for_status()
+            validators = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+            # 206: o servidor aceitou continuar; 200: recomeça do zero
+            mode = "ab" if resp.status_code == 206 and "Range" in headers else "wb"
+            _meta_path(part).write_text(json.dumps(validators), encoding="utf-8")
+            with resp, open(part, mode) as fh:
+                for chunk in resp.iter_content(chunk_size=chunk_size):
+                    fh.write(chunk)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+            attempt += 1
+            if attempt >= max_attempts:
+                raise
+            time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            continue
+        os.replace(part, dest)
+        os.replace(_meta_path(part), _meta_path(dest))
+        return FetchResult(url, dest, validators["etag"], validators["last_modified"])
+
+# URL -> instante da última falha sem cópia local (evita repetir a espera a cada rerun)
+_asset_failures: dict[str, float] = {}
+ASSET_RETRY_AFTER = 300
+
+def cached_asset(url: str, max_age: float = 86400, cache_dir: Path | None = None,
+                 timeout: int = 20) -> Path | None:
+    """
+    Caminho local de um recurso estático (logotipo etc.). Dentro de max_age
+    segundos o arquivo em disco é usado sem tocar a rede; depois, é
+    revalidado. Sem rede, usa a cópia local se houver; None se não houver
+    (e só tenta de novo após ASSET_RETRY_AFTER segundos).
+    """
+    dest = Path(cache_dir or CACHE_DIR) / "assets" / hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    if dest.exists() and time.time() - dest.stat().st_mtime < max_age:
+        return dest
+    if not dest.exists() and time.time() - _asset_failures.get(url, float("-inf")) < ASSET_RETRY_AFTER:
+        return None
+    try:
+        res = download_to_file(url, dest, timeout=timeout, max_attempts=1)
+    except (requests.RequestException, OSError):
+        if not dest.exists():
+            _asset_failures[url] = time.time()
+            return None
+        os.utime(dest)  # fonte fora do ar: não tenta de novo antes de max_age
+        return dest
+    if not res.downloaded:
+        os.utime(dest)  # revalidado: reinicia o prazo de max_age
+    return dest
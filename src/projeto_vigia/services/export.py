@@ -0,0 +1,129 @@
+from __future__ import annotations
+import io
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from projeto_vigia.config import EXPORT_CHUNK_ROWS
+from projeto_vigia.instrumentation import timed
+
+# ---------------------------
+# Paginação
+# ---------------------------
+def sort_order(values: pd.Series, ascending: bool = True) -> np.ndarray:
+    """Posições (0..n-1) de values em ordem estável; nulos sempre no fim."""
+    s = values.reset_index(drop=True)
+    return s.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+def page_bounds(total: int, page: int, page_size: int) -> tuple[int, int]:
+    """Intervalo [início, fim) da página (começando em 1), limitado às páginas existentes."""
+    pages = max(1, -(-total // page_size))
+    a = (min(max(page, 1), pages) - 1) * page_size
+    return a, min(a + page_size, total)
+
+# ---------------------------
+# Exportação em blocos
+# ---------------------------
+# Um bloco de linhas da exportação; recebe (início, fim) em posições da seleção
+ChunkReader = Callable[[int, int], pd.DataFrame]
+
+def frame_reader(df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                 positions: Optional[np.ndarray] = None) -> tuple[ChunkReader, int]:
+    """
+    Leitor de blocos sobre df (ou sobre as linhas positions de df) e o total de
+    linhas: cada bloco é um take só das colunas pedidas, sem copiar a seleção toda.
+    """
+    cols = [df.columns.get_loc(c) for c in (columns if columns is not None else df.columns)]
+    if positions is None:
+        return (lambda a, b: df.iloc[a:b, cols]), len(df)
+    return (lambda a, b: df.iloc[positions[a:b], cols]), len(positions)
+
+def _chunks(read: ChunkReader, total: int, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for a in range(0, total, chunk_rows):
+        yield read(a, min(a + chunk_rows, total))
+
+def iter_csv(read: ChunkReader, total: int, rename: Optional[Mapping[str, str]] = None,
+             chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """CSV (UTF-8) em pedaços de chunk_rows linhas; os nomes de rename só entram no cabeçalho."""
+    header = True
+    for chunk in _chunks(read, total, chunk_rows):
+        if header:
+            chunk = chunk.rename(columns=rename or {})
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+    if header:  # seleção vazia: só o cabeçalho
+        yield read(0, 0).rename(columns=rename or {}).to_csv(index=False).encode("utf-8")
+
+class _DrainableSink(io.RawIOBase):
+    """Destino do ParquetWriter que entrega os bytes escritos a cada row group (tell() continua global)."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buf += b
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out, self._buf = bytes(self._buf), bytearray()
+        return out
+
+def iter_parquet(read: ChunkReader, total: int, rename: Optional[Mapping[str, str]] = None,
+                 chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Parquet com um row group por bloco, emitido assim que o bloco é gravado."""
+    sink = _DrainableSink()
+    writer = None
+    for chunk in _chunks(read, total, chunk_rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if rename:
+            table = table.rename_columns([rename.get(c, c) for c in table.column_names])
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is None:
+        table = pa.Table.from_pandas(read(0, 0), preserve_index=False)
+        if rename:
+            table = table.rename_columns([rename.get(c, c) for c in table.column_names])
+        writer = pq.ParquetWriter(sink, table.schema)
+    writer.close()
+    yield sink.drain()
+
+EXPORTERS = {"csv": iter_csv, "parquet": iter_parquet}
+
+@timed("services.write_stream")
+def write_stream(chunks: Iterable[bytes], path: Path, max_bytes: int | None = None) -> Path | None:
+    """
+    Grava os pedaços em path (via arquivo temporário, trocado no fim). Passando
+    de max_bytes, para de consumir chunks, apaga o temporário e devolve None.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    written = 0
+    try:
+        with open(tmp, "wb") as fh:
+            for b in chunks:
+                written += len(b)
+                if max_bytes is not None and written > max_bytes:
+                    tmp.unlink()
+                    return None
+                fh.write(b)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
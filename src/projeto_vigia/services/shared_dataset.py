@@ -0,0 +1,45 @@
+from __future__ import annotations
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from projeto_vigia.config import CACHE_DIR
+from projeto_vigia.instrumentation import timed
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+@timed("services.publish_arrow")
+def publish_arrow(df: pd.DataFrame, source: str, version: str, cache_dir: Path | None = None) -> Path:
+    """
+    Grava a base como arquivo Arrow IPC sem compressão (formato que pode ser
+    mapeado em memória) e devolve o caminho. Um arquivo por fonte e versão:
+    processos que abrem a mesma versão compartilham as páginas via cache do SO
+    e versões antigas da mesma fonte são removidas.
+    """
+    root = Path(cache_dir or CACHE_DIR) / "shared"
+    root.mkdir(parents=True, exist_ok=True)
+    prefix = _digest(source)
+    path = root / f"{prefix}-{_digest(version)}.arrow"
+    if path.exists():
+        return path
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+    for old in root.glob(f"{prefix}-*.arrow"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+@timed("services.open_arrow")
+def open_arrow(path: Path) -> pd.DataFrame:
+    """Abre um arquivo de publish_arrow via memory-map."""
+    with pa.memory_map(str(path), "r") as source:
+        table = ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
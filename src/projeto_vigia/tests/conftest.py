@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def focos_df():
+    """Base normalizada pequena e determinística (mesmo esquema de config.FOCOS_SCHEMA)."""
+    n = 3000
+    rng = np.random.default_rng(1)
+    dias = rng.uniform(0, 16, n).astype("float32")
+    dias[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "data_hora": pd.Timestamp("2025-04-01") + pd.to_timedelta(rng.integers(0, 7 * 1440, n), unit="min"),
+        "lat": rng.uniform(-30, 0, n).astype("float32"),
+        "lon": rng.uniform(-60, -35, n).astype("float32"),
+        "estado_nome": pd.Categorical(rng.choice(["BAHIA", "MINAS GERAIS", "PIAUÍ"], n, p=[.5, .3, .2])),
+        "municipio_nome": pd.Categorical(rng.choice(list("ABCDEFGHIJKL"), n)),
+        "Bioma": pd.Categorical(rng.choice(["Caatinga", "Cerrado", "Mata Atlântica"], n)),
+        "DiaSemChuva": dias,
+        "Precipitacao": rng.choice([0.0, 0.0, 2.5], n).astype("float32"),
+        "RiscoFogo": rng.uniform(0, 1, n).astype("float32"),
+        "FRP": rng.uniform(20, 300, n).astype("float32"),
+    })
@@ -0,0 +1,44 @@
+import numpy as np
+from src.projeto_vigia.analytics.aggregations import (
+    FocosCube, by_day, by_biome, top_municipios, series_by_dimension, compute_critical_regions
+)
+
+def test_cube_rollups_match_row_aggregations(focos_df):
+    # categoria sem ocorrências não deve aparecer nas séries
+    df = focos_df.assign(estado_nome=focos_df["estado_nome"].cat.add_categories("ACRE"))
+    cube = FocosCube.from_frame(df)
+    assert cube.total == len(df)
+
+    day = cube.by_day()
+    expected = by_day(df)
+    assert day["contagem"].tolist() == expected["contagem"].tolist()
+    assert [d.date() for d in day["data"]] == expected["data"].tolist()
+
+    for dim in ("estado_nome", "Bioma"):
+        got = cube.series_by_dimension(dim)
+        exp = series_by_dimension(df, dim)
+        assert got["contagem"].sum() == exp["contagem"].sum()
+        assert len(got) == len(exp)
+
+    got = cube.by_biome().set_index("Bioma")["Número de Focos"].sort_index()
+    exp = by_biome(df).set_index("Bioma")["Número de Focos"].sort_index()
+    assert got.to_dict() == exp.to_dict()
+    assert "ACRE" not in cube.series_by_dimension("estado_nome")["estado_nome"].tolist()
+
+    assert cube.top_municipios(5)["Número de Focos"].tolist() == top_municipios(df, 5)["Número de Focos"].tolist()
+
+def test_cube_critical_regions_match_raw(focos_df):
+    df = focos_df
+    got = FocosCube.from_frame(df).critical_regions(top_n=5).reset_index(drop=True)
+    exp = compute_critical_regions(df, top_n=5).reset_index(drop=True)
+    assert got["municipio_nome"].tolist() == exp["municipio_nome"].tolist()
+    for col in ("focos", "risco_medio", "frp_medio", "frp_max", "dias_sem_chuva_med", "lat", "score"):
+        np.testing.assert_allclose(got[col].astype(float), exp[col].astype(float), rtol=1e-4)
+
+def test_cube_summary(focos_df):
+    df = focos_df
+    s = FocosCube.from_frame(df).summary()
+    assert s["total"] == len(df)
+    assert s["municipio_top"] == df["municipio_nome"].value_counts().idxmax()
+    assert s["n_municipios"] == df["municipio_nome"].nunique()
+    np.testing.assert_allclose(s["media_dias_sem_chuva"], df["DiaSemChuva"].mean(), rtol=1e-4)
@@ -0,0 +1,93 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from src.projeto_vigia.analytics.spec import FilterSpec
+from src.projeto_vigia.api import VigiaAPI, run_batch
+from src.projeto_vigia.cli import main
+
+SIDEBAR = {
+    "estado": "BAHIA", "biomas": ["Cerrado", "Caatinga"],
+    "start": pd.Timestamp("2025-04-02"), "end": pd.Timestamp("2025-04-05"),
+    "turno_preset": None,
+    "custom_time": (pd.Timestamp("2000-01-01 08:00"), pd.Timestamp("2000-01-01 18:00")),
+    "roi": None, "eventos": False,
+    "numeric_rules": {
+        "DiaSemChuva": {"op": "(sem filtro)", "a": 0.0, "b": 0.0},
+        "RiscoFogo": {"op": ">=", "a": 0.5, "b": 0.0},
+    },
+    "buscar": True,
+}
+
+def test_filter_spec_normalizes_and_round_trips():
+    spec = FilterSpec.from_mapping(SIDEBAR)
+    assert spec.biomas == ("Caatinga", "Cerrado")
+    assert spec["numeric_rules"] == {"RiscoFogo": {"op": ">=", "a": 0.5, "b": None}}
+    again = FilterSpec.from_mapping(json.loads(json.dumps(spec.to_dict())))
+    assert again == spec and again.key() == spec.key()
+    assert FilterSpec.from_mapping({**SIDEBAR, "biomas": ["Caatinga", "Cerrado"]}).key() == spec.key()
+    assert FilterSpec.from_mapping({**SIDEBAR, "estado": "PIAUÍ"}).key() != spec.key()
+
+def test_api_matches_dict_query(focos_df):
+    api = VigiaAPI(focos_df)
+    out = api.run(SIDEBAR, tables=["por_dia", "focos", "resumo"])
+    expected = api.router.index.query(SIDEBAR)
+    assert len(out["focos"]) == len(expected)
+    assert out["por_dia"]["contagem"].sum() == len(expected)
+    assert out["resumo"].loc[0, "total"] == len(expected)
+
+def test_stats_tables_match_direct_computation(focos_df):
+    api = VigiaAPI(focos_df)
+    out = api.run(SIDEBAR, tables=["estatisticas", "quantis_estado"])
+    rows = api.router.index.query(SIDEBAR)
+    complete = rows[["DiaSemChuva", "Precipitacao", "RiscoFogo", "FRP"]].dropna()
+    assert out["estatisticas"].loc["FRP", "count"] == len(complete)
+    assert out["quantis_estado"][("FRP", "n")].sum() == rows["FRP"].notna().sum()
+
+def test_ui_modules_defer_chart_libraries():
+    # altair/pydeck/PIL só entram quando uma aba com gráfico (ou o logotipo) é desenhada
+    code = ("import sys, src.projeto_vigia.ui.sections, src.projeto_vigia.ui.sidebar; "
+            "print(sorted(m for m in ('altair', 'pydeck', 'PIL.Image') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=Path(__file__).resolve().parents[3])
+    assert out.stdout.strip() == "[]"
+
+def test_cli_batch(tmp_path, focos_df):
+    source = tmp_path / "focos.parquet"
+    focos_df.to_parquet(source, index=False)
+    consultas = [{"nome": "bahia", **FilterSpec.from_mapping(SIDEBAR).to_dict()},
+                 {"estado": "Todos"}]
+    qfile = tmp_path / "consultas.json"
+    qfile.write_text(json.dumps(consultas), encoding="utf-8")
+
+    assert main([str(qfile), "--fonte", str(source), "--saida", str(tmp_path / "out"),
+                 "--formato", "json", "--processos", "2"]) == 0
+    resumo = json.loads((tmp_path / "out" / "consulta_001" / "resumo.json").read_text(encoding="utf-8"))
+    assert resumo[0]["total"] == len(focos_df)
+    assert (tmp_path / "out" / "bahia" / "regioes_criticas.json").exists()
+
+    single = run_batch(str(source), consultas, tables=["resumo"])
+    assert single[1]["resumo"].loc[0, "total"] == len(focos_df)
+
+def test_shared_instance_views_do_not_copy(tmp_path, focos_df):
+    source = tmp_path / "focos.parquet"
+    focos_df.to_parquet(source, index=False)
+    api = VigiaAPI.shared(str(source), cache_dir=tmp_path)
+    assert len(list((tmp_path / "shared").glob("*.arrow"))) == 1
+    assert api.frame["data_hora"].is_monotonic_increasing
+    view = api.view()
+    assert np.shares_memory(view["lat"].to_numpy(), api.frame["lat"].to_numpy())
+    expected = VigiaAPI(focos_df).run(SIDEBAR, tables=["focos"])["focos"]
+    assert len(api.run(SIDEBAR, tables=["focos"])["focos"]) == len(expected)
+
+def test_filter_options_are_computed_once_per_version(focos_df):
+    api = VigiaAPI(focos_df)
+    opts = api.filter_options()
+    assert api.filter_options() is opts
+    assert opts["estados"] == sorted(focos_df["estado_nome"].unique().tolist())
+    assert opts["inicio"] == focos_df["data_hora"].min() and opts["fim"] == focos_df["data_hora"].max()
+    centros = opts["centros"]()
+    assert opts["centros"]() is centros
+    assert len(centros) == focos_df.groupby(["municipio_nome", "estado_nome"], observed=True).ngroups
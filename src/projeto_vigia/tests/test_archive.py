@@ -0,0 +1,101 @@
+import pandas as pd
+import pytest
+
+from src.projeto_vigia.api import ArchiveAPI, VigiaAPI
+from src.projeto_vigia.cli import main
+from src.projeto_vigia.services.archive import FocosArchive
+
+def _two_seasons(focos_df):
+    # abril/2025 (fixture) + a mesma massa deslocada para fevereiro/2025
+    return pd.concat([focos_df, focos_df.assign(data_hora=focos_df["data_hora"] - pd.Timedelta(days=59))],
+                     ignore_index=True)
+
+SPEC = {"estado": "BAHIA", "biomas": ["Cerrado"],
+        "start": pd.Timestamp("2025-04-02"), "end": pd.Timestamp("2025-04-05")}
+
+def test_scan_prunes_partitions_and_projects_columns(tmp_path, focos_df):
+    df = _two_seasons(focos_df)
+    archive = FocosArchive(tmp_path / "hist")
+    assert archive.append(df) == 2 * 3  # mês × estado
+
+    files = archive.files(SPEC)
+    assert len(files) == 1 and "ano_mes=2025-04" in files[0] and "estado=BAHIA" in files[0]
+
+    got = archive.scan(SPEC)
+    expected = VigiaAPI(df).router.index.query(SPEC)
+    assert len(got) == len(expected)
+    assert got["estado_nome"].dtype == "category" and got["lat"].dtype == "float32"
+    assert set(got["Bioma"]) == {"Cerrado"}
+
+    only = archive.scan(SPEC, columns=["data_hora", "FRP"])
+    assert list(only.columns) == ["data_hora", "FRP"] and len(only) == len(got)
+
+def test_catalog_accumulates_appends(tmp_path, focos_df):
+    archive = FocosArchive(tmp_path / "hist")
+    assert archive.filter_options()["inicio"] is None and archive.scan({}).empty
+    archive.append(focos_df)
+    archive.append(focos_df.assign(data_hora=focos_df["data_hora"] - pd.Timedelta(days=59)))
+    cat = archive.catalog()
+    assert cat["focos"].sum() == 2 * len(focos_df)
+    opts = archive.filter_options()
+    assert opts["estados"] == ["BAHIA", "MINAS GERAIS", "PIAUÍ"]
+    assert opts["inicio"] == focos_df["data_hora"].min() - pd.Timedelta(days=59)
+    assert opts["fim"] == focos_df["data_hora"].max()
+    centros = opts["centros"]()
+    assert len(centros) == focos_df.groupby(["municipio_nome", "estado_nome"], observed=True).ngroups
+
+def test_archive_api_matches_in_memory_api(tmp_path, focos_df):
+    df = _two_seasons(focos_df)
+    FocosArchive(tmp_path / "hist").append(df)
+    api = ArchiveAPI(tmp_path / "hist", max_slices=1)
+    tables = ["resumo", "por_dia", "top_municipios", "municipios_em_alta"]
+    got = api.run(SPEC, tables)
+    expected = VigiaAPI(df).run(SPEC, tables)
+    for name in tables:
+        pd.testing.assert_frame_equal(got[name], expected[name], check_categorical=False, check_dtype=False)
+
+    # outro período nos mesmos meses reaproveita o recorte; outro estado troca (max_slices=1)
+    sliced = api.for_spec(SPEC)
+    assert api.for_spec({**SPEC, "start": pd.Timestamp("2025-04-03")}) is sliced
+    assert api.for_spec({**SPEC, "estado": "PIAUÍ"}) is not sliced
+    assert api.run({**SPEC, "estado": "SERGIPE"}, ["resumo"])["resumo"].loc[0, "total"] == 0
+
+def test_cli_archives_sources_and_queries_history(tmp_path, focos_df):
+    src = tmp_path / "base.parquet"
+    _two_seasons(focos_df).to_parquet(src)
+    consultas = tmp_path / "consultas.json"
+    consultas.write_text('[{"nome": "ba", "estado": "BAHIA", "start": "2025-02-01", "end": "2025-02-28"}]')
+    rc = main([str(consultas), "--fonte", str(src), "--historico", str(tmp_path / "hist"), "--arquivar",
+               "--saida", str(tmp_path / "out"), "--tabelas", "resumo"])
+    assert rc == 0
+    resumo = pd.read_csv(tmp_path / "out" / "ba" / "resumo.csv")
+    assert resumo.loc[0, "total"] == (focos_df["estado_nome"] == "BAHIA").sum()
+
+def test_append_skips_focos_already_archived(tmp_path, focos_df):
+    archive = FocosArchive(tmp_path / "hist")
+    archive.append(focos_df.iloc[:1000])
+    # mesma fonte arquivada de novo, agora maior: só as linhas novas entram
+    archive.append(focos_df)
+    assert archive.append(focos_df) == 0
+    assert len(archive.scan({})) == len(focos_df)
+    assert archive.catalog()["focos"].sum() == len(focos_df)
+
+def test_archive_api_drops_slices_after_append(tmp_path, focos_df):
+    late = focos_df["data_hora"] >= pd.Timestamp("2025-04-04")
+    api = ArchiveAPI(tmp_path / "hist")
+    api.append(focos_df[~late])
+    before = api.run({"estado": "Todos"}, ["resumo"])["resumo"].loc[0, "total"]
+    assert before == (~late).sum()
+    api.append(focos_df[late])
+    assert api.run({"estado": "Todos"}, ["resumo"])["resumo"].loc[0, "total"] == len(focos_df)
+
+    # append por outra instância (outro processo): percebido pela versão do catálogo
+    other = focos_df.assign(data_hora=focos_df["data_hora"] - pd.Timedelta(days=59))
+    FocosArchive(tmp_path / "hist").append(other)
+    assert api.run({"estado": "Todos"}, ["resumo"])["resumo"].loc[0, "total"] == 2 * len(focos_df)
+
+def test_cli_rejects_processes_with_history(tmp_path):
+    consultas = tmp_path / "consultas.json"
+    consultas.write_text('[{"estado": "BAHIA"}]')
+    with pytest.raises(SystemExit):
+        main([str(consultas), "--historico", str(tmp_path / "hist"), "--processos", "2"])
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.projeto_vigia.benchmarks.suite import BENCHMARKS, compare, load_results, run_suite, save_results
+from src.projeto_vigia.benchmarks.synthetic import REVISIT_STEP_MIN, generate_focos, to_raw
+from src.projeto_vigia.config import FOCOS_SCHEMA
+from src.projeto_vigia.domain.preprocessing import normalize_dataframe
+
+def test_generate_focos_schema_and_determinism():
+    df = generate_focos(5000, seed=3)
+    assert len(df) == 5000
+    assert list(df.columns) == list(FOCOS_SCHEMA)
+    assert df["data_hora"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(df, generate_focos(5000, seed=3))
+    assert df["RiscoFogo"].between(0, 1).all()
+    # município sempre pertence ao estado sorteado (sigla no nome)
+    assert df["municipio_nome"].astype(str).str.endswith(")").all()
+
+def test_generate_focos_realistic_shape():
+    df = generate_focos(50_000, seed=0)
+    hora = df["data_hora"].dt.hour
+    assert 13 <= hora.mode().iloc[0] <= 18  # pico no meio da tarde
+    assert (df["data_hora"].dt.minute % REVISIT_STEP_MIN == 0).all()
+    # revisitas: mesmo município, 10 min depois
+    prev = df.assign(t=df["data_hora"] - pd.Timedelta(minutes=REVISIT_STEP_MIN))
+    assert prev.merge(df, left_on=["municipio_nome", "t"], right_on=["municipio_nome", "data_hora"]).shape[0] > 0.1 * len(df)
+    # cauda longa: poucos municípios concentram boa parte dos focos
+    counts = df["municipio_nome"].value_counts(sort=True)
+    assert counts.iloc[: len(counts) // 10].sum() > 0.3 * len(df)
+
+def test_to_raw_round_trip():
+    df = generate_focos(2000, seed=1)
+    back = normalize_dataframe(to_raw(df))
+    assert len(back) == len(df)
+    assert np.isclose(back["FRP"].sum(), df["FRP"].sum(), rtol=1e-4)
+
+def test_run_suite_and_compare(tmp_path):
+    results = run_suite([2000], repeat=1, select="filters.")
+    assert {r.name for r in results} == {n for n in BENCHMARKS if "filters." in n}
+    assert all(r.min_s > 0 and r.peak_mb >= 0 for r in results)
+
+    path = save_results(results, tmp_path / "base.json")
+    base = load_results(path)
+    slower = base.assign(min_s=base["min_s"] * 2)
+    cmp = compare(base, slower, threshold=1.5)
+    assert cmp["regressao"].all()
+    assert not compare(base, base)["regressao"].any()
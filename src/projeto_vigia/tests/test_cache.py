@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from src.projeto_vigia.analytics.cache import ResultCache
+from src.projeto_vigia.api import VigiaAPI
+
+def test_lru_evicts_by_memory_and_expires_by_ttl():
+    now = [0.0]
+    cache = ResultCache(max_bytes=2500, ttl=10, clock=lambda: now[0])
+    for k in "abc":
+        cache.put(k, np.zeros(100))  # 800 bytes cada
+    assert cache.get("a") is not None  # "a" passa a ser o mais recente
+    cache.put("d", np.zeros(100))
+    assert "b" not in cache and "a" in cache and "d" in cache
+    assert cache.evictions == 1 and cache.nbytes <= 2500
+    cache.put("grande", np.zeros(1000))  # maior que o limite: não entra
+    assert "grande" not in cache and len(cache) == 3
+    now[0] = 11.0
+    assert cache.get("a") is None and len(cache) == 2
+
+def test_api_reuses_results_across_calls(focos_df):
+    api = VigiaAPI(focos_df)
+    spec = {"estado": "Todos", "start": pd.Timestamp("2025-04-03"), "end": pd.Timestamp("2025-04-09"),
+            "numeric_rules": {"FRP": {"op": ">", "a": 10.0, "b": None}}}
+    first = api.run(spec, tables=["por_dia", "regioes_criticas", "focos"])
+    misses = api.cache.misses
+    second = api.run(dict(spec), tables=["por_dia", "regioes_criticas", "focos"])
+    assert api.cache.misses == misses
+    assert api.cache.hits >= 3  # duas tabelas + posições
+    pd.testing.assert_frame_equal(first["por_dia"], second["por_dia"])
+    assert len(first["focos"]) == len(second["focos"])
+    second["por_dia"]["extra"] = 1
+    assert "extra" not in api.run(spec, tables=["por_dia"])["por_dia"].columns
@@ -0,0 +1,27 @@
+import numpy as np
+from src.projeto_vigia.charts.colormap import colormap, scaled_radius
+from src.projeto_vigia.config import RISK_PALETTE
+
+def _risk_to_rgb_reference(r):
+    # rampa original (por linha) amarelo -> vermelho
+    r = max(0.0, min(1.0, float(r)))
+    yellow, red = (255, 215, 0), (220, 20, 60)
+    return [int(yellow[i] + (red[i] - yellow[i]) * r) for i in range(3)]
+
+def test_colormap_matches_two_stop_ramp():
+    values = np.linspace(-0.2, 1.2, 57)
+    got = colormap(values, RISK_PALETTE)
+    assert got.dtype == np.uint8
+    expected = np.array([_risk_to_rgb_reference(v) for v in values])
+    assert np.abs(got.astype(int) - expected).max() <= 1
+
+def test_colormap_multi_stop_and_nan():
+    stops = [(0.0, (0, 0, 0)), (0.5, (255, 0, 0)), (1.0, (255, 255, 255))]
+    got = colormap(np.array([0.5, 0.75, np.nan]), stops)
+    assert got[0].tolist() == [255, 0, 0]
+    assert got[1].tolist() == [255, 127, 127]
+    assert got[2].tolist() == [0, 0, 0]
+
+def test_scaled_radius_range():
+    r = scaled_radius(np.array([60.0, 180.0, 300.0, np.nan]), 300, 2000)
+    assert r[0] == 300 and abs(r[2] - 2000) < 1e-3 and r[3] == 300
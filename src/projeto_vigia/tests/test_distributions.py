@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from src.projeto_vigia.analytics.distributions import (correlation, describe_numeric, histogram, kde,
+                                                       sample_rows, scott_bandwidth)
+
+COLS = ["DiaSemChuva", "Precipitacao", "RiscoFogo", "FRP"]
+
+def test_describe_matches_pandas_on_small_input(focos_df):
+    df_num = focos_df[COLS].dropna()
+    out = describe_numeric(df_num, COLS)
+    ref = df_num.describe().T
+    pd.testing.assert_frame_equal(out[ref.columns].astype("float64"), ref.astype("float64"), rtol=1e-5)
+
+def test_histogram_is_bounded_and_normalized():
+    x = np.random.default_rng(0).normal(size=200_000)
+    h = histogram(np.r_[x, np.nan])
+    assert 1 <= len(h) <= 60
+    assert h["contagem"].sum() == len(x)
+    np.testing.assert_allclose((h["densidade"] * (h["fim"] - h["inicio"])).sum(), 1.0)
+    assert len(histogram(x, bins=10, value_range=(-1, 1))) == 10
+    assert histogram([]).empty
+
+def test_histogram_keeps_bins_on_zero_inflated_column():
+    rng = np.random.default_rng(2)
+    x = np.where(rng.random(100_000) < 0.9, 0.0, rng.exponential(8.0, 100_000))
+    h = histogram(x)
+    assert 10 <= len(h) <= 60
+    assert h["contagem"].iloc[0] >= 90_000 and h["contagem"].iloc[1:].sum() > 0
+
+def test_kde_matches_direct_gaussian_sum():
+    rng = np.random.default_rng(1)
+    x = np.r_[rng.normal(0, 1, 3000), rng.normal(6, 0.5, 1000)]
+    out = kde(x, grid_points=256)
+    assert len(out) == 256
+    h = scott_bandwidth(x)
+    g = out["x"].to_numpy()[::8]
+    direct = np.exp(-0.5 * ((g[:, None] - x[None, :]) / h) ** 2).sum(axis=1) / (len(x) * h * np.sqrt(2 * np.pi))
+    np.testing.assert_allclose(out["densidade"].to_numpy()[::8], direct, atol=2e-3)
+    np.testing.assert_allclose(np.trapezoid(out["densidade"], out["x"]), 1.0, atol=1e-3)
+
+def test_correlation_and_sampling(focos_df):
+    corr = correlation(focos_df, COLS)
+    assert len(corr) == 16
+    ref = focos_df[COLS].dropna().corr()
+    mat = corr.pivot(index="Var1", columns="Var2", values="corr").loc[COLS, COLS]
+    np.testing.assert_allclose(mat.to_numpy(), ref.to_numpy(), atol=1e-6)
+
+    x = np.arange(1000)
+    assert len(sample_rows(x, 100)) == 100 and len(np.unique(sample_rows(x, 100))) == 100
+    assert sample_rows(x, 5000) is x
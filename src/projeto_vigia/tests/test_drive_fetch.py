@@ -0,0 +1,83 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.projeto_vigia.services import drive_fetch
+
+FILES = {f"/f{i}.csv": (f"arquivo {i};" * 30000).encode() for i in range(3)}
+
+class _Handler(BaseHTTPRequestHandler):
+    fail_next = {}   # caminho -> nº de respostas 503 antes de servir
+    cut_next = {}    # caminho -> bytes enviados antes de derrubar a conexão
+    log = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = FILES[self.path]
+        etag = f'"{len(body)}"'
+        self.log.append((self.path, self.headers.get("Range"), self.headers.get("If-None-Match")))
+        if self.fail_next.get(self.path):
+            self.fail_next[self.path] -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        start = 0
+        rng = self.headers.get("Range")
+        if rng and self.headers.get("If-Range") == etag:
+            start = int(rng.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+        cut = self.cut_next.pop(self.path, None)
+        if cut is not None:
+            self.wfile.write(body[start:start + cut])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        self.wfile.write(body[start:])
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(drive_fetch, "RETRY_BACKOFF", 0.01)
+    monkeypatch.setattr(drive_fetch, "_session", None)
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    _Handler.log.clear()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+
+def test_stream_retries_and_revalidates(server):
+    _Handler.fail_next["/f1.csv"] = 2
+    res = drive_fetch.stream_from_gdrive(server + "/f1.csv")
+    with res.stream:
+        assert res.stream.read() == FILES["/f1.csv"]
+    again = drive_fetch.stream_from_gdrive(server + "/f1.csv", etag=res.etag)
+    assert again.not_modified
+    # 2 respostas 503 repetidas pela sessão compartilhada, 1 download, 1 revalidação
+    assert len(_Handler.log) == 4 and _Handler.log[-1][2] == res.etag
+
+def test_download_resumes_with_range_after_dropped_connection(server, tmp_path):
+    _Handler.cut_next["/f2.csv"] = 150_000
+    res = drive_fetch.download_to_file(server + "/f2.csv", tmp_path / "f2.csv", chunk_size=1 << 16)
+    assert res.path.read_bytes() == FILES["/f2.csv"]
+    # os blocos completos (2 × 64 KiB) já estavam em disco: só o restante é pedido
+    assert [r for _, r, _ in _Handler.log] == [None, "bytes=131072-"]
+
+def test_cached_asset_skips_network_within_max_age(server, tmp_path):
+    path = drive_fetch.cached_asset(server + "/f0.csv", cache_dir=tmp_path)
+    assert path.read_bytes() == FILES["/f0.csv"]
+    n = len(_Handler.log)
+    assert drive_fetch.cached_asset(server + "/f0.csv", cache_dir=tmp_path) == path
+    assert len(_Handler.log) == n
+    assert drive_fetch.cached_asset("http://127.0.0.1:9/x.png", cache_dir=tmp_path) is None
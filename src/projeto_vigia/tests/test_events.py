@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from src.projeto_vigia.domain.geo import KM_PER_DEG
+from src.projeto_vigia.domain.preprocessing import cluster_fire_events, fire_events
+from src.projeto_vigia.analytics.query import FocosIndex
+from src.projeto_vigia.analytics.rollup import DailyRollup
+from src.projeto_vigia.analytics.router import QueryRouter
+
+def _revisitas():
+    return pd.DataFrame({
+        "data_hora": pd.to_datetime(["2025-04-07 10:00", "2025-04-07 10:10", "2025-04-07 10:20",
+                                     "2025-04-07 13:00", "2025-04-07 10:05", "2025-04-07 10:30"]),
+        "lat": [-19.70, -19.71, -19.72, -19.70, -13.40, -19.75],
+        "lon": [-47.90, -47.91, -47.92, -47.90, -41.30, -47.94],
+        "estado_nome": pd.Categorical(["MG", "MG", "MG", "MG", "BA", "MG"]),
+        "municipio_nome": pd.Categorical(["UBERABA"] * 4 + ["IBICOARA", "UBERABA"]),
+        "Bioma": pd.Categorical(["Cerrado"] * 4 + ["Caatinga", "Cerrado"]),
+        "DiaSemChuva": np.float32([1, 1, 1, 1, 5, 1]),
+        "Precipitacao": np.float32([0, 0, 0, 0, 0, 0]),
+        "RiscoFogo": np.float32([.8, .9, .7, .8, .9, .6]),
+        "FRP": np.float32([80, 120, 90, 50, 200, 70]),
+    })
+
+def test_cluster_fire_events_chains_revisits():
+    ev = cluster_fire_events(_revisitas(), max_dist_km=5.0, max_gap_min=60)
+    # 10:00-10:30 em Uberaba encadeadas; 13:00 passa da janela; Ibicoara à parte
+    assert ev.tolist() == [0, 0, 0, 2, 1, 0]
+
+def test_cluster_fire_events_accepts_float_gap():
+    assert cluster_fire_events(_revisitas(), max_dist_km=5.0, max_gap_min=60.0).tolist() == [0, 0, 0, 2, 1, 0]
+    # revisitas a cada 10 min: encadeiam com janela de 12,5 min, nenhuma com 9,5 min
+    assert cluster_fire_events(_revisitas(), max_dist_km=5.0, max_gap_min=12.5).tolist() == [0, 0, 0, 2, 1, 0]
+    assert len(np.unique(cluster_fire_events(_revisitas(), max_dist_km=5.0, max_gap_min=9.5))) == 6
+
+def test_cluster_fire_events_links_through_older_detections():
+    # A e B na mesma célula da grade; C na célula ao norte, perto de A (~1 km) e longe de B (~5,25 km).
+    # Olhar só a detecção mais recente da célula (B) separaria C do evento
+    cell = 5.0 / KM_PER_DEG
+    base = np.floor((-15.0 + 90.0) / cell) * cell - 90.0
+    df = pd.DataFrame({
+        "data_hora": pd.to_datetime(["2025-04-07 10:00", "2025-04-07 10:10", "2025-04-07 10:20"]),
+        "lat": [base + 0.9 * cell, base + 0.05 * cell, base + 1.1 * cell],
+        "lon": [-47.9, -47.9, -47.9],
+    })
+    assert cluster_fire_events(df, max_dist_km=5.0, max_gap_min=60).tolist() == [0, 0, 0]
+
+def test_fire_events_summary():
+    events = fire_events(_revisitas(), max_dist_km=5.0, max_gap_min=60)
+    assert len(events) == 3
+    first = events.iloc[0]
+    assert first["n_deteccoes"] == 4
+    assert first["FRP"] == 120
+    assert first["ultima_deteccao"] == pd.Timestamp("2025-04-07 10:30")
+    assert events["n_deteccoes"].sum() == 6
+
+def test_fire_events_dimensions_come_from_first_detection_row():
+    df = _revisitas()
+    df["municipio_nome"] = df["municipio_nome"].cat.add_categories("OUTRO")
+    df.loc[0, "municipio_nome"] = None
+    df.loc[1, "municipio_nome"] = "OUTRO"
+    first = fire_events(df, max_dist_km=5.0, max_gap_min=60).iloc[0]
+    assert pd.isna(first["municipio_nome"]) and first["Bioma"] == "Cerrado"
+
+def test_router_counts_events():
+    df = _revisitas()
+    router = QueryRouter(FocosIndex(df), DailyRollup.from_frame(df))
+    assert router.cube({"estado": "Todos"}).total == 6
+    assert router.cube({"estado": "Todos", "eventos": True}).total == 3
+    assert router.source({"estado": "Todos", "eventos": True}) == "eventos"
+
+def test_cluster_fire_events_isolated_points_stay_apart():
+    rng = np.random.default_rng(3)
+    n = 500
+    df = pd.DataFrame({
+        "data_hora": pd.Timestamp("2025-04-01") + pd.to_timedelta(np.arange(n) * 180, unit="min"),
+        "lat": rng.uniform(-30, 0, n),
+        "lon": rng.uniform(-60, -35, n),
+    })
+    assert len(np.unique(cluster_fire_events(df))) == n
@@ -0,0 +1,65 @@
+import io
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.projeto_vigia.api import VigiaAPI
+from src.projeto_vigia.services.export import (frame_reader, iter_csv, iter_parquet, page_bounds, sort_order,
+                                               write_stream)
+
+SPEC = {"estado": "BAHIA", "biomas": ["Cerrado", "Caatinga"],
+        "start": pd.Timestamp("2025-04-02"), "end": pd.Timestamp("2025-04-05")}
+RENAME = {"lat": "Latitude", "municipio_nome": "Município"}
+
+def test_csv_chunks_rename_only_the_header(focos_df):
+    pos = np.arange(0, len(focos_df), 3)
+    read, total = frame_reader(focos_df, ["lat", "municipio_nome", "FRP"], pos)
+    chunks = list(iter_csv(read, total, RENAME, chunk_rows=400))
+    assert len(chunks) == -(-total // 400)
+    back = pd.read_csv(io.BytesIO(b"".join(chunks)))
+    assert list(back.columns) == ["Latitude", "Município", "FRP"]
+    assert len(back) == total
+    np.testing.assert_allclose(back["FRP"], focos_df["FRP"].to_numpy()[pos], rtol=1e-5)
+
+def test_parquet_chunks_form_one_file_with_row_groups(focos_df):
+    read, total = frame_reader(focos_df)
+    data = b"".join(iter_parquet(read, total, RENAME, chunk_rows=1000))
+    pf = pq.ParquetFile(io.BytesIO(data))
+    assert pf.metadata.num_row_groups == 3
+    back = pf.read().to_pandas()
+    expected = focos_df.rename(columns=RENAME).reset_index(drop=True)
+    pd.testing.assert_frame_equal(back, expected, check_dtype=False, check_categorical=False)
+
+def test_empty_selection_still_writes_header_and_schema(focos_df):
+    read, total = frame_reader(focos_df, ["lat", "FRP"], np.empty(0, dtype=np.int64))
+    assert b"".join(iter_csv(read, total, RENAME)).decode().strip() == "Latitude,FRP"
+    back = pq.read_table(io.BytesIO(b"".join(iter_parquet(read, total)))).to_pandas()
+    assert list(back.columns) == ["lat", "FRP"] and back.empty
+
+def test_sort_order_is_stable_with_nulls_last():
+    s = pd.Series([3.0, np.nan, 1.0, 3.0, 2.0], index=[10, 11, 12, 13, 14])
+    assert sort_order(s).tolist() == [2, 4, 0, 3, 1]
+    assert sort_order(s, ascending=False).tolist() == [0, 3, 4, 2, 1]
+    assert page_bounds(0, 1, 50) == (0, 0)
+    assert page_bounds(120, 3, 50) == (100, 120)
+    assert page_bounds(120, 9, 50) == (100, 120)
+
+def test_api_pages_and_export_match_sorted_query(focos_df):
+    api = VigiaAPI(focos_df)
+    expected = (api.router.index.query(SPEC)
+                .sort_values("FRP", ascending=False, kind="stable").reset_index(drop=True))
+    assert api.count(SPEC) == len(expected)
+
+    page, total = api.page(SPEC, 2, 25, sort_by="FRP", ascending=False, columns=["FRP", "lat"])
+    assert total == len(expected)
+    assert list(page.columns) == ["FRP", "lat"]
+    pd.testing.assert_frame_equal(page, expected[["FRP", "lat"]].iloc[25:50].reset_index(drop=True))
+
+    data = b"".join(api.export(SPEC, "csv", ["FRP"], sort_by="FRP", ascending=False, chunk_rows=100))
+    np.testing.assert_allclose(pd.read_csv(io.BytesIO(data))["FRP"], expected["FRP"], rtol=1e-5)
+
+def test_write_stream_stops_past_max_bytes(tmp_path):
+    chunks = (b"x" * 100 for _ in range(10))
+    assert write_stream(chunks, tmp_path / "a.csv", max_bytes=250) is None
+    assert list(tmp_path.iterdir()) == []
+    assert write_stream([b"x" * 100] * 2, tmp_path / "b.csv", max_bytes=250).read_bytes() == b"x" * 200
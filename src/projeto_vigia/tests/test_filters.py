@@ -1,10 +1,18 @@
 import pandas as pd
-from src.projeto_vigia.analytics.filters import filter_by_state_and_date
+from src.projeto_vigia.analytics.filters import filter_by_date_range
+from src.projeto_vigia.analytics.query import FocosIndex
 
-def test_filter_by_state_and_date():
+def test_filter_by_date_range_end_is_inclusive():
     df = pd.DataFrame({
-        "estado_nome": ["PE","PE","BA"],
-        "data_hora": pd.to_datetime(["2024-01-01","2024-01-03","2024-01-02"])
+        "estado_nome": ["PE", "PE", "BA"],
+        "data_hora": pd.to_datetime(["2024-01-01 00:00", "2024-01-03 00:00", "2024-01-02 23:59"]),
     })
-    out = filter_by_state_and_date(df, "PE", pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02"))
-    assert len(out) == 1
+    out = filter_by_date_range(df, pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02"))
+    assert out["estado_nome"].tolist() == ["PE", "BA"]
+
+def test_state_and_date_come_from_the_index(focos_df):
+    start, end = pd.Timestamp("2025-04-02"), pd.Timestamp("2025-04-04")
+    expected = filter_by_date_range(focos_df, start, end)
+    expected = expected[expected["estado_nome"] == "BAHIA"]
+    got = FocosIndex(focos_df).query({"estado": "BAHIA", "start": start, "end": end})
+    assert len(got) == len(expected) > 0
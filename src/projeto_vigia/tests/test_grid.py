@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from src.projeto_vigia.analytics.grid import aggregate_grid, cell_size_for_extent, grid_cells
+
+def test_aggregate_grid_matches_groupby(focos_df):
+    cells = aggregate_grid(focos_df, 1.0)
+    assert cells["focos"].sum() == len(focos_df)
+
+    keys = grid_cells(focos_df["lat"].to_numpy(), focos_df["lon"].to_numpy(), 1.0)
+    exp = focos_df.groupby(keys).agg(focos=("lat", "size"), risco=("RiscoFogo", "mean"), frp=("FRP", "max"))
+    assert len(cells) == len(exp)
+    np.testing.assert_allclose(np.sort(cells["risco_medio"]), np.sort(exp["risco"]), rtol=1e-5)
+    np.testing.assert_allclose(np.sort(cells["frp_max"]), np.sort(exp["frp"]), rtol=1e-5)
+
+def test_cell_centers_fall_inside_their_cells():
+    df = pd.DataFrame({"lat": [-10.2, -10.7, 5.0], "lon": [-45.9, -45.1, -60.0],
+                       "RiscoFogo": [0.5, 1.0, 0.2], "FRP": [10.0, np.nan, 3.0]})
+    cells = aggregate_grid(df, 1.0).sort_values("lat").reset_index(drop=True)
+    assert cells["focos"].tolist() == [2, 1]
+    assert cells.loc[0, ["lat", "lon"]].tolist() == [-10.5, -45.5]
+    assert cells.loc[0, "frp_max"] == 10.0
+
+def test_cell_size_shrinks_with_extent():
+    wide = cell_size_for_extent(np.array([-33.0, 5.0]), np.array([-73.0, -35.0]), 5000)
+    narrow = cell_size_for_extent(np.array([-13.0, -12.0]), np.array([-41.0, -40.0]), 5000)
+    assert narrow < wide
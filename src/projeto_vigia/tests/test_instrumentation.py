@@ -0,0 +1,37 @@
+import sys
+from src.projeto_vigia import api as api_module
+from src.projeto_vigia.api import VigiaAPI
+
+# o código do pacote importa projeto_vigia.instrumentation (absoluto): usa o mesmo módulo
+instrumentation = sys.modules[api_module.timed.__module__]
+
+def test_trace_records_nested_stages_with_rows(focos_df):
+    api = VigiaAPI(focos_df)
+    spec = {"estado": "BAHIA", "numeric_rules": {"FRP": {"op": ">", "a": 100.0, "b": None}}}
+    assert not instrumentation.is_active()
+    with instrumentation.trace() as tr:
+        out = api.run(spec, tables=["por_dia", "focos"])
+    df = tr.to_frame()
+    run = df[df["stage"] == "api.run"].iloc[0]
+    assert run["depth"] == 0 and run["seconds"] > 0
+    take = df[df["stage"] == "analytics.index_take"].iloc[0]
+    assert take["rows_out"] == len(out["focos"]) and take["depth"] > 0
+    assert (df["seconds"] >= 0).all()
+    text = instrumentation.prometheus_text(tr)
+    assert 'vigia_stage_calls_total{stage="api.run"} 1' in text
+
+def test_disabled_instrumentation_records_nothing(focos_df):
+    instrumentation.reset()
+    VigiaAPI(focos_df).run({"estado": "Todos"})
+    assert "stage=" not in instrumentation.prometheus_text()
+
+def test_global_totals_accumulate(focos_df, monkeypatch):
+    instrumentation.reset()
+    monkeypatch.setattr(instrumentation, "_enabled", True)
+    api = VigiaAPI(focos_df)
+    api.run({"estado": "Todos"}, tables=["por_dia"])
+    api.run({"estado": "PIAUÍ"}, tables=["por_dia"])
+    text = instrumentation.prometheus_text()
+    assert 'vigia_stage_calls_total{stage="api.run"} 2' in text
+    assert f'vigia_stage_rows_in_total{{stage="analytics.index_build"}} {len(focos_df)}' in text
+    instrumentation.reset()
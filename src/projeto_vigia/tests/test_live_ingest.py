@@ -0,0 +1,90 @@
+import io
+import pandas as pd
+from src.projeto_vigia.analytics.rollup import DailyRollup
+from src.projeto_vigia.api import VigiaAPI
+from src.projeto_vigia.services.drive_fetch import StreamResult
+from src.projeto_vigia.services.live_ingest import DirectorySource, HttpSource, LiveIngestor
+
+def _raw_csv(rows, lon=-45.0):
+    header = "DataHora,Latitude,Longitude,Estado,Municipio,Bioma,DiaSemChuva,RiscoFogo,FRP\n"
+    return header + "".join(f"{t},-10.0,{lon},BAHIA,X,Cerrado,3,0.5,40\n" for t in rows)
+
+def test_directory_source_reads_each_batch_once(tmp_path):
+    (tmp_path / "antigo.csv").write_text(_raw_csv(["2025-04-01 10:00:00"]))
+    src = DirectorySource(tmp_path)
+    src.mark_seen()
+    assert src.poll() == []
+    (tmp_path / "lote1.csv").write_text(_raw_csv(["2025-04-08 10:00:00", "2025-04-08 11:00:00"]))
+    batches = src.poll()
+    assert [len(b) for b in batches] == [2]
+    assert src.poll() == []
+
+def test_directory_source_rereads_only_new_rows_of_rewritten_file(tmp_path):
+    lote = tmp_path / "lote.csv"
+    lote.write_text(_raw_csv(["2025-04-01 10:00:00"]))
+    src = DirectorySource(tmp_path)
+    src.mark_seen()
+    lote.write_text(_raw_csv(["2025-04-01 10:00:00", "2025-04-08 10:00:00"]))
+    assert [b["data_hora"].tolist() for b in src.poll()] == [[pd.Timestamp("2025-04-08 10:00")]]
+    # cresce de novo: só a linha acrescentada; reescrito igual: nada
+    lote.write_text(_raw_csv(["2025-04-01 10:00:00", "2025-04-08 10:00:00", "2025-04-08 11:00:00"]))
+    assert [len(b) for b in src.poll()] == [1]
+    lote.write_text(_raw_csv(["2025-04-01 10:00:00", "2025-04-08 10:00:00", "2025-04-08 11:00:00"]) + "\n")
+    assert sum(len(b) for b in src.poll()) == 0
+
+def test_http_source_keeps_late_rows_at_last_timestamp():
+    bodies = iter([_raw_csv(["2025-04-08 10:00:00", "2025-04-08 11:00:00"]),
+                   _raw_csv(["2025-04-08 10:00:00", "2025-04-08 11:00:00"])
+                   + _raw_csv(["2025-04-08 11:00:00"], lon=-46.0).split("\n", 1)[1]])
+    def fetch(url, etag=None, last_modified=None):
+        return StreamResult(stream=io.BytesIO(next(bodies).encode()), etag=None)
+    src = HttpSource("http://exemplo", fetch=fetch)
+    assert [len(b) for b in src.poll()] == [2]
+    # mesma hora da última detecção, outra posição: entra; as já vistas não
+    batches = src.poll()
+    assert [len(b) for b in batches] == [1] and batches[0]["lon"].tolist() == [-46.0]
+
+def test_http_source_keeps_only_new_rows():
+    body = [_raw_csv(["2025-04-08 10:00:00", "2025-04-08 11:00:00"])]
+    def fetch(url, etag=None, last_modified=None):
+        if etag == "v2":
+            return StreamResult(stream=None, etag=etag)
+        return StreamResult(stream=io.BytesIO(body[0].encode()), etag="v2")
+    src = HttpSource("http://exemplo", after=pd.Timestamp("2025-04-08 10:30"), fetch=fetch)
+    assert [len(b) for b in src.poll()] == [1]
+    assert src.poll() == []  # 304
+
+def test_ingest_appends_evicts_and_invalidates_cache(tmp_path, focos_df):
+    api = VigiaAPI(focos_df)
+    spec = {"estado": "Todos"}
+    total = api.run(spec, tables=["resumo"])["resumo"].loc[0, "total"]
+    old_version = api.version
+
+    new = focos_df.iloc[:10].copy()
+    new["data_hora"] = pd.Timestamp("2025-04-08 06:00") + pd.to_timedelta(range(10), unit="min")
+    api.ingest(new)
+    assert api.version != old_version
+    assert api.run(spec, tables=["resumo"])["resumo"].loc[0, "total"] == total + 10
+
+    api.window = pd.Timedelta(hours=24)
+    api.ingest(new.iloc[:0])
+    cutoff = pd.Timestamp("2025-04-07 06:00")
+    expected = int((focos_df["data_hora"] >= cutoff).sum()) + 10
+    assert len(api.frame) == expected
+    assert api.frame["data_hora"].min() >= cutoff
+    out = api.run(spec, tables=["por_dia", "resumo"])
+    assert out["resumo"].loc[0, "total"] == expected
+    # o rollup incremental coincide com um recalculado do zero
+    fresh = DailyRollup.from_frame(api.frame)
+    assert api.router.rollup.table["focos"].sum() == fresh.table["focos"].sum() == expected
+
+def test_ingestor_polls_at_most_once_per_interval(tmp_path, focos_df):
+    now = [0.0]
+    got = []
+    (tmp_path / "a.csv").write_text(_raw_csv(["2025-04-08 10:00:00"]))
+    live = LiveIngestor(DirectorySource(tmp_path), got.append, poll_seconds=60, clock=lambda: now[0])
+    assert live.poll() == 1
+    (tmp_path / "b.csv").write_text(_raw_csv(["2025-04-08 12:00:00"]))
+    assert live.poll() == 0
+    now[0] = 61.0
+    assert live.poll() == 1 and live.rows_ingested == 2 and len(got) == 2
@@ -0,0 +1,43 @@
+import pandas as pd
+from src.projeto_vigia.analytics.query import FocosIndex
+from src.projeto_vigia.analytics.filters import (
+    filter_by_date_range, filter_by_turno, filter_by_biomes, filter_numeric_columns
+)
+
+def _chain(df, spec):
+    dff = df if spec["estado"] == "Todos" else df[df["estado_nome"] == spec["estado"]]
+    dff = filter_by_date_range(dff, spec["start"], spec["end"])
+    dff = filter_by_biomes(dff, spec["biomas"])
+    dff = filter_by_turno(dff, preset=spec["turno_preset"], custom_range=spec["custom_time"])
+    return filter_numeric_columns(dff, spec["numeric_rules"])
+
+def _ids(df):
+    return sorted(zip(df["data_hora"], df["lat"], df["lon"]))
+
+def test_focos_index_matches_filter_chain(focos_df):
+    df = focos_df
+    index = FocosIndex(df)
+    no_rule = {"op": "(sem filtro)", "a": 0.0, "b": 0.0}
+    specs = [
+        {"estado": "Todos", "biomas": [], "start": pd.Timestamp("2025-04-01"), "end": pd.Timestamp("2025-04-10"),
+         "turno_preset": None, "custom_time": None,
+         "numeric_rules": {"DiaSemChuva": no_rule, "Precipitacao": no_rule, "RiscoFogo": no_rule, "FRP": no_rule}},
+        {"estado": "BAHIA", "biomas": ["Cerrado", "Caatinga"], "start": pd.Timestamp("2025-04-03"),
+         "end": pd.Timestamp("2025-04-05"), "turno_preset": "Tarde", "custom_time": None,
+         "numeric_rules": {"RiscoFogo": {"op": ">=", "a": 0.5}, "FRP": {"op": "entre", "a": 250, "b": 50}}},
+        {"estado": "PIAUÍ", "biomas": [], "start": pd.Timestamp("2025-04-02"), "end": pd.Timestamp("2025-04-02"),
+         "turno_preset": None,
+         "custom_time": (pd.Timestamp("2000-01-01 22:00"), pd.Timestamp("2000-01-01 03:30")),
+         "numeric_rules": {"Precipitacao": {"op": "=", "a": 0.0}}},
+    ]
+    for spec in specs:
+        expected = _chain(df, spec)
+        got = index.query(spec)
+        assert len(got) == len(expected)
+        assert _ids(got) == _ids(expected)
+        assert got["data_hora"].is_monotonic_increasing
+
+def test_focos_index_unknown_estado_returns_empty(focos_df):
+    index = FocosIndex(focos_df)
+    spec = {"estado": "ACRE", "biomas": [], "start": None, "end": None}
+    assert index.query(spec).empty
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from src.projeto_vigia.analytics.query import FocosIndex
+from src.projeto_vigia.analytics.rollup import DailyRollup
+from src.projeto_vigia.analytics.router import QueryRouter
+
+def _spec(**kw):
+    spec = {"estado": "Todos", "biomas": [], "start": pd.Timestamp("2025-04-01"), "end": pd.Timestamp("2025-04-07"),
+            "turno_preset": None, "custom_time": None,
+            "numeric_rules": {"FRP": {"op": "(sem filtro)", "a": 0.0, "b": 0.0}}}
+    spec.update(kw)
+    return spec
+
+def _assert_same(a, b):
+    cols = ["focos", "risco_medio", "frp_max", "dias_sem_chuva_med"]
+    ga = a.critical_regions(50).sort_values(["estado_nome", "municipio_nome", "Bioma"]).reset_index(drop=True)
+    gb = b.critical_regions(50).sort_values(["estado_nome", "municipio_nome", "Bioma"]).reset_index(drop=True)
+    assert ga["municipio_nome"].tolist() == gb["municipio_nome"].tolist()
+    np.testing.assert_allclose(ga[cols].astype(float), gb[cols].astype(float), rtol=1e-4)
+    assert a.by_day()["contagem"].tolist() == b.by_day()["contagem"].tolist()
+
+def test_router_answers_from_rollup_when_filters_allow(focos_df):
+    df = focos_df
+    router = QueryRouter(FocosIndex(df), DailyRollup.from_frame(df))
+    raw = QueryRouter(FocosIndex(df))
+    specs = [
+        _spec(),
+        _spec(estado="BAHIA", biomas=["Cerrado"], start=pd.Timestamp("2025-04-02"), end=pd.Timestamp("2025-04-04")),
+        _spec(turno_preset="Noite"),
+        _spec(custom_time=(pd.Timestamp("2000-01-01 22:00"), pd.Timestamp("2000-01-01 05:00"))),
+    ]
+    for spec in specs:
+        assert router.source(spec) == "rollup"
+        _assert_same(router.cube(spec), raw.cube(spec))
+
+def test_router_falls_back_to_rows(focos_df):
+    df = focos_df
+    router = QueryRouter(FocosIndex(df), DailyRollup.from_frame(df))
+    for spec in (_spec(numeric_rules={"FRP": {"op": ">", "a": 100.0}}),
+                 _spec(custom_time=(pd.Timestamp("2000-01-01 08:30"), pd.Timestamp("2000-01-01 18:00")))):
+        assert router.source(spec) == "focos"
+        assert router.cube(spec).total == QueryRouter(FocosIndex(df)).cube(spec).total
+
+def test_rollup_append_matches_full_build(focos_df):
+    df = focos_df
+    head, tail = df.iloc[:1000], df.iloc[1000:]
+    incremental = DailyRollup.from_frame(head).append(tail)
+    full = DailyRollup.from_frame(df)
+    assert incremental.table["focos"].sum() == len(df)
+    assert len(incremental) == len(full)
+    _assert_same(incremental.cube(_spec()), full.cube(_spec()))
+
+def test_index_and_rollup_evict_on_the_same_hour(focos_df):
+    cutoff = pd.Timestamp("2025-04-03 10:30")
+    index = FocosIndex(focos_df).evict_before(cutoff)
+    rollup = DailyRollup.from_frame(focos_df).evict_before(cutoff)
+    assert index.df["data_hora"].min() >= pd.Timestamp("2025-04-03 10:00")
+    assert rollup.table["focos"].sum() == len(index.df)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.projeto_vigia.analytics.aggregations import FocosCube, compute_critical_regions
+from src.projeto_vigia.analytics.scoring import (DEFAULT_SCORING, ScoreTerm, ScoringConfig, decay_weights,
+                                                 top_k_indices)
+from src.projeto_vigia.api import VigiaAPI
+
+def test_default_scoring_matches_legacy_formula(focos_df):
+    out = compute_critical_regions(focos_df, top_n=7)
+    grp = (focos_df.groupby(["estado_nome", "municipio_nome", "Bioma"], observed=True)
+           .agg(focos=("RiscoFogo", "size"), risco=("RiscoFogo", "mean"), frp=("FRP", "mean")).reset_index())
+    grp["score"] = grp["focos"] * 0.6 + grp["risco"] * 100 * 0.25 + grp["frp"] * 0.15
+    ref = grp.sort_values(["score", "focos", "frp"], ascending=False).head(7)
+    assert out["municipio_nome"].tolist() == ref["municipio_nome"].tolist()
+    np.testing.assert_allclose(out["score"], ref["score"])
+    cube = FocosCube.from_frame(focos_df).critical_regions(top_n=7)
+    assert cube["municipio_nome"].tolist() == ref["municipio_nome"].tolist()
+
+def test_top_k_indices_partial_selection():
+    score = np.array([3.0, np.nan, 5.0, 5.0, 1.0, 4.0])
+    tie = np.array([0, 0, 1, 9, 0, 0])
+    assert top_k_indices(score, 3, [tie]).tolist() == [3, 2, 5]
+    assert top_k_indices(score, 10).tolist()[-1] == 1  # nulo por último
+    assert len(top_k_indices(score, 0)) == 0
+
+def test_recency_decay_prefers_recent_focos(focos_df):
+    last = focos_df["data_hora"].max().normalize()
+    w = decay_weights(pd.Series([last, last - pd.Timedelta(days=2)]), half_life_days=2)
+    np.testing.assert_allclose(w, [1.0, 0.5])
+
+    cfg = ScoringConfig(terms=(ScoreTerm("focos_recentes", 1.0),), granularity="estado", half_life_days=1)
+    cube = FocosCube.from_frame(focos_df)
+    out = cube.critical_regions(top_n=3, scoring=cfg)
+    assert (out["focos_recentes"] < out["focos"]).all()
+    rows = compute_critical_regions(focos_df, top_n=3, scoring=cfg)
+    np.testing.assert_allclose(rows.set_index("estado_nome")["focos_recentes"],
+                               out.set_index("estado_nome")["focos_recentes"].reindex(rows["estado_nome"]))
+
+def test_alternate_granularities_and_normalizations(focos_df):
+    cfg = ScoringConfig.from_mapping({"granularity": "bioma_estado",
+                                      "terms": [{"metric": "focos", "weight": 1, "norm": "rank"},
+                                                {"metric": "risco_medio", "weight": 1, "norm": "minmax"}]})
+    out = FocosCube.from_frame(focos_df).critical_regions(top_n=20, scoring=cfg)
+    assert list(out.columns[:2]) == ["estado_nome", "Bioma"]
+    assert len(out) == focos_df.groupby(["estado_nome", "Bioma"], observed=True).ngroups
+    assert out["score"].between(0, 2).all()
+
+    grade = ScoringConfig(terms=(ScoreTerm("focos", 1.0, per="area_km2"),), granularity="grade", cell_deg=1.0)
+    cells = compute_critical_regions(focos_df, top_n=5, scoring=grade)
+    assert {"lat", "lon", "area_km2"} <= set(cells.columns)
+    np.testing.assert_allclose(cells["score"], cells["focos"] / cells["area_km2"])
+    with pytest.raises(ValueError):
+        FocosCube.from_frame(focos_df).critical_regions(scoring=grade)
+    with pytest.raises(ValueError):
+        ScoringConfig(terms=DEFAULT_SCORING.terms, granularity="bairro")
+
+def test_api_caches_per_scoring(focos_df):
+    api = VigiaAPI(focos_df)
+    a = api.run({}, tables=["regioes_criticas"])["regioes_criticas"]
+    b = api.run({}, tables=["regioes_criticas"],
+                scoring={"granularity": "grade", "cell_deg": 2.0})["regioes_criticas"]
+    assert "municipio_nome" in a.columns and "municipio_nome" not in b.columns
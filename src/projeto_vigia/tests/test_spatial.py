@@ -0,0 +1,26 @@
+import numpy as np
+from src.projeto_vigia.analytics.spatial import SpatialIndex, haversine_km
+from src.projeto_vigia.analytics.query import FocosIndex
+
+def test_radius_query_matches_brute_force(focos_df):
+    idx = SpatialIndex.from_frame(focos_df, cell_deg=0.5)
+    lat, lon = focos_df["lat"].to_numpy(), focos_df["lon"].to_numpy()
+    for clat, clon, r in [(-15.0, -47.0, 300.0), (-29.5, -59.0, 120.0), (-1.0, -36.0, 800.0)]:
+        expected = np.flatnonzero(haversine_km(clat, clon, lat, lon) <= r)
+        assert idx.query_radius(clat, clon, r).tolist() == expected.tolist()
+
+def test_knn_matches_brute_force(focos_df):
+    idx = SpatialIndex.from_frame(focos_df, cell_deg=0.2)
+    lat, lon = focos_df["lat"].to_numpy(), focos_df["lon"].to_numpy()
+    pos, dist = idx.query_knn(-12.3, -44.1, 7)
+    brute = np.sort(haversine_km(-12.3, -44.1, lat, lon))[:7]
+    np.testing.assert_allclose(dist, brute)
+    assert len(set(pos.tolist())) == 7
+
+def test_focos_index_roi_filter(focos_df):
+    index = FocosIndex(focos_df)
+    roi = {"lat": -15.0, "lon": -47.0, "raio_km": 250.0}
+    out = index.query({"estado": "Todos", "roi": roi})
+    d = haversine_km(roi["lat"], roi["lon"], focos_df["lat"], focos_df["lon"])
+    assert len(out) == int((d <= 250.0).sum())
+    assert (haversine_km(roi["lat"], roi["lon"], out["lat"], out["lon"]) <= 250.0).all()
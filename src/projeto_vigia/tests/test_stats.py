@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from src.projeto_vigia.analytics.aggregations import FocosCube
+from src.projeto_vigia.analytics.stats import DailyCounts, grouped_quantiles, spiking_regions
+
+def _spike(focos_df, municipio="A", n=60):
+    """focos_df com n focos extras de um município no último dia."""
+    last = focos_df["data_hora"].max().normalize()
+    extra = focos_df[focos_df["municipio_nome"] == municipio].head(n).copy()
+    extra["data_hora"] = last + pd.Timedelta(hours=15)
+    return pd.concat([focos_df, extra], ignore_index=True)
+
+def test_daily_counts_matrix_and_windows(focos_df):
+    dc = DailyCounts.from_frame(focos_df, dims=["estado_nome"])
+    assert dc.counts.sum() == len(focos_df)
+    assert dc.counts.shape == (3, len(dc.days))
+    ref = (focos_df.groupby([focos_df["estado_nome"], focos_df["data_hora"].dt.normalize()], observed=True)
+           .size().unstack(fill_value=0))
+    row = dc.regions.index[dc.regions["estado_nome"] == "BAHIA"][0]
+    np.testing.assert_array_equal(dc.counts[row], ref.loc["BAHIA"].to_numpy())
+
+    s3 = dc.rolling_sum(3)
+    assert s3[row, 5] == dc.counts[row, 3:6].sum()
+    assert dc.rolling_mean(3)[row, 0] == dc.counts[row, 0]
+    assert dc.delta(1)[row, 2] == dc.counts[row, 2] - dc.counts[row, 1]
+
+def test_spiking_regions_flags_the_spike(focos_df):
+    df = _spike(focos_df)
+    table = FocosCube.from_frame(df).table
+    out = spiking_regions(table, min_focos=5)
+    assert out.iloc[0]["municipio_nome"] == "A"
+    assert out.iloc[0]["z"] >= 3 and out.iloc[0]["percentil"] == 100
+    assert out.iloc[0]["delta_dia"] > 0
+    assert not (spiking_regions(FocosCube.from_frame(focos_df).table)["municipio_nome"] == "A").any()
+
+    # dia posterior ao último com focos: nada em alta, sem erro
+    later = df["data_hora"].max() + pd.Timedelta(days=2)
+    assert spiking_regions(table, day=later).empty
+
+def test_grouped_quantiles_matches_pandas(focos_df):
+    out = grouped_quantiles(focos_df, "estado_nome", ["DiaSemChuva", "FRP"], qs=(0.1, 0.5, 0.9))
+    ref = focos_df.groupby("estado_nome", observed=True)["DiaSemChuva"].quantile([0.1, 0.5, 0.9]).unstack()
+    for q, col in [(0.1, "p10"), (0.5, "p50"), (0.9, "p90")]:
+        np.testing.assert_allclose(out[("DiaSemChuva", col)].reindex(ref.index), ref[q], rtol=1e-6)
+    # nulos ficam de fora da contagem
+    assert out[("DiaSemChuva", "n")].sum() == focos_df["DiaSemChuva"].notna().sum()
+    assert out[("FRP", "n")].sum() == len(focos_df)
+
+def test_api_spiking_uses_history_before_period(focos_df):
+    from src.projeto_vigia.api import VigiaAPI
+    df = _spike(focos_df)
+    last = df["data_hora"].max().normalize()
+    # período de um dia só: o histórico vem dos dias anteriores, fora do período
+    out = VigiaAPI(df).run({"start": last, "end": last}, tables=["municipios_em_alta"])
+    alta = out["municipios_em_alta"]
+    assert alta.iloc[0]["municipio_nome"] == "A"
+    assert alta.iloc[0]["dias_hist"] > 1
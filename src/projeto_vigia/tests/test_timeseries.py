@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from src.projeto_vigia.analytics.aggregations import FocosCube
+from src.projeto_vigia.analytics.timeseries import (OTHERS_LABEL, bin_counts, chart_series, choose_freq,
+                                                    collapse_top_k, lttb_indices)
+
+def test_choose_freq_by_range():
+    t0 = pd.Timestamp("2025-01-01")
+    assert choose_freq(t0, t0 + pd.Timedelta(days=3)) == "h"
+    assert choose_freq(t0, t0 + pd.Timedelta(days=3), finest="D") == "D"
+    assert choose_freq(t0, t0 + pd.Timedelta(days=200)) == "D"
+    assert choose_freq(t0, t0 + pd.Timedelta(days=1000)) == "W-MON"
+    assert choose_freq(t0, t0 + pd.Timedelta(days=365 * 40)) == "MS"
+
+def test_bin_counts_fills_gaps_and_keeps_total(focos_df):
+    out = bin_counts(focos_df, "h", "estado_nome")
+    assert out["contagem"].sum() == len(focos_df)
+    n_hours = out["data"].nunique()
+    assert len(out) == n_hours * focos_df["estado_nome"].nunique()  # intervalos vazios com zero
+
+    weekly = bin_counts(focos_df, "W-MON")
+    assert (weekly["data"].dt.dayofweek == 0).all()
+    assert weekly["contagem"].sum() == len(focos_df)
+
+def test_collapse_top_k_sums_the_rest(focos_df):
+    series = FocosCube.from_frame(focos_df).series_by_dimension("municipio_nome")
+    out = collapse_top_k(series, "municipio_nome", k=3)
+    assert out["municipio_nome"].nunique() == 4
+    assert list(out["municipio_nome"].cat.categories)[-1] == OTHERS_LABEL
+    assert out["contagem"].sum() == series["contagem"].sum()
+    # sem excesso de categorias, nada muda
+    assert collapse_top_k(series, "municipio_nome", k=50)["municipio_nome"].nunique() == series["municipio_nome"].nunique()
+
+def test_lttb_keeps_ends_and_peaks():
+    x = np.arange(5000)
+    y = np.sin(x / 200.0)
+    y[2500] = 50
+    idx = lttb_indices(x, y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 4999
+    assert np.all(np.diff(idx) > 0)
+    assert 2500 in idx
+    assert len(lttb_indices(x[:50], y[:50], 100)) == 50
+
+def test_chart_series_bounded_size(focos_df):
+    cube = FocosCube.from_frame(focos_df)
+    serie, freq = chart_series(cube.by_day())
+    assert freq == "D" and serie["contagem"].sum() == len(focos_df)
+
+    # com as linhas, período curto vira série por hora; pontos limitados por linha
+    serie, freq = chart_series(cube.series_by_dimension("municipio_nome"), "municipio_nome",
+                               rows=focos_df, top_k=4, max_points=50)
+    assert freq == "h"
+    assert serie["municipio_nome"].nunique() == 5
+    assert serie.groupby("municipio_nome", observed=True).size().max() <= 50
+
+def test_chart_series_loads_rows_only_for_hourly_bins(focos_df):
+    cube = FocosCube.from_frame(focos_df)
+    calls = []
+    def rows():
+        calls.append(1)
+        return focos_df
+    _, freq = chart_series(cube.by_day(), rows=rows, max_bins=100)
+    assert freq == "D" and not calls
+    serie, freq = chart_series(cube.by_day(), rows=rows)
+    assert freq == "h" and calls == [1]
+    assert serie["contagem"].sum() == len(focos_df)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from src.projeto_vigia.domain.validation import RULES, FocosValidator, validate_focos
+
+def _frame(**overrides):
+    base = {
+        "data_hora": pd.to_datetime(["2025-04-01 10:00"] * 4) + pd.to_timedelta(range(4), unit="h"),
+        "lat": np.float32([-13.4, -19.7, -10.0, -5.0]),
+        "lon": np.float32([-41.3, -47.9, -45.0, -60.0]),
+        "estado_nome": pd.Categorical(["BAHIA", "MINAS GERAIS", "PIAUÍ", "AMAZONAS"]),
+        "municipio_nome": pd.Categorical(["IBICOARA", "UBERABA", "A", "B"]),
+        "Bioma": pd.Categorical(["Caatinga", "Cerrado", "Cerrado", "Amazônia"]),
+        "DiaSemChuva": np.float32([5, -999, 3, 0]),
+        "Precipitacao": np.float32([0, 0, 2.5, 0]),
+        "RiscoFogo": np.float32([0.9, 0.8, 0.1, 1.0]),
+        "FRP": np.float32([120, 80, np.nan, 10]),
+    }
+    base.update(overrides)
+    return pd.DataFrame(base)
+
+def test_valid_rows_pass_and_sentinels_become_null():
+    out, report = validate_focos(_frame())
+    assert len(out) == 4 and report.accepted == 4 and report.rejected == 0
+    assert report.sentinels == {"DiaSemChuva": 1}
+    assert out["DiaSemChuva"].isna().sum() == 1
+    assert list(report.to_frame()["regra"]) == list(RULES)
+
+def test_each_rule_counts_rejected_rows():
+    df = _frame(
+        lat=np.float32([-13.4, 40.0, np.nan, -5.0]),            # fora do Brasil, sem coordenada
+        RiscoFogo=np.float32([1.5, 0.8, 0.1, -999]),            # fora de [0, 1]; -999 vira nulo
+        FRP=np.float32([120, -1, np.nan, 10]),
+        estado_nome=pd.Categorical(["Bahia", "MINAS GERAIS", "PIAUI", "ATLANTIDA"]),  # sem acento/caixa vale
+        Bioma=pd.Categorical(["Caatinga", None, "Cerrado", "Amazônia"]),
+    )
+    out, report = validate_focos(df)
+    r = report.rejected_by_rule
+    assert r["fora_do_brasil"] == 1 and r["coordenada_ausente"] == 1
+    assert r["risco_fora_de_0_1"] == 2 and r["frp_negativo"] == 1
+    assert r["estado_desconhecido"] == 1 and r["bioma_desconhecido"] == 1
+    assert report.sentinels == {"DiaSemChuva": 1, "RiscoFogo": 1}
+    assert out.empty and report.rejected == 4
+
+def test_duplicates_are_found_across_chunks():
+    df = _frame()
+    chunks = [df.iloc[:3], pd.concat([df.iloc[3:], df.iloc[:2], df.iloc[3:]])]
+    validator = FocosValidator()
+    kept = [validator(c) for c in chunks]
+    assert sum(map(len, kept)) == 4
+    assert validator.report.rejected_by_rule["duplicada"] == 3
+    assert validator.report.rows == 7 and validator.report.accepted == 4
+
+def test_fixture_is_fully_valid(focos_df):
+    out, report = validate_focos(focos_df)
+    assert len(out) == len(focos_df)
+    assert sum(report.rejected_by_rule.values()) == 0
@@ -1,17 +1,41 @@
 from __future__ import annotations
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 import streamlit as st
 import pandas as pd
-import altair as alt
-from ..charts.time_series import time_chart_overall, time_chart_by_dimension
-from ..charts.bar_charts import bioma_chart as _bioma_chart, municipio_chart as _municipio_chart
-from ..charts.maps import simple_map
+from ..analytics.distributions import STATS_COLUMNS, correlation, describe_numeric, histogram, kde
+from ..analytics.stats import grouped_quantiles
+from ..analytics.timeseries import chart_series
+from ..config import CACHE_DIR, EXPORT_MAX_DOWNLOAD_MB, RAW_PAGE_SIZES
+from ..instrumentation import Trace, prometheus_text, stage
+from ..services.export import write_stream
 
-def render_summary_tab(df: pd.DataFrame, estado: str):
+# Altair e pydeck (via charts) só são importados quando uma aba com gráfico é
+# desenhada: a primeira carga do painel não paga por eles
+if TYPE_CHECKING:
+    import altair as alt
+
+def _altair(chart: alt.Chart):
+    # a serialização do Vega-Lite (dados embutidos) acontece aqui, não na montagem do gráfico
+    with stage("charts.altair_render"):
+        st.altair_chart(chart, use_container_width=True)
+
+def render_summary_tab(df: pd.DataFrame, estado: str, summary: dict | None = None):
+    """summary: métricas já agregadas (FocosCube.summary); se ausente, calcula sobre df."""
     st.subheader(f"Resumo para {estado}")
-    total = len(df)
-    municipio_top = df["municipio_nome"].value_counts().idxmax()
-    n_muns = df["municipio_nome"].nunique()
-    avg_sem_chuva = df["DiaSemChuva"].mean()
+    if summary is None:
+        summary = {
+            "total": len(df),
+            "municipio_top": df["municipio_nome"].value_counts().idxmax(),
+            "n_municipios": df["municipio_nome"].nunique(),
+            "media_dias_sem_chuva": df["DiaSemChuva"].mean(),
+        }
+    total = summary["total"]
+    municipio_top = summary["municipio_top"]
+    n_muns = summary["n_municipios"]
+    avg_sem_chuva = summary["media_dias_sem_chuva"]
 
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Total de Focos no Período", f"{total} 🔥")
@@ -19,25 +43,45 @@ def render_summary_tab(df: pd.DataFrame, estado: str):
     c3.metric("Nº de Municípios Afetados", n_muns)
     c4.metric("Média de Dias Sem Chuva", f"{avg_sem_chuva:.1f} dias" if pd.notna(avg_sem_chuva) else "N/A")
 
+    from ..charts.maps import simple_map
+
     st.subheader("Mapa de Distribuição dos Focos (cor=Risco, raio=FRP)")
     simple_map(df)
 
-def render_time_tab(focos_por_dia: pd.DataFrame, df_series_estado: pd.DataFrame, df_series_bioma: pd.DataFrame):
+def render_time_tab(focos_por_dia: pd.DataFrame, df_series_estado: pd.DataFrame, df_series_bioma: pd.DataFrame,
+                    df_series_municipio: pd.DataFrame | None = None,
+                    focos: pd.DataFrame | Callable[[], pd.DataFrame] | None = None):
+    """
+    Tabelas diárias do cubo; a largura (hora/dia/semana/mês), o top-k + "Outros"
+    e a redução de pontos são aplicados aqui (analytics.timeseries.chart_series).
+    focos: linhas filtradas (ou função que as devolve), usadas para agregar
+    por hora em períodos curtos.
+    """
+    from ..charts.time_series import time_chart_overall, time_chart_by_dimension
+
     st.subheader("Séries temporais (dinâmicas)")
-    which = st.radio("Visualizar por:", ["Geral","Estado","Bioma"], horizontal=True)
+    options = ["Geral", "Estado", "Bioma"] + (["Município"] if df_series_municipio is not None else [])
+    which = st.radio("Visualizar por:", options, horizontal=True)
     if which == "Geral":
-        st.altair_chart(time_chart_overall(focos_por_dia), use_container_width=True)
-    elif which == "Estado":
-        st.altair_chart(time_chart_by_dimension(df_series_estado, "estado_nome"), use_container_width=True)
-    else:
-        st.altair_chart(time_chart_by_dimension(df_series_bioma, "Bioma"), use_container_width=True)
+        serie, freq = chart_series(focos_por_dia, rows=focos)
+        _altair(time_chart_overall(serie, freq))
+        return
+    table, dimension = {
+        "Estado": (df_series_estado, "estado_nome"),
+        "Bioma": (df_series_bioma, "Bioma"),
+        "Município": (df_series_municipio, "municipio_nome"),
+    }[which]
+    serie, freq = chart_series(table, dimension, rows=focos)
+    _altair(time_chart_by_dimension(serie, dimension, freq))
 
 def render_biome_city_tab(df_bioma: pd.DataFrame, df_mun: pd.DataFrame):
+    from ..charts.bar_charts import bioma_chart as _bioma_chart, municipio_chart as _municipio_chart
+
     st.subheader("Distribuição de Focos por Bioma")
-    st.altair_chart(_bioma_chart(df_bioma), use_container_width=True)
+    _altair(_bioma_chart(df_bioma))
 
     st.subheader("Top 10 Municípios com Mais Focos")
-    st.altair_chart(_municipio_chart(df_mun), use_container_width=True)
+    _altair(_municipio_chart(df_mun))
 
 def render_prevention_tab():
     st.subheader("Como Prevenir Queimadas")
@@ -50,37 +94,123 @@ def render_prevention_tab():
     - **📞 Ao avistar foco, ligue 193 (Bombeiros) ou 199 (Defesa Civil)**.
     """)
 
-def render_stats_tab(df: pd.DataFrame):
+def render_spiking(em_alta: pd.DataFrame):
+    """Municípios com focos no último dia muito acima das semanas anteriores (analytics.stats)."""
+    st.markdown("**Municípios em alta no último dia do período**")
+    if em_alta.empty:
+        st.info("Nenhum município com focos muito acima do histórico recente.")
+        return
+    st.dataframe(
+        em_alta[["municipio_nome", "estado_nome", "focos_dia", "media_hist", "z", "percentil",
+                 "delta_dia", "delta_semana"]]
+        .rename(columns={"municipio_nome": "Município", "estado_nome": "Estado", "focos_dia": "Focos no dia",
+                         "media_hist": "Média diária (histórico)", "z": "z-score", "percentil": "Percentil",
+                         "delta_dia": "Δ dia anterior", "delta_semana": "Δ semana anterior"}),
+        hide_index=True,
+        column_config={"Média diária (histórico)": st.column_config.NumberColumn(format="%.1f"),
+                       "z-score": st.column_config.NumberColumn(format="%.1f"),
+                       "Percentil": st.column_config.NumberColumn(format="%.0f")},
+    )
+
+def render_stats_tab(df: pd.DataFrame, em_alta: pd.DataFrame | None = None,
+                     resumo: pd.DataFrame | None = None, quantis: pd.DataFrame | None = None):
+    """resumo/quantis: tabelas já calculadas (VigiaAPI.run); se ausentes, calcula sobre df."""
+    from ..charts.distributions import correlation_heatmap, histogram_density_chart
+
     st.subheader("Análise Estatística")
-    cols_num = ["DiaSemChuva","Precipitacao","RiscoFogo","FRP"]
+    cols_num = STATS_COLUMNS
+    if em_alta is not None:
+        render_spiking(em_alta)
+
+    # tudo agregado no servidor: só algumas centenas de pontos vão para o navegador
     df_num = df[cols_num].dropna()
 
     st.markdown("**Resumo estatístico**")
-    st.dataframe(df_num.describe().T)
+    st.dataframe(resumo if resumo is not None else describe_numeric(df_num, cols_num))
+
+    st.markdown("**Quantis de FRP e Risco de Fogo por estado**")
+    if quantis is None:
+        quantis = grouped_quantiles(df, "estado_nome", ["FRP", "RiscoFogo"])
+    quantis.columns = [f"{col} {q}" for col, q in quantis.columns]
+    st.dataframe(quantis)
 
     st.markdown("**Distribuições** (histograma + densidade)")
     target = st.selectbox("Escolha a variável:", cols_num, index=2)
-    chart = (alt.Chart(df_num)
-             .transform_density(target, as_=[target, 'density'])
-             .mark_area(opacity=0.4)
-             .encode(x=alt.X(f"{target}:Q", title=target), y="density:Q"))
-    hist = (alt.Chart(df_num)
-            .mark_bar(opacity=0.5)
-            .encode(x=alt.X(f"{target}:Q", bin=True), y="count()"))
-    st.altair_chart(hist + chart, use_container_width=True)
+    values = df_num[target].to_numpy()
+    _altair(histogram_density_chart(histogram(values), kde(values), target))
 
     st.markdown("**Correlação**")
     chosen = st.multiselect("Selecione variáveis para correlação", cols_num, default=cols_num)
     if len(chosen) >= 2:
-        corr = df_num[chosen].corr().reset_index().melt("index")
-        corr.columns = ["Var1", "Var2", "corr"]
-        heat = (alt.Chart(corr)
-                .mark_rect()
-                .encode(
-                    x="Var1:O", y="Var2:O",
-                    color=alt.Color("corr:Q", scale=alt.Scale(scheme="redyellowblue", domain=(-1,1))),
-                    tooltip=["Var1","Var2","corr"]
-                ).properties(height=300))
-        st.altair_chart(heat, use_container_width=True)
+        _altair(correlation_heatmap(correlation(df_num, chosen)))
     else:
         st.info("Selecione pelo menos duas variáveis.")
+
+RAW_LABELS = {"lat": "Latitude", "lon": "Longitude", "data_hora": "Data/Hora",
+              "municipio_nome": "Município", "estado_nome": "Estado"}
+
+def render_raw_viewer(api, spec):
+    """
+    Dados brutos paginados: só a página visível sai da base (ordenada e com as
+    colunas escolhidas no servidor). O download grava a seleção inteira em
+    blocos num arquivo temporário; o navegador recebe até EXPORT_MAX_DOWNLOAD_MB.
+    """
+    all_cols = api.columns(spec)
+    c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+    columns = c1.multiselect("Colunas", all_cols, default=all_cols, key="brutos_colunas") or all_cols
+    sort_by = c2.selectbox("Ordenar por", [None] + all_cols, format_func=lambda c: c or "(ordem da base)",
+                           key="brutos_ordem")
+    ascending = c3.toggle("Crescente", value=True, key="brutos_crescente")
+    page_size = c4.selectbox("Linhas", RAW_PAGE_SIZES, index=1, key="brutos_tamanho")
+
+    pages = max(1, -(-api.count(spec) // page_size))
+    page = st.number_input(f"Página (de {pages})", 1, pages, 1, key="brutos_pagina")
+    rows, total = api.page(spec, int(page), page_size, sort_by, ascending, columns)
+    first = (int(page) - 1) * page_size
+    st.dataframe(rows.rename(columns=RAW_LABELS), hide_index=True)
+    st.caption(f"Linhas {first + 1 if total else 0}–{first + len(rows)} de {total:,}".replace(",", "."))
+
+    fmt = st.radio("Formato", ["csv", "parquet"], horizontal=True, key="brutos_formato")
+    if st.button("Gerar arquivo para download"):
+        # A geração vai em blocos para um arquivo só desta requisição (nome único,
+        # apagado logo depois). O download_button, porém, lê o arquivo inteiro e o
+        # Streamlit guarda essa cópia em memória: daí o teto EXPORT_MAX_DOWNLOAD_MB
+        exports = CACHE_DIR / "exports"
+        exports.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(prefix="focos_", suffix=f".{fmt}", dir=exports)
+        os.close(fd)
+        path = Path(name)
+        try:
+            with st.spinner("Gravando arquivo..."):
+                done = write_stream(api.export(spec, fmt, columns, RAW_LABELS, sort_by, ascending), path,
+                                    max_bytes=EXPORT_MAX_DOWNLOAD_MB * 2**20)
+            if done is None:
+                st.warning(f"A seleção passa de {EXPORT_MAX_DOWNLOAD_MB} MB. Reduza o período ou as colunas, "
+                           "ou exporte pela linha de comando: vigia consultas.json --tabelas focos.")
+            else:
+                st.download_button(f"Baixar {fmt.upper()} ({total:,} linhas)".replace(",", "."), path.read_bytes(),
+                                   file_name=f"focos.{fmt}",
+                                   mime="text/csv" if fmt == "csv" else "application/octet-stream")
+        finally:
+            path.unlink(missing_ok=True)
+
+def render_debug_panel(trace: Trace):
+    """Tempos por etapa da última análise (modo diagnóstico)."""
+    with st.expander("⏱️ Diagnóstico de desempenho", expanded=True):
+        df = trace.to_frame()
+        if df.empty:
+            st.info("Nenhuma etapa instrumentada foi executada.")
+            return
+        df["etapa"] = ["  " * d + s for d, s in zip(df["depth"], df["stage"])]
+        df["memória (MB)"] = df["mem_delta"] / 2**20
+        top = df.loc[df["depth"] == 0, "seconds"].sum()
+        st.caption(f"Tempo total instrumentado: {top:.3f} s em {len(df)} etapas (em ordem de término).")
+        st.dataframe(df[["etapa", "seconds", "rows_in", "rows_out", "memória (MB)"]]
+                     .rename(columns={"seconds": "tempo (s)", "rows_in": "linhas in", "rows_out": "linhas out"}),
+                     hide_index=True)
+        por_etapa = (df.groupby("stage")["seconds"].agg(["count", "sum"])
+                       .sort_values("sum", ascending=False)
+                       .rename(columns={"count": "chamadas", "sum": "tempo (s)"}))
+        st.dataframe(por_etapa)
+        prom = prometheus_text(trace)
+        st.download_button("Baixar métricas (Prometheus)", prom, file_name="vigia_metrics.prom", mime="text/plain")
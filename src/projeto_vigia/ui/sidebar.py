@@ -1,16 +1,27 @@
 from __future__ import annotations
 import streamlit as st
 import pandas as pd
-from PIL import Image
-import requests
-import io
-from typing import Optional, Dict, Any, Tuple
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple
+from ..services.drive_fetch import cached_asset
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+GRANULARIDADES = {
+    "municipio": "Município",
+    "bioma_estado": "Bioma dentro do estado",
+    "estado": "Estado",
+    "bioma": "Bioma",
+    "grade": "Células da grade (lat/lon)",
+}
 
 def load_logo(url: str) -> Image.Image | None:
+    # Cópia em disco: a rede só é consultada (com revalidação) uma vez por dia
     try:
-        r = requests.get(url, stream=True, timeout=20)
-        r.raise_for_status()
-        return Image.open(io.BytesIO(r.content))
+        from PIL import Image
+
+        path = cached_asset(url)
+        return Image.open(path) if path is not None else None
     except Exception:
         return None
 
@@ -21,7 +32,8 @@ def _numeric_filter_block(label: str, key_prefix: str) -> Dict[str, Any]:
     b = cols[2].number_input("B", value=0.0, step=0.1, key=f"{key_prefix}_b")
     return {"op": op, "a": a, "b": b}
 
-def render_sidebar(df_full: pd.DataFrame | None, logo_url: str):
+def render_sidebar(logo_url: str, options: dict | None = None):
+    """options: opções dos filtros (VigiaAPI/ArchiveAPI.filter_options); None sem dados."""
     if (logo := load_logo(logo_url)):
         st.sidebar.image(logo)
     else:
@@ -29,22 +41,21 @@ def render_sidebar(df_full: pd.DataFrame | None, logo_url: str):
 
     st.sidebar.header("Filtros de Análise")
 
-    if df_full is None or df_full.empty:
+    if not options or options["inicio"] is None:
         st.sidebar.selectbox("Estado", ["Dados não carregados"], disabled=True)
         st.sidebar.date_input("Período", disabled=True)
         return None
 
     # Estado (com opção Todos)
-    estados = ["Todos"] + sorted(df_full["estado_nome"].unique().tolist())
+    estados = ["Todos"] + options["estados"]
     estado = st.sidebar.selectbox("Estado", estados)
 
     # Biomas
-    biomas_unique = sorted(df_full["Bioma"].dropna().unique().tolist())
-    biomas = st.sidebar.multiselect("Biomas", options=biomas_unique, default=[])
+    biomas = st.sidebar.multiselect("Biomas", options=options["biomas"], default=[])
 
     # Date range em 1 campo
-    min_date = df_full["data_hora"].min().date()
-    max_date = df_full["data_hora"].max().date()
+    min_date = options["inicio"].date()
+    max_date = options["fim"].date()
     start_end = st.sidebar.date_input("Período (início – fim)", value=(min_date, max_date), min_value=min_date, max_value=max_date)
     if isinstance(start_end, tuple):
         d0, d1 = start_end
@@ -63,6 +74,23 @@ def render_sidebar(df_full: pd.DataFrame | None, logo_url: str):
         t0 = c1.time_input("Início", value=pd.Timestamp("2000-01-01 08:00").time())
         t1 = c2.time_input("Fim", value=pd.Timestamp("2000-01-01 18:00").time())
 
+    # Região de interesse (raio em torno de um município ou coordenada)
+    st.sidebar.subheader("Região de Interesse")
+    roi = None
+    if st.sidebar.checkbox("Filtrar por raio"):
+        modo = st.sidebar.radio("Centro", ["Município", "Coordenada"], horizontal=True)
+        if modo == "Município":
+            centros = options["centros"]()
+            rotulo = st.sidebar.selectbox("Município", centros["rotulo"].tolist())
+            centro = centros.loc[centros["rotulo"] == rotulo].iloc[0]
+            lat, lon = float(centro["lat"]), float(centro["lon"])
+        else:
+            c1, c2 = st.sidebar.columns(2)
+            lat = c1.number_input("Latitude", value=-15.0, min_value=-90.0, max_value=90.0, step=0.1)
+            lon = c2.number_input("Longitude", value=-47.0, min_value=-180.0, max_value=180.0, step=0.1)
+        raio_km = st.sidebar.slider("Raio (km)", min_value=1, max_value=500, value=50)
+        roi = {"lat": lat, "lon": lon, "raio_km": float(raio_km)}
+
     # Filtros numéricos
     st.sidebar.subheader("Filtros Numéricos")
     rule_dias = _numeric_filter_block("Dias sem chuva", "dias_sem_chuva")
@@ -70,7 +98,42 @@ def render_sidebar(df_full: pd.DataFrame | None, logo_url: str):
     rule_risco = _numeric_filter_block("Risco de fogo (0–1)", "risco")
     rule_frp = _numeric_filter_block("Intensidade (FRP)", "frp")
 
+    # Revisitas do satélite
+    eventos = st.sidebar.checkbox(
+        "Agrupar revisitas em eventos",
+        help="Detecções próximas no espaço e no tempo (revisitas do GOES-19) contam como um único evento de fogo.",
+    )
+
+    # Score das regiões críticas (analytics.scoring)
+    with st.sidebar.expander("Pontuação das regiões críticas"):
+        granularidade = st.selectbox("Agrupar por", list(GRANULARIDADES), format_func=GRANULARIDADES.get)
+        c1, c2, c3 = st.columns(3)
+        p_focos = c1.number_input("Focos", value=0.6, min_value=0.0, step=0.05)
+        p_risco = c2.number_input("Risco", value=0.25, min_value=0.0, step=0.05)
+        p_frp = c3.number_input("FRP", value=0.15, min_value=0.0, step=0.05)
+        normalizar = st.checkbox("Normalizar métricas (0–1)",
+                                 help="Cada métrica vira sua posição min–máx antes dos pesos.")
+        meia_vida = st.number_input("Meia-vida dos focos (dias, 0 = sem decaimento)",
+                                    value=0.0, min_value=0.0, step=1.0,
+                                    help="Focos recentes pesam mais: cada foco vale 0,5^(idade/meia-vida).")
+        por_area = granularidade == "grade" and st.checkbox("Focos por km² (grade)")
+    norm = "minmax" if normalizar else "bruto"
+    focos_metric = "focos_recentes" if meia_vida > 0 else "focos"
+    pontuacao = {
+        "granularity": granularidade,
+        "half_life_days": meia_vida or None,
+        "terms": [
+            {"metric": focos_metric, "weight": p_focos, "norm": norm, "per": "area_km2" if por_area else None},
+            {"metric": "risco_medio", "weight": p_risco, "norm": norm, "scale": 1.0 if normalizar else 100.0},
+            {"metric": "frp_medio", "weight": p_frp, "norm": norm},
+        ],
+    }
+
     buscar = st.sidebar.button("Analisar", type="primary")
+    diagnostico = st.sidebar.checkbox(
+        "Diagnóstico de desempenho",
+        help="Mede tempo, linhas e memória de cada etapa da análise e mostra um painel ao final.",
+    )
 
     return {
         "estado": estado,
@@ -79,11 +142,15 @@ def render_sidebar(df_full: pd.DataFrame | None, logo_url: str):
         "end": end_ts,
         "turno_preset": None if turno_preset == "(sem filtro)" else turno_preset,
         "custom_time": (pd.to_datetime(str(t0)) if t0 else None, pd.to_datetime(str(t1)) if t1 else None) if custom_time else None,
+        "roi": roi,
+        "eventos": eventos,
         "numeric_rules": {
             "DiaSemChuva": rule_dias,
             "Precipitacao": rule_prec,
             "RiscoFogo": rule_risco,
             "FRP": rule_frp,
         },
-        "buscar": buscar
+        "pontuacao": pontuacao,
+        "buscar": buscar,
+        "diagnostico": diagnostico,
     }